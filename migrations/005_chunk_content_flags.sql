@@ -0,0 +1,24 @@
+-- Promote the TOC / front-matter flags from JSONB metadata to generated columns
+-- so "content chunks only" is a plain boolean predicate that partial indexes
+-- can serve (ANN no longer over-fetches and post-filters JSONB per row).
+ALTER TABLE chunks
+    ADD COLUMN IF NOT EXISTS is_toc BOOLEAN NOT NULL
+        GENERATED ALWAYS AS (COALESCE((metadata->>'is_toc')::boolean, false)) STORED,
+    ADD COLUMN IF NOT EXISTS is_front_matter BOOLEAN NOT NULL
+        GENERATED ALWAYS AS (COALESCE((metadata->>'is_front_matter')::boolean, false)) STORED;
+
+-- Partial indexes over content chunks (the default retrieval path).
+-- The full indexes from 003 remain for include_toc queries.
+-- NOTE: The index signature (index_version/model/dimension) is bound as query
+-- parameters, so it is not part of the index predicate: generic plans could
+-- never prove a literal signature predicate and would skip the index.
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding_hnsw_content
+ON chunks
+USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64)
+WHERE NOT is_toc AND NOT is_front_matter;
+
+CREATE INDEX IF NOT EXISTS idx_chunks_content_tsv_gin_content
+ON chunks
+USING gin (content_tsv)
+WHERE NOT is_toc AND NOT is_front_matter;
@@ -0,0 +1,154 @@
+-- List-partition chunks and semantic_cache by index signature
+-- ("<index_version>|<embedding_model>|<embedding_dimension>") so every search
+-- only touches the active partition and its own HNSW graph, while old index
+-- versions can stay around for rollback without slowing queries down.
+--
+-- Generated columns cannot be partition keys, so index_signature is a plain
+-- column written by the application and pinned by a CHECK constraint.
+-- NOTE: Existing rows are copied into the new layout; on large tables this
+-- migration rewrites the table and rebuilds the vector indexes once.
+
+-- Creates (if missing) the partition of `parent` holding `signature`.
+CREATE OR REPLACE FUNCTION ensure_signature_partition(parent TEXT, signature TEXT)
+RETURNS TEXT AS $$
+DECLARE
+    partition_name TEXT := parent || '_' || substr(md5(signature), 1, 12);
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext(partition_name));
+    IF to_regclass(partition_name) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I FOR VALUES IN (%L)',
+            partition_name, parent, signature
+        );
+    END IF;
+    RETURN partition_name;
+END
+$$ LANGUAGE plpgsql;
+
+-- 1. Chunks
+ALTER TABLE chunks RENAME TO chunks_legacy;
+ALTER TABLE chunks_legacy RENAME CONSTRAINT chunks_pkey TO chunks_legacy_pkey;
+ALTER TABLE chunks_legacy RENAME CONSTRAINT chunks_document_id_fkey TO chunks_legacy_document_id_fkey;
+
+CREATE TABLE chunks (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    content TEXT NOT NULL,
+    contextual_content TEXT,
+    chunk_hash VARCHAR(64),
+    metadata JSONB NOT NULL DEFAULT '{}'::jsonb,
+    content_tsv tsvector GENERATED ALWAYS AS (
+      to_tsvector('simple', coalesce(content, ''))
+    ) STORED,
+    is_toc BOOLEAN NOT NULL
+        GENERATED ALWAYS AS (COALESCE((metadata->>'is_toc')::boolean, false)) STORED,
+    is_front_matter BOOLEAN NOT NULL
+        GENERATED ALWAYS AS (COALESCE((metadata->>'is_front_matter')::boolean, false)) STORED,
+    -- Vector Embedding (must match EMBEDDING_DIMENSION in config/.env)
+    embedding vector(1024) NOT NULL,
+    chunk_index INT NOT NULL,
+    index_version TEXT NOT NULL,
+    embedding_model TEXT NOT NULL,
+    embedding_dimension INT NOT NULL,
+    index_signature TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, index_signature),
+    CONSTRAINT chunks_index_signature_check CHECK (
+        index_signature = index_version || '|' || embedding_model || '|' || embedding_dimension
+    )
+) PARTITION BY LIST (index_signature);
+
+SELECT ensure_signature_partition(
+    'chunks', index_version || '|' || embedding_model || '|' || embedding_dimension
+)
+FROM (
+    SELECT DISTINCT index_version, embedding_model, embedding_dimension FROM chunks_legacy
+) AS signatures;
+
+INSERT INTO chunks (
+    id, document_id, content, contextual_content, chunk_hash, metadata, embedding,
+    chunk_index, index_version, embedding_model, embedding_dimension, index_signature,
+    created_at
+)
+SELECT
+    id, document_id, content, contextual_content, chunk_hash, metadata, embedding,
+    chunk_index, index_version, embedding_model, embedding_dimension,
+    index_version || '|' || embedding_model || '|' || embedding_dimension,
+    created_at
+FROM chunks_legacy;
+
+DROP TABLE chunks_legacy;
+
+-- Declared on the parent, created on every partition (one HNSW graph each).
+CREATE INDEX idx_chunks_embedding_hnsw
+ON chunks
+USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX idx_chunks_embedding_hnsw_content
+ON chunks
+USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64)
+WHERE NOT is_toc AND NOT is_front_matter;
+
+CREATE INDEX idx_chunks_metadata_gin ON chunks USING gin (metadata);
+CREATE INDEX idx_chunks_content_tsv_gin ON chunks USING gin (content_tsv);
+CREATE INDEX idx_chunks_content_tsv_gin_content
+ON chunks
+USING gin (content_tsv)
+WHERE NOT is_toc AND NOT is_front_matter;
+CREATE INDEX idx_chunks_document_id ON chunks(document_id);
+CREATE INDEX idx_chunks_chunk_hash ON chunks(chunk_hash);
+
+-- 2. Semantic cache (only unexpired entries are carried over)
+ALTER TABLE semantic_cache RENAME TO semantic_cache_legacy;
+ALTER TABLE semantic_cache_legacy RENAME CONSTRAINT semantic_cache_pkey TO semantic_cache_legacy_pkey;
+
+CREATE TABLE semantic_cache (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    query_text TEXT NOT NULL,
+    -- query_embedding dimension must match EMBEDDING_DIMENSION in config/.env
+    query_embedding vector(1024) NOT NULL,
+    answer TEXT NOT NULL,
+    citations JSONB NOT NULL DEFAULT '[]'::jsonb,
+    embedding_model TEXT NOT NULL,
+    embedding_dimension INT NOT NULL,
+    index_version TEXT NOT NULL,
+    index_signature TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (id, index_signature),
+    CONSTRAINT semantic_cache_index_signature_check CHECK (
+        index_signature = index_version || '|' || embedding_model || '|' || embedding_dimension
+    )
+) PARTITION BY LIST (index_signature);
+
+SELECT ensure_signature_partition(
+    'semantic_cache', index_version || '|' || embedding_model || '|' || embedding_dimension
+)
+FROM (
+    SELECT DISTINCT index_version, embedding_model, embedding_dimension
+    FROM semantic_cache_legacy
+    WHERE expires_at > NOW()
+) AS signatures;
+
+INSERT INTO semantic_cache (
+    id, query_text, query_embedding, answer, citations, embedding_model,
+    embedding_dimension, index_version, index_signature, created_at, expires_at
+)
+SELECT
+    id, query_text, query_embedding, answer, citations, embedding_model,
+    embedding_dimension, index_version,
+    index_version || '|' || embedding_model || '|' || embedding_dimension,
+    created_at, expires_at
+FROM semantic_cache_legacy
+WHERE expires_at > NOW();
+
+DROP TABLE semantic_cache_legacy;
+
+CREATE INDEX idx_semantic_cache_embedding_hnsw
+ON semantic_cache
+USING hnsw (query_embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX idx_semantic_cache_expires ON semantic_cache(expires_at);
@@ -0,0 +1,18 @@
+-- Durable rerank score store shared by all API workers.
+-- One row per (query, chunk) pair scored by the reranker; prompt_version
+-- fingerprints the reranker prompt/model so template changes never reuse
+-- stale scores. The in-process LRU in backend/rag/rerank_cache.py sits in
+-- front of this table.
+CREATE TABLE IF NOT EXISTS rerank_scores (
+    query_hash CHAR(64) NOT NULL,
+    chunk_id TEXT NOT NULL,
+    index_signature TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    score DOUBLE PRECISION NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (query_hash, index_signature, prompt_version, chunk_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rerank_scores_expires
+ON rerank_scores(expires_at);
@@ -0,0 +1,20 @@
+-- Exact-match cache of deterministic (temperature 0) RAG generations.
+-- prompt_hash covers the rendered system/user prompts, model, decoding
+-- settings and index signature, so prompt edits and reindexes never reuse a
+-- stale answer; index_signature is kept as a column for inspection and
+-- cleanup. The in-process LRU in backend/rag/generation_cache.py sits in
+-- front of this table.
+CREATE TABLE IF NOT EXISTS generation_cache (
+    prompt_hash CHAR(64) PRIMARY KEY,
+    index_signature TEXT NOT NULL,
+    model TEXT NOT NULL,
+    thinking TEXT NOT NULL DEFAULT '',
+    content TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_generation_cache_expires
+ON generation_cache(expires_at);
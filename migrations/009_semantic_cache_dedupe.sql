@@ -0,0 +1,37 @@
+-- Deduplicated, capacity-bounded semantic cache.
+-- query_hash is the SHA-256 of the normalized query (lower-cased, whitespace
+-- collapsed and trimmed exactly like semantic_cache.query_hash); store_cache
+-- upserts on (index_signature, query_hash) instead of inserting a row per miss.
+-- hit_count/last_hit_at drive LFU eviction (ties broken by recency) once
+-- SEMANTIC_CACHE_MAX_ENTRIES is exceeded.
+ALTER TABLE semantic_cache ADD COLUMN IF NOT EXISTS query_hash CHAR(64);
+ALTER TABLE semantic_cache ADD COLUMN IF NOT EXISTS hit_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE semantic_cache ADD COLUMN IF NOT EXISTS last_hit_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+UPDATE semantic_cache
+SET query_hash = encode(
+    sha256(convert_to(btrim(regexp_replace(lower(query_text), '\s+', ' ', 'g'), ' '), 'UTF8')),
+    'hex'
+)
+WHERE query_hash IS NULL;
+
+-- Keep only the newest row per normalized query
+DELETE FROM semantic_cache AS s
+USING (
+    SELECT id, index_signature,
+           ROW_NUMBER() OVER (
+               PARTITION BY index_signature, query_hash ORDER BY created_at DESC, id
+           ) AS rn
+    FROM semantic_cache
+) AS ranked
+WHERE s.id = ranked.id
+  AND s.index_signature = ranked.index_signature
+  AND ranked.rn > 1;
+
+ALTER TABLE semantic_cache ALTER COLUMN query_hash SET NOT NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_semantic_cache_query_hash
+ON semantic_cache(index_signature, query_hash);
+
+CREATE INDEX IF NOT EXISTS idx_semantic_cache_eviction
+ON semantic_cache(index_signature, hit_count, last_hit_at);
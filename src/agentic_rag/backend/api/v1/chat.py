@@ -12,6 +12,7 @@ from fastapi.responses import StreamingResponse
 
 from agentic_rag.backend.api.v1.chat_service import (
     SCOPE_REFUSAL,
+    SHORT_REPLY_TOKENS,
     RouteDecision,
     _agent_mode_response,
     _conversational_response,
@@ -20,10 +21,12 @@ from agentic_rag.backend.api.v1.chat_service import (
     _prepare_rag,
     _route_decision,
 )
+from agentic_rag.backend.rag.query_embedding import QueryEmbeddingContext
 from agentic_rag.backend.rag.semantic_cache import lookup_cache, store_cache
 from agentic_rag.core.config import settings
 from agentic_rag.core.exceptions import DependencyUnavailable, IndexMismatchError
 from agentic_rag.core.llm_factory import ollama_chat_with_thinking
+from agentic_rag.core.llm_scheduler import Priority
 from agentic_rag.core.schemas import (
     Citation,
     OpenAIChatChoice,
@@ -113,6 +116,8 @@ async def _generate_followup_questions(
             system_prompt="You generate follow-up questions. Reply with JSON only.",
             user_message=prompt,
             think=False,
+            priority=Priority.BACKGROUND,
+            output_tokens=SHORT_REPLY_TOKENS,
         )
         # Validate it's parseable JSON
         parsed = json.loads(content.strip())
@@ -152,6 +157,7 @@ async def _process_query(
         await memory.add_message("assistant", SCOPE_REFUSAL)
         return SCOPE_REFUSAL, [], _ZERO_USAGE
 
+    embeddings = route.embeddings or QueryEmbeddingContext(query)
     usage = _ZERO_USAGE
     try:
         if route.kind == "agent":
@@ -162,12 +168,12 @@ async def _process_query(
             )
         else:
             used_fallback = False
-            cached = await lookup_cache(query)
+            cached = await lookup_cache(query, embeddings=embeddings)
             if cached is not None:
                 await memory.add_message("assistant", cached.answer)
                 return cached.answer, cached.citations, _ZERO_USAGE
 
-            rag_payload = await _prepare_rag(memory, query)
+            rag_payload = await _prepare_rag(memory, query, embeddings=embeddings)
             citations = rag_payload.citations
             try:
                 answer, usage = await _fast_rag_response(
@@ -202,7 +208,7 @@ async def _process_query(
 
     await memory.add_message("assistant", answer)
     if route.kind == "rag" and not used_fallback and citations:
-        await store_cache(query, answer, citations)
+        await store_cache(query, answer, citations, embeddings=embeddings)
 
     return answer, citations, usage
 
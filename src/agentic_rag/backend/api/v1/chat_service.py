@@ -11,13 +11,22 @@ from dataclasses import dataclass, field
 from typing import Literal
 
 import structlog
+from llama_index.core.schema import QueryBundle
 
-from agentic_rag.backend.rag.reranker import LLMReranker
+from agentic_rag.backend.rag.generation_cache import cached_chat
+from agentic_rag.backend.rag.query_embedding import QueryEmbeddingContext
+from agentic_rag.backend.rag.reranker import get_reranker
 from agentic_rag.backend.rag.retriever import HybridRetriever
 from agentic_rag.core.citations import format_citations
 from agentic_rag.core.config import settings
+from agentic_rag.core.context_packer import NO_CONTEXT_MESSAGE, pack_passages
 from agentic_rag.core.exceptions import DependencyUnavailable, IndexMismatchError
-from agentic_rag.core.llm_factory import ollama_chat_with_thinking
+from agentic_rag.core.llm_factory import (
+    count_prompt_tokens,
+    count_tokens,
+    ollama_chat_with_thinking,
+)
+from agentic_rag.core.llm_scheduler import Priority
 from agentic_rag.core.memory import ConversationMemory
 from agentic_rag.core.prompts import PromptRegistry
 from agentic_rag.core.schemas import Citation
@@ -64,6 +73,11 @@ def _hash_parts(*parts: str) -> str:
 
 CLOSING_LINE = f"\n\n{settings.DOMAIN_CLOSING}"
 
+# Output budget (num_ctx sizing) for greetings and follow-up suggestions
+SHORT_REPLY_TOKENS = 256
+# "\n\n---\n\n" between sources plus the newline after each header
+_CONTEXT_SEPARATOR_TOKENS = 4
+
 # Patterns that attempt to inject fake prompt sections or override instructions.
 _INJECTION_RE = re.compile(
     r"(===\s*(INSTRUCTIONS|CONTEXT|SYSTEM|QUESTION|RULES|HISTORY)\s*===)"
@@ -99,6 +113,7 @@ class RouteDecision:
     session_id: str
     memory: ConversationMemory | None = None
     internal_response: str = ""
+    embeddings: QueryEmbeddingContext | None = None
 
 
 @dataclass
@@ -168,6 +183,7 @@ async def _conversational_response(query: str, model: str | None = None) -> str:
             user_message=query,
             think=False,
             model=model,
+            output_tokens=SHORT_REPLY_TOKENS,
         )
         return content.strip() or fallback
     except Exception:
@@ -193,15 +209,21 @@ def _is_openwebui_internal_request(query: str) -> tuple[bool, str]:
     return True, "OK"
 
 
-def _format_context_for_llm(citations: list[Citation]) -> str:
-    """Format citations as context for the LLM prompt."""
+def _format_context_for_llm(citations: list[Citation], budget_tokens: int | None = None) -> str:
+    """Format citations as context for the LLM prompt within a token budget.
+
+    Citations are packed in rank order (see :mod:`context_packer`); kept
+    sources keep their rank number so they match the sources footer.
+    """
     if not citations:
-        return "No relevant information found in the knowledge base."
+        return NO_CONTEXT_MESSAGE
 
+    budget = settings.CONTEXT_MAX_TOKENS if budget_tokens is None else budget_tokens
     ttl = settings.PROMPT_CACHE_TTL_SECONDS
     max_size = settings.PROMPT_CACHE_MAX
     cache_key = _hash_parts(
         "context",
+        str(budget),
         *[
             f"{c.chunk_id}|{c.file_name}|{c.page_number}|{c.section_path}|{c.chunk_text}"
             for c in citations
@@ -211,7 +233,7 @@ def _format_context_for_llm(citations: list[Citation]) -> str:
     if cached is not None:
         return cached
 
-    context_parts = []
+    headers = []
     for i, cit in enumerate(citations, 1):
         doc_name = cit.file_name.replace("+", " ").replace(".md", "").replace("_", " ")
 
@@ -221,13 +243,22 @@ def _format_context_for_llm(citations: list[Citation]) -> str:
         if cit.page_number:
             header_parts.append(f"Page: {cit.page_number}")
 
-        header = " | ".join(header_parts)
-
-        content = cit.chunk_text[:1500].strip()
+        headers.append(" | ".join(header_parts))
 
-        context_parts.append(f"{header}\n{content}")
+    packed = pack_passages(
+        [c.chunk_text for c in citations],
+        budget,
+        overhead_tokens=[count_tokens(h) + _CONTEXT_SEPARATOR_TOKENS for h in headers],
+        dedup_threshold=settings.CONTEXT_DEDUP_THRESHOLD,
+    )
+    if len(packed) < len(citations):
+        logger.debug("Context packed", kept=len(packed), total=len(citations), budget=budget)
+    if not packed:
+        logger.warning("Context budget exhausted; no passage fits", budget=budget)
 
-    context = "\n\n---\n\n".join(context_parts)
+    context = (
+        "\n\n---\n\n".join(f"{headers[i]}\n{text}" for i, text in packed) or NO_CONTEXT_MESSAGE
+    )
     _cache_set(_CONTEXT_CACHE, cache_key, context, max_size)
     return context
 
@@ -303,19 +334,46 @@ def _get_user_prompt(query: str, context: str, history: str) -> str:
     return prompt
 
 
+def _context_budget(system_prompt: str, query: str, history_text: str) -> int:
+    """Tokens left for retrieved context in the largest context window.
+
+    The window minus the system prompt, the user prompt without context
+    (query + history) and the output reserve, capped at CONTEXT_MAX_TOKENS.
+    """
+    window = max(settings.LLM_NUM_CTX_BUCKETS)
+    reserve = settings.LLM_OUTPUT_TOKENS + settings.LLM_THINKING_TOKENS
+    fixed = count_prompt_tokens(system_prompt, _get_user_prompt(query, "", history_text))
+    return max(0, min(settings.CONTEXT_MAX_TOKENS, window - fixed - reserve))
+
+
+def _build_rag_prompts(
+    query: str, citations: list[Citation], history: list
+) -> tuple[str, str, str]:
+    """Return (context, system_prompt, user_prompt) for a RAG answer."""
+    history_text = _format_history(history)
+    system_prompt = _get_system_prompt()
+    budget = _context_budget(system_prompt, query, history_text)
+    context = _format_context_for_llm(citations, budget)
+    user_prompt = _get_user_prompt(query, context, history_text)
+    return context, system_prompt, user_prompt
+
+
 async def _retrieve_and_rerank(
     query: str,
     use_reranker: bool = False,
+    embeddings: QueryEmbeddingContext | None = None,
 ) -> list[Citation]:
     """Retrieve documents and optionally rerank them."""
     retriever = HybridRetriever(include_toc=False)
 
     try:
-        nodes = await retriever.aretrieve(query)
+        query_bundle = QueryBundle(query)
+        if embeddings is not None:
+            query_bundle.embedding = await embeddings.query_embedding()
+        nodes = await retriever.aretrieve(query_bundle)
 
         if use_reranker and nodes:
-            reranker = LLMReranker()
-            reranker._semaphore = asyncio.Semaphore(1)
+            reranker = get_reranker(embeddings=embeddings)
             nodes = await reranker.rerank(query, nodes[:5])
         else:
             nodes = nodes[:5]
@@ -342,23 +400,36 @@ async def _retrieve_and_rerank(
 
 
 def _format_history(messages: list) -> str:
-    """Format conversation history for prompt injection."""
+    """Format conversation history for prompt injection.
+
+    Newest messages are kept first within HISTORY_MAX_TOKENS; each message is
+    trimmed at a sentence boundary to HISTORY_MESSAGE_MAX_TOKENS.
+    """
     if not messages:
         return ""
     ttl = settings.PROMPT_CACHE_TTL_SECONDS
     max_size = settings.PROMPT_CACHE_MAX
     cache_key = _hash_parts(
         "history",
-        *[f"{getattr(m.role, 'value', str(m.role))}:{(m.content or '')[:500]}" for m in messages],
+        f"{settings.HISTORY_MAX_TOKENS}|{settings.HISTORY_MESSAGE_MAX_TOKENS}",
+        *[f"{getattr(m.role, 'value', str(m.role))}:{m.content or ''}" for m in messages],
     )
     cached = _cache_get(_HISTORY_CACHE, cache_key, ttl)
     if cached is not None:
         return cached
-    lines = []
-    for msg in messages:
-        role = msg.role.value.capitalize() if hasattr(msg.role, "value") else str(msg.role)
-        content = msg.content[:500] if msg.content else ""
-        lines.append(f"{role}: {content}")
+    roles = [
+        msg.role.value.capitalize() if hasattr(msg.role, "value") else str(msg.role)
+        for msg in messages
+    ]
+    newest_first = [m.content or "" for m in reversed(messages)]
+    packed = pack_passages(
+        newest_first,
+        settings.HISTORY_MAX_TOKENS,
+        overhead_tokens=[count_tokens(r) + 2 for r in reversed(roles)],
+        max_passage_tokens=settings.HISTORY_MESSAGE_MAX_TOKENS,
+        dedup_threshold=None,
+    )
+    lines = [f"{roles[len(messages) - 1 - i]}: {text}" for i, text in reversed(packed)]
     history = "\n".join(lines)
     _cache_set(_HISTORY_CACHE, cache_key, history, max_size)
     return history
@@ -371,30 +442,28 @@ async def _fast_rag_response(
     model: str | None = None,
     system_prompt: str | None = None,
     user_prompt: str | None = None,
+    priority: Priority = Priority.INTERACTIVE,
 ) -> tuple[str, dict[str, int]]:
     """Single LLM call with retrieved context (default path).
 
     Returns (answer, token_usage).
     """
     if not citations:
-        return "No relevant information found in the knowledge base.", {
+        return NO_CONTEXT_MESSAGE, {
             "prompt_tokens": 0,
             "completion_tokens": 0,
             "total_tokens": 0,
         }
 
     if system_prompt is None or user_prompt is None:
-        context = _format_context_for_llm(citations)
-        history_text = _format_history(history or [])
-
-        system_prompt = _get_system_prompt()
-        user_prompt = _get_user_prompt(query, context, history_text)
+        _, system_prompt, user_prompt = _build_rag_prompts(query, citations, history or [])
 
-    thinking, content, usage = await ollama_chat_with_thinking(
+    thinking, content, usage = await cached_chat(
         system_prompt=system_prompt,
         user_message=user_prompt,
         think=True,
         model=model,
+        priority=priority,
     )
 
     answer = ""
@@ -413,6 +482,30 @@ async def _fast_rag_response(
     return answer, usage
 
 
+async def answer_for_cache(
+    query: str,
+    embeddings: QueryEmbeddingContext | None = None,
+    priority: Priority = Priority.BACKGROUND,
+) -> tuple[str, list[Citation]] | None:
+    """Answer ``query`` as the fast RAG path would in a new conversation.
+
+    Used to pre-populate the semantic cache. Returns (answer, citations), or
+    None when retrieval found nothing to answer from.
+    """
+    citations = await _retrieve_and_rerank(query, embeddings=embeddings)
+    if not citations:
+        return None
+    _, system_prompt, user_prompt = _build_rag_prompts(query, citations, [])
+    answer, _ = await _fast_rag_response(
+        query,
+        citations,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        priority=priority,
+    )
+    return answer, citations
+
+
 async def _agent_mode_response(
     query: str,
     session_id: str,
@@ -459,7 +552,7 @@ async def _agent_mode_response(
                 logger.exception("LLM generation failed; using fallback response")
                 fallback_answer = _fallback_rag_answer(fallback_citations)
             return fallback_answer, fallback_citations
-        return "No relevant information found in the knowledge base.", []
+        return NO_CONTEXT_MESSAGE, []
 
     return answer, tool_citations
 
@@ -493,8 +586,9 @@ async def _route_decision(
             memory=memory,
         )
 
+    embeddings = QueryEmbeddingContext(query)
     try:
-        in_scope, _ = await ScopeGate.is_in_scope(query)
+        in_scope, _ = await ScopeGate.is_in_scope(query, embeddings=embeddings)
     except Exception:
         logger.exception("Scope gate error, refusing query", session_id=session_id)
         in_scope = False
@@ -505,6 +599,7 @@ async def _route_decision(
             kind="scope_refusal",
             session_id=session_id,
             memory=memory,
+            embeddings=embeddings,
         )
 
     if use_agent_mode:
@@ -513,6 +608,7 @@ async def _route_decision(
             kind="agent",
             session_id=session_id,
             memory=memory,
+            embeddings=embeddings,
         )
 
     logger.info("Using Fast RAG Mode", session_id=session_id)
@@ -520,18 +616,19 @@ async def _route_decision(
         kind="rag",
         session_id=session_id,
         memory=memory,
+        embeddings=embeddings,
     )
 
 
-async def _prepare_rag(memory: ConversationMemory, query: str) -> RagPayload:
+async def _prepare_rag(
+    memory: ConversationMemory,
+    query: str,
+    embeddings: QueryEmbeddingContext | None = None,
+) -> RagPayload:
     """Prepare RAG inputs (retrieval + prompt rendering)."""
-    citations = await _retrieve_and_rerank(query, use_reranker=False)
+    citations = await _retrieve_and_rerank(query, use_reranker=False, embeddings=embeddings)
     history = await memory.get_history(limit=settings.CONVERSATION_HISTORY_LIMIT)
-    context = _format_context_for_llm(citations)
-    history_text = _format_history(history)
-
-    system_prompt = _get_system_prompt()
-    user_prompt = _get_user_prompt(query, context, history_text)
+    context, system_prompt, user_prompt = _build_rag_prompts(query, citations, history)
 
     return RagPayload(
         citations=citations,
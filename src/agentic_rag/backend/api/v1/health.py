@@ -8,8 +8,12 @@ import time
 import structlog
 from fastapi import APIRouter, Request
 
+from agentic_rag.backend.rag import semantic_cache
+from agentic_rag.backend.rag.semantic_l1 import SemanticL1
 from agentic_rag.core.config import settings
 from agentic_rag.core.health import check_all_services, get_overall_status
+from agentic_rag.core.llm_scheduler import get_scheduler
+from agentic_rag.core.ollama_router import get_router
 from agentic_rag.core.schemas import ModelInfo, ModelsListResponse
 
 logger = structlog.get_logger()
@@ -38,6 +42,10 @@ async def health_check(request: Request) -> dict:
     return {
         "status": overall,
         "services": services,
+        "llm_scheduler": get_scheduler().stats(),
+        "ollama_backends": get_router().stats(),
+        "semantic_cache_l1": SemanticL1.instance().stats(),
+        "semantic_cache_writes": semantic_cache.writer.stats(),
         "timestamp": int(time.time()),
     }
 
@@ -11,12 +11,15 @@ import structlog
 from agentic_rag.backend.api.v1.chat_service import (
     CLOSING_LINE,
     SCOPE_REFUSAL,
+    SHORT_REPLY_TOKENS,
     RouteDecision,
     _agent_mode_response,
     _fallback_rag_answer,
     _format_sources_footer,
     _prepare_rag,
 )
+from agentic_rag.backend.rag.generation_cache import cached_chat_stream
+from agentic_rag.backend.rag.query_embedding import QueryEmbeddingContext
 from agentic_rag.backend.rag.semantic_cache import lookup_cache, store_cache
 from agentic_rag.core.config import settings
 from agentic_rag.core.exceptions import DependencyUnavailable, IndexMismatchError
@@ -92,6 +95,7 @@ class StreamingRenderer:
                     query,
                     think=False,
                     model=self._model,
+                    output_tokens=SHORT_REPLY_TOKENS,
                 ):
                     if chunk.get("content"):
                         conv_answer += chunk["content"]
@@ -143,7 +147,8 @@ class StreamingRenderer:
 
         # --- RAG mode: real-time streaming from Ollama with thinking ---
 
-        cached = await lookup_cache(query)
+        embeddings = route.embeddings or QueryEmbeddingContext(query)
+        cached = await lookup_cache(query, embeddings=embeddings)
         if cached is not None:
             await memory.add_message("assistant", cached.answer)
             for idx, line in enumerate(cached.answer.split("\n")):
@@ -157,7 +162,7 @@ class StreamingRenderer:
         yield self._sse("<think>Searching documents...")
 
         try:
-            rag_payload = await _prepare_rag(memory, query)
+            rag_payload = await _prepare_rag(memory, query, embeddings=embeddings)
         except IndexMismatchError:
             msg = (
                 "Index embedding mismatch. Reindex documents or update "
@@ -192,7 +197,7 @@ class StreamingRenderer:
         stream_completed = False
 
         try:
-            async for chunk in ollama_chat_stream(
+            async for chunk in cached_chat_stream(
                 rag_payload.system_prompt,
                 rag_payload.user_prompt,
                 think=True,
@@ -222,7 +227,7 @@ class StreamingRenderer:
             full_answer += CLOSING_LINE
             stream_completed = True
             await memory.add_message("assistant", full_answer)
-            await store_cache(query, full_answer, rag_payload.citations)
+            await store_cache(query, full_answer, rag_payload.citations, embeddings=embeddings)
         except Exception:
             logger.exception("Streaming failed", session_id=route.session_id)
             if in_thinking:
@@ -7,16 +7,22 @@ from crewai import LLM, Agent
 from crewai.tools import BaseTool
 
 from agentic_rag.core.config import settings
+from agentic_rag.core.ollama_router import get_router
 from agentic_rag.core.prompts import PromptRegistry
 
 from .tools import DatabaseSearchTool, MemoryLookupTool
 
 
 def _get_llm(model_name: str | None = None) -> LLM:
-    """Lazy LLM initialization to avoid import-time errors."""
+    """Lazy LLM initialization to avoid import-time errors.
+
+    The replica is chosen by the Ollama router when the agent is built; the
+    crew's own calls are not routed per request.
+    """
+    model = model_name or settings.LLM_MODEL
     return LLM(
-        model=f"ollama/{model_name or settings.LLM_MODEL}",
-        base_url=settings.OLLAMA_BASE_URL,
+        model=f"ollama/{model}",
+        base_url=get_router().base_url(model),
         temperature=settings.LLM_TEMPERATURE,
     )
 
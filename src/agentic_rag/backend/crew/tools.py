@@ -6,10 +6,12 @@ import structlog
 from crewai.tools import BaseTool
 from pydantic import Field, PrivateAttr
 
-from agentic_rag.backend.rag.reranker import LLMReranker
+from agentic_rag.backend.rag.reranker import Reranker, get_reranker
 from agentic_rag.backend.rag.retriever import HybridRetriever
 from agentic_rag.core.citations import format_citations
 from agentic_rag.core.config import settings
+from agentic_rag.core.context_packer import NO_CONTEXT_MESSAGE, pack_passages
+from agentic_rag.core.llm_factory import count_tokens
 from agentic_rag.core.memory import ConversationMemory
 from agentic_rag.core.schemas import Citation
 
@@ -39,13 +41,9 @@ class DatabaseSearchTool(BaseTool):
     )
 
     _retriever: HybridRetriever = PrivateAttr(default_factory=HybridRetriever)
-    _reranker: LLMReranker = PrivateAttr(default_factory=LLMReranker)
+    _reranker: Reranker = PrivateAttr(default_factory=get_reranker)
     _last_citations: list[Citation] = PrivateAttr(default_factory=list)
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self._reranker._semaphore = asyncio.Semaphore(1)
-
     def get_last_citations(self) -> list[Citation]:
         """Return the most recent citations produced by this tool."""
         return list(self._last_citations)
@@ -64,24 +62,32 @@ class DatabaseSearchTool(BaseTool):
 
             if not citations:
                 logger.info("DatabaseSearchTool found no citations")
-                return "No relevant information found in the knowledge base."
+                return NO_CONTEXT_MESSAGE
 
             logger.info("DatabaseSearchTool citations", count=len(citations))
-            result_text = ""
+            headers = []
             for i, cit in enumerate(citations[:8]):
-                snippet = cit.chunk_text[:1000] + ("..." if len(cit.chunk_text) > 1000 else "")
                 page_str = f"Page {cit.page_number}" if cit.page_number is not None else "Page ?"
 
                 section_str = f"Section: {cit.section_path}\n" if cit.section_path else ""
 
-                result_text += (
+                headers.append(
                     f"--- Source {i + 1} ---\n"
                     f"ID: {cit.document_id}\n"
                     f"File: {cit.file_name} ({page_str})\n"
                     f"{section_str}"
-                    f"Content: {snippet}\n\n"
+                    "Content: "
                 )
-            return result_text
+
+            packed = pack_passages(
+                [c.chunk_text for c in citations[: len(headers)]],
+                settings.TOOL_CONTEXT_MAX_TOKENS,
+                overhead_tokens=[count_tokens(h) for h in headers],
+                dedup_threshold=settings.CONTEXT_DEDUP_THRESHOLD,
+            )
+            return "".join(f"{headers[i]}{snippet}\n\n" for i, snippet in packed) or (
+                NO_CONTEXT_MESSAGE
+            )
 
         except Exception as e:
             logger.error("Search tool failed", error=str(e))
@@ -1,5 +1,6 @@
 """FastAPI application entrypoint."""
 
+import asyncio
 import uuid
 from collections.abc import AsyncGenerator, Callable
 from contextlib import asynccontextmanager
@@ -10,11 +11,17 @@ from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from agentic_rag.backend.api.v1 import chat, health
+from agentic_rag.backend.rag import cache_janitor, semantic_cache, semantic_l1
+from agentic_rag.backend.rag.cross_encoder import CrossEncoderModel
+from agentic_rag.backend.rag.local_index import LocalVectorIndex
+from agentic_rag.core import ollama_client, pg_fastpath
 from agentic_rag.core.config import settings
+from agentic_rag.core.index_signature import ensure_active_partitions
 from agentic_rag.core.logging import setup_logging
 from agentic_rag.core.migrator import run_migrations
 from agentic_rag.core.observability import setup_observability
 from agentic_rag.core.prompts import PromptRegistry
+from agentic_rag.core.scope_gate import ScopeGate
 
 
 @asynccontextmanager
@@ -24,13 +31,41 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     setup_observability(app)
 
     await run_migrations()
+    await ensure_active_partitions()
 
     PromptRegistry.sync_to_phoenix(version_tag=settings.APP_VERSION)
 
+    if settings.VECTOR_BACKEND == "local":
+        await LocalVectorIndex.instance().load()
+
+    if settings.DB_FASTPATH_ENABLED:
+        await pg_fastpath.get_pool()
+
+    ollama_client.get_client()
+    await ScopeGate.warmup()
+
+    if settings.SEMANTIC_CACHE_ENABLED:
+        await semantic_l1.start_listener()
+        semantic_cache.writer.start()
+        semantic_cache.hit_writer.start()
+    cache_janitor.start_janitor()
+
+    if settings.RERANKER_BACKEND == "cross_encoder":
+        # Fail fast on missing model files instead of on the first request
+        await asyncio.to_thread(CrossEncoderModel.instance)
+
     app.state.ready = True
 
     yield
 
+    await cache_janitor.stop_janitor()
+    # Flush queued cache writes while the DB pool is still open
+    await semantic_cache.writer.stop()
+    await semantic_cache.hit_writer.stop()
+    await semantic_l1.stop_listener()
+    await ollama_client.close_client()
+    await pg_fastpath.close_pool()
+
 
 app = FastAPI(
     title="Agentic RAG API",
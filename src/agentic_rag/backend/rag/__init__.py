@@ -1,6 +1,15 @@
 """RAG retrieval and re-ranking pipeline components."""
 
-from .reranker import LLMReranker
+from .cascade import CascadeReranker
+from .cross_encoder import CrossEncoderReranker
+from .reranker import LLMReranker, Reranker, get_reranker
 from .retriever import HybridRetriever
 
-__all__ = ["HybridRetriever", "LLMReranker"]
+__all__ = [
+    "CascadeReranker",
+    "CrossEncoderReranker",
+    "HybridRetriever",
+    "LLMReranker",
+    "Reranker",
+    "get_reranker",
+]
@@ -0,0 +1,58 @@
+"""Periodic purge of expired cache rows.
+
+Expired semantic cache, rerank score and generation rows are already ignored
+by every lookup. Deleting them is only housekeeping, so it runs here every
+``CACHE_JANITOR_INTERVAL_SECONDS`` in the API process, not on each cache write.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import structlog
+
+from agentic_rag.backend.rag import generation_cache, rerank_cache, semantic_cache
+from agentic_rag.core.config import settings
+
+logger = structlog.get_logger()
+
+_task: asyncio.Task[None] | None = None
+
+
+async def purge_expired() -> dict[str, int]:
+    """Delete expired rows from every cache table; returns rows removed per table."""
+    removed = {
+        "semantic_cache": await semantic_cache.purge_expired(),
+        "rerank_scores": await rerank_cache.purge_expired(),
+        "generation_cache": await generation_cache.purge_expired(),
+    }
+    if any(removed.values()):
+        logger.info("Expired cache rows purged", **removed)
+    return removed
+
+
+async def _run() -> None:
+    while True:
+        await asyncio.sleep(settings.CACHE_JANITOR_INTERVAL_SECONDS)
+        try:
+            await purge_expired()
+        except Exception:
+            logger.exception("Cache janitor run failed")
+
+
+def start_janitor() -> None:
+    """Start the periodic purge (application startup)."""
+    global _task
+    if settings.CACHE_JANITOR_INTERVAL_SECONDS <= 0 or (_task is not None and not _task.done()):
+        return
+    _task = asyncio.create_task(_run())
+
+
+async def stop_janitor() -> None:
+    """Stop the periodic purge (application shutdown)."""
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    await asyncio.gather(_task, return_exceptions=True)
+    _task = None
@@ -0,0 +1,131 @@
+"""Cascade re-ranking: embedding similarity first, LLM only for hard queries.
+
+Tier 1 blends the cosine similarity between the query vector and each
+candidate's stored chunk embedding with its normalized RRF score. When the
+blended scores separate the kept ``top_n`` from the rest by at least
+``CASCADE_ESCALATION_MARGIN`` the tier-1 order is final; otherwise the
+candidates (in tier-1 order) are escalated to the LLM reranker.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import structlog
+from llama_index.core.schema import NodeWithScore
+
+from agentic_rag.backend.rag.query_embedding import QueryEmbeddingContext, get_query_embedding
+from agentic_rag.backend.rag.retriever import HybridRetriever
+from agentic_rag.core.config import settings
+from agentic_rag.core.exceptions import DependencyUnavailable
+
+logger = structlog.get_logger()
+
+# Process-wide counters behind the escalation rate reported per request
+_stats = {"requests": 0, "escalated": 0}
+_stats_lock = threading.Lock()
+
+
+def cascade_stats() -> dict[str, float]:
+    """Requests seen, how many escalated to the LLM tier, and the escalation rate."""
+    with _stats_lock:
+        requests, escalated = _stats["requests"], _stats["escalated"]
+    return {
+        "requests": requests,
+        "escalated": escalated,
+        "escalation_rate": round(escalated / requests, 4) if requests else 0.0,
+    }
+
+
+def _record(escalated: bool) -> dict[str, float]:
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["escalated"] += int(escalated)
+    return cascade_stats()
+
+
+def blend_scores(
+    query_vector: list[float],
+    candidate_vectors: np.ndarray,
+    rrf_scores: list[float],
+    weight: float,
+) -> np.ndarray:
+    """``weight * cosine + (1 - weight) * rrf / max(rrf)`` for each candidate."""
+    q = np.asarray(query_vector, dtype=np.float32)
+    q /= max(float(np.linalg.norm(q)), 1e-10)
+    norms = np.maximum(np.linalg.norm(candidate_vectors, axis=1), 1e-10)
+    cosine = np.clip((candidate_vectors @ q) / norms, 0.0, 1.0)
+    rrf = np.asarray(rrf_scores, dtype=np.float32)
+    rrf = rrf / max(float(rrf.max()), 1e-10)
+    blended: np.ndarray = weight * cosine + (1.0 - weight) * rrf
+    return blended
+
+
+class CascadeReranker:
+    """Embedding-similarity tier with escalation to the LLM reranker."""
+
+    def __init__(self, embeddings: QueryEmbeddingContext | None = None):
+        self.top_n = settings.TOP_K_RERANK
+        self.embeddings = embeddings
+        self._retriever = HybridRetriever()
+
+    async def _query_vector(self, query: str) -> list[float]:
+        if self.embeddings is not None:
+            return await self.embeddings.query_embedding()
+        return await get_query_embedding(query)
+
+    async def _escalate(self, query: str, nodes: list[NodeWithScore]) -> list[NodeWithScore]:
+        # Imported lazily: reranker.py builds this class in get_reranker().
+        from agentic_rag.backend.rag.reranker import LLMReranker
+
+        return await LLMReranker().rerank(query, nodes)
+
+    async def rerank(self, query: str, nodes: list[NodeWithScore]) -> list[NodeWithScore]:
+        """Re-rank nodes cheaply, escalating to the LLM only when the cut is ambiguous."""
+        if not nodes:
+            return []
+
+        candidates = nodes[: self.top_n * 2]
+        try:
+            query_vector = await self._query_vector(query)
+            stored = await self._retriever.fetch_embeddings([n.node.node_id for n in candidates])
+        except DependencyUnavailable as e:
+            logger.warning("Cascade tier-1 unavailable, escalating", error=str(e))
+            _record(escalated=True)
+            return await self._escalate(query, candidates)
+
+        # Candidates without a stored vector (e.g. deleted mid-request) score 0.
+        dim = len(query_vector)
+        matrix = np.zeros((len(candidates), dim), dtype=np.float32)
+        for i, n in enumerate(candidates):
+            vector = stored.get(n.node.node_id)
+            if vector is not None:
+                matrix[i] = vector
+        blended = blend_scores(
+            query_vector,
+            matrix,
+            [n.score or 0.0 for n in candidates],
+            settings.CASCADE_EMBED_WEIGHT,
+        )
+        order = np.argsort(-blended, kind="stable")
+        ranked = [candidates[i] for i in order]
+        for node, i in zip(ranked, order, strict=True):
+            node.score = float(blended[i])
+
+        margin = None
+        if len(ranked) > self.top_n:
+            margin = float(blended[order[self.top_n - 1]] - blended[order[self.top_n]])
+        escalated = margin is not None and margin < settings.CASCADE_ESCALATION_MARGIN
+        stats = _record(escalated)
+        logger.info(
+            "Cascade rerank",
+            candidates=len(candidates),
+            margin=round(margin, 4) if margin is not None else None,
+            escalated=escalated,
+            escalation_rate=stats["escalation_rate"],
+        )
+
+        if escalated:
+            return await self._escalate(query, ranked)
+        return ranked[: self.top_n]
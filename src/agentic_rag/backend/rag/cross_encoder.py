@@ -0,0 +1,146 @@
+"""CPU cross-encoder re-ranking (ONNX Runtime).
+
+Scores (query, passage) pairs with a small local cross-encoder exported to
+ONNX, e.g. a MiniLM/BGE reranker. The model directory must contain
+``model.onnx`` and ``tokenizer.json``; nothing is downloaded at runtime.
+Requires the ``rerank`` extra (onnxruntime + tokenizers).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import structlog
+from llama_index.core.schema import NodeWithScore
+
+from agentic_rag.core.config import settings
+from agentic_rag.core.exceptions import DependencyUnavailable
+
+logger = structlog.get_logger()
+
+
+class CrossEncoderModel:
+    """ONNX cross-encoder session plus tokenizer, loaded once per process."""
+
+    _instance: CrossEncoderModel | None = None
+    _load_error: DependencyUnavailable | None = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, model_dir: str | Path | None = None):
+        self.model_dir = Path(model_dir or settings.CROSS_ENCODER_MODEL_DIR)
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise DependencyUnavailable(
+                "cross_encoder",
+                "onnxruntime/tokenizers not installed (pip install 'agentic-rag[rerank]')",
+            ) from e
+
+        model_path = self.model_dir / "model.onnx"
+        tokenizer_path = self.model_dir / "tokenizer.json"
+        missing = [str(p) for p in (model_path, tokenizer_path) if not p.is_file()]
+        if missing:
+            raise DependencyUnavailable(
+                "cross_encoder", "model files not found", {"missing": missing}
+            )
+
+        try:
+            self.tokenizer = Tokenizer.from_file(str(tokenizer_path))
+            self.tokenizer.enable_truncation(
+                max_length=settings.CROSS_ENCODER_MAX_LENGTH, strategy="only_second"
+            )
+            if self.tokenizer.padding is None:
+                self.tokenizer.enable_padding()
+
+            options = ort.SessionOptions()
+            if settings.CROSS_ENCODER_THREADS > 0:
+                options.intra_op_num_threads = settings.CROSS_ENCODER_THREADS
+            self.session = ort.InferenceSession(
+                str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+            )
+            self._input_names = {i.name for i in self.session.get_inputs()}
+        except Exception as e:
+            # Corrupt/incompatible model or tokenizer files; onnxruntime and
+            # tokenizers raise their own exception types for these
+            raise DependencyUnavailable(
+                "cross_encoder",
+                "model failed to load",
+                {"model_dir": str(self.model_dir), "error": str(e)},
+            ) from e
+        logger.info("Cross-encoder loaded", model_dir=str(self.model_dir))
+
+    @classmethod
+    def instance(cls) -> CrossEncoderModel:
+        """Return the process-wide model, loading it on first use.
+
+        A failed load is remembered, so requests do not retry reading a
+        broken model; fixing the files needs a restart.
+        """
+        with cls._instance_lock:
+            if cls._load_error is not None:
+                raise cls._load_error
+            if cls._instance is None:
+                try:
+                    cls._instance = cls()
+                except DependencyUnavailable as e:
+                    cls._load_error = e
+                    raise
+            return cls._instance
+
+    def score(self, query: str, passages: list[str]) -> list[float]:
+        """Relevance of each passage to ``query`` in the 0-1 range (blocking)."""
+        scores: list[float] = []
+        batch_size = max(1, settings.CROSS_ENCODER_BATCH_SIZE)
+        for start in range(0, len(passages), batch_size):
+            batch = passages[start : start + batch_size]
+            encodings = self.tokenizer.encode_batch([(query, p) for p in batch])
+            feeds: dict[str, Any] = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            feeds = {k: v for k, v in feeds.items() if k in self._input_names}
+            logits = np.asarray(self.session.run(None, feeds)[0], dtype=np.float32)
+            if logits.ndim == 2 and logits.shape[1] == 2:
+                # Two-class head: relevance is the positive-vs-negative margin
+                logits = logits[:, 1] - logits[:, 0]
+            logits = logits.reshape(len(batch))
+            scores.extend((1.0 / (1.0 + np.exp(-logits))).tolist())
+        return scores
+
+
+class CrossEncoderReranker:
+    """Re-ranker backed by :class:`CrossEncoderModel`, run in a worker thread."""
+
+    def __init__(self, model: CrossEncoderModel | None = None):
+        self.model = model or CrossEncoderModel.instance()
+        self.top_n = settings.TOP_K_RERANK
+
+    async def rerank(self, query: str, nodes: list[NodeWithScore]) -> list[NodeWithScore]:
+        """Re-rank nodes by cross-encoder relevance; keeps retrieval order on failure."""
+        if not nodes:
+            return []
+
+        candidates = nodes[: self.top_n * 2]
+        passages = [n.node.get_content()[: settings.RERANKER_MAX_PASSAGE_CHARS] for n in candidates]
+        timeout = settings.RERANKER_TIMEOUT
+        try:
+            scores = await asyncio.wait_for(
+                asyncio.to_thread(self.model.score, query, passages), timeout=timeout
+            )
+        except TimeoutError:
+            logger.warning("Cross-encoder timed out, returning original order", timeout=timeout)
+            return nodes[: self.top_n]
+        except Exception as e:
+            logger.warning("Cross-encoder re-ranking failed", error=str(e))
+            return nodes[: self.top_n]
+
+        for node, score in zip(candidates, scores, strict=True):
+            node.score = score
+        candidates = sorted(candidates, key=lambda x: x.score or 0.0, reverse=True)
+        return candidates[: self.top_n]
@@ -0,0 +1,315 @@
+"""Exact-match cache for deterministic RAG generations.
+
+With ``LLM_TEMPERATURE=0`` the same rendered ``(system_prompt, user_prompt)``
+sent to the same model always yields the same answer, so it is generated once.
+Entries are keyed by a hash of the final rendered prompts, the model, the
+thinking flag and every setting that shapes the request (temperature and the
+num_ctx sizing), plus the active index signature. Editing a prompt template
+changes the rendered prompts and a reindex changes the signature, so stale
+answers are never served.
+
+An in-memory LRU answers repeats inside the process; the ``generation_cache``
+table (migrations/008) shares answers across workers and survives restarts.
+Both tiers are best-effort: failures are logged and treated as misses.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+from sqlalchemy import text
+
+from agentic_rag.core import pg_fastpath
+from agentic_rag.core.config import settings
+from agentic_rag.core.database import AsyncSessionLocal
+from agentic_rag.core.index_signature import active_index_signature
+from agentic_rag.core.llm_factory import ollama_chat_stream, ollama_chat_with_thinking
+from agentic_rag.core.llm_scheduler import Priority
+from agentic_rag.core.pg_fastpath import DB_ERRORS
+
+logger = structlog.get_logger()
+
+# Characters per replayed SSE chunk (roughly a few tokens, like a live stream)
+REPLAY_CHUNK_CHARS = 32
+
+
+@dataclass
+class CachedGeneration:
+    """One stored model reply."""
+
+    thinking: str
+    content: str
+    usage: dict[str, int] = field(default_factory=dict)
+
+
+# prompt_hash -> (generation, stored_at)
+_memory: OrderedDict[str, tuple[CachedGeneration, float]] = OrderedDict()
+_lock = threading.Lock()
+
+_SELECT_SQL = text("""
+    SELECT thinking, content, prompt_tokens, completion_tokens
+    FROM generation_cache
+    WHERE prompt_hash = :prompt_hash
+      AND expires_at > NOW()
+""")
+
+_DELETE_EXPIRED_SQL = text("DELETE FROM generation_cache WHERE expires_at <= NOW()")
+
+_UPSERT_SQL = text("""
+    INSERT INTO generation_cache (
+        prompt_hash, index_signature, model, thinking, content,
+        prompt_tokens, completion_tokens, expires_at
+    )
+    VALUES (
+        :prompt_hash, :index_signature, :model, :thinking, :content,
+        :prompt_tokens, :completion_tokens,
+        NOW() + CAST(:ttl_seconds AS INTEGER) * INTERVAL '1 second'
+    )
+    ON CONFLICT (prompt_hash)
+    DO UPDATE SET
+        thinking = EXCLUDED.thinking,
+        content = EXCLUDED.content,
+        prompt_tokens = EXCLUDED.prompt_tokens,
+        completion_tokens = EXCLUDED.completion_tokens,
+        expires_at = EXCLUDED.expires_at
+""")
+
+
+def enabled() -> bool:
+    """Caching only makes sense for deterministic (temperature 0) decoding."""
+    return settings.GENERATION_CACHE_ENABLED and settings.LLM_TEMPERATURE == 0
+
+
+def generation_key(system_prompt: str, user_prompt: str, model: str, think: bool) -> str:
+    """Hash of everything that determines the model's reply."""
+    material = "\x1f".join(
+        [
+            active_index_signature(),
+            model,
+            str(think),
+            str(settings.LLM_TEMPERATURE),
+            ",".join(str(b) for b in settings.LLM_NUM_CTX_BUCKETS),
+            str(settings.LLM_OUTPUT_TOKENS),
+            str(settings.LLM_THINKING_TOKENS),
+            system_prompt,
+            user_prompt,
+        ]
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def clear_memory() -> None:
+    """Drop the in-process tier (the table is left untouched)."""
+    with _lock:
+        _memory.clear()
+
+
+def _memory_get(key: str) -> CachedGeneration | None:
+    ttl = settings.GENERATION_CACHE_TTL
+    if ttl <= 0:
+        return None
+    with _lock:
+        cached = _memory.get(key)
+        if cached is None:
+            return None
+        generation, stored_at = cached
+        if (time.monotonic() - stored_at) > ttl:
+            _memory.pop(key, None)
+            return None
+        _memory.move_to_end(key)
+        return generation
+
+
+def _memory_put(key: str, generation: CachedGeneration) -> None:
+    if settings.GENERATION_CACHE_TTL <= 0:
+        return
+    with _lock:
+        _memory[key] = (generation, time.monotonic())
+        _memory.move_to_end(key)
+        while len(_memory) > settings.GENERATION_CACHE_MAX:
+            _memory.popitem(last=False)
+
+
+def _usage(prompt_tokens: int, completion_tokens: int) -> dict[str, int]:
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+async def get_generation(key: str) -> CachedGeneration | None:
+    """Return the cached reply for ``key``, or None on a miss."""
+    generation = _memory_get(key)
+    if generation is not None or not settings.GENERATION_CACHE_PERSIST:
+        return generation
+
+    params = {"prompt_hash": key}
+    row: Any
+    try:
+        if settings.DB_FASTPATH_ENABLED:
+            rows = await pg_fastpath.fetch(_SELECT_SQL.text, params)
+            row = rows[0] if rows else None
+        else:
+            async with AsyncSessionLocal() as session:
+                row = (await session.execute(_SELECT_SQL, params)).first()
+    except DB_ERRORS as e:
+        logger.warning("Generation cache lookup failed", error=str(e))
+        return None
+    if row is None:
+        return None
+
+    generation = CachedGeneration(
+        thinking=row.thinking,
+        content=row.content,
+        usage=_usage(row.prompt_tokens, row.completion_tokens),
+    )
+    _memory_put(key, generation)
+    return generation
+
+
+async def put_generation(key: str, model: str, generation: CachedGeneration) -> None:
+    """Store a completed reply in both tiers."""
+    if not generation.content.strip():
+        return
+    _memory_put(key, generation)
+    ttl = settings.GENERATION_CACHE_DB_TTL_SECONDS
+    if not settings.GENERATION_CACHE_PERSIST or ttl <= 0:
+        return
+
+    params: dict[str, Any] = {
+        "prompt_hash": key,
+        "index_signature": active_index_signature(),
+        "model": model,
+        "thinking": generation.thinking,
+        "content": generation.content,
+        "prompt_tokens": int(generation.usage.get("prompt_tokens", 0)),
+        "completion_tokens": int(generation.usage.get("completion_tokens", 0)),
+        "ttl_seconds": ttl,
+    }
+    try:
+        if settings.DB_FASTPATH_ENABLED:
+            async with pg_fastpath.connection() as conn:
+                await conn.execute(_UPSERT_SQL.text, params)
+        else:
+            async with AsyncSessionLocal() as session:
+                await session.execute(_UPSERT_SQL, params)
+                await session.commit()
+    except DB_ERRORS as e:
+        logger.warning("Failed to store generation", error=str(e))
+
+
+async def cached_chat(
+    system_prompt: str,
+    user_message: str,
+    think: bool = True,
+    model: str | None = None,
+    priority: Priority = Priority.INTERACTIVE,
+) -> tuple[str, str, dict[str, int]]:
+    """:func:`ollama_chat_with_thinking` behind the generation cache."""
+    model = model or settings.LLM_MODEL
+    if not enabled():
+        return await ollama_chat_with_thinking(
+            system_prompt, user_message, think=think, model=model, priority=priority
+        )
+
+    key = generation_key(system_prompt, user_message, model, think)
+    cached = await get_generation(key)
+    if cached is not None:
+        logger.info("Generation cache hit", model=model)
+        return cached.thinking, cached.content, dict(cached.usage)
+
+    thinking, content, usage = await ollama_chat_with_thinking(
+        system_prompt, user_message, think=think, model=model, priority=priority
+    )
+    await put_generation(key, model, CachedGeneration(thinking, content, usage))
+    return thinking, content, usage
+
+
+def _pieces(value: str, size: int = REPLAY_CHUNK_CHARS) -> list[str]:
+    return [value[i : i + size] for i in range(0, len(value), size)]
+
+
+async def replay(generation: CachedGeneration) -> AsyncGenerator[dict, None]:
+    """Yield a cached reply in the chunk shape of :func:`ollama_chat_stream`."""
+    for piece in _pieces(generation.thinking):
+        yield {"thinking": piece, "content": None, "done": False}
+    for piece in _pieces(generation.content):
+        yield {"thinking": None, "content": piece, "done": False}
+    yield {"thinking": None, "content": None, "done": True, "usage": dict(generation.usage)}
+
+
+async def cached_chat_stream(
+    system_prompt: str,
+    user_message: str,
+    think: bool = True,
+    model: str | None = None,
+    priority: Priority = Priority.INTERACTIVE,
+) -> AsyncGenerator[dict, None]:
+    """:func:`ollama_chat_stream` behind the generation cache.
+
+    A hit is replayed without touching Ollama. A miss is streamed live and
+    stored only once Ollama reports ``done``, so an aborted stream never
+    caches a truncated answer. The final chunk is held back until the Ollama
+    stream has closed (releasing its scheduler slot and connection) and the
+    entry is stored, because callers stop iterating at ``done``.
+    """
+    model = model or settings.LLM_MODEL
+    if not enabled():
+        async for chunk in ollama_chat_stream(
+            system_prompt, user_message, think=think, model=model, priority=priority
+        ):
+            yield chunk
+        return
+
+    key = generation_key(system_prompt, user_message, model, think)
+    cached = await get_generation(key)
+    if cached is not None:
+        logger.info("Generation cache hit", model=model, stream=True)
+        async for chunk in replay(cached):
+            yield chunk
+        return
+
+    thinking: list[str] = []
+    content: list[str] = []
+    final: dict | None = None
+    async for chunk in ollama_chat_stream(
+        system_prompt, user_message, think=think, model=model, priority=priority
+    ):
+        if chunk.get("thinking"):
+            thinking.append(chunk["thinking"])
+        if chunk.get("content"):
+            content.append(chunk["content"])
+        if chunk.get("done"):
+            final = chunk
+            continue
+        yield chunk
+
+    if final is None:
+        return
+    usage = final.get("usage") or _usage(0, 0)
+    await put_generation(key, model, CachedGeneration("".join(thinking), "".join(content), usage))
+    yield final
+
+
+async def purge_expired() -> int:
+    """Delete expired rows (run by the cache janitor)."""
+    try:
+        if settings.DB_FASTPATH_ENABLED:
+            async with pg_fastpath.connection() as conn:
+                status = await conn.execute(_DELETE_EXPIRED_SQL.text)
+            return int(status.split()[-1])
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(_DELETE_EXPIRED_SQL)
+            await session.commit()
+            return int(getattr(result, "rowcount", 0) or 0)
+    except DB_ERRORS as e:
+        logger.warning("Expired row purge failed", table="generation_cache", error=str(e))
+        return 0
@@ -11,6 +11,7 @@ from sqlalchemy import text
 from agentic_rag.core.config import settings
 from agentic_rag.core.database import AsyncSessionLocal
 from agentic_rag.core.exceptions import IndexMismatchError
+from agentic_rag.core.index_signature import active_index_signature
 
 logger = structlog.get_logger()
 
@@ -33,6 +34,8 @@ async def ensure_index_compatible() -> None:
 
     If the DB contains chunks but none match the current
     (index_version, embedding_model, embedding_dimension), raise IndexMismatchError.
+    The common case only probes the active partition; other signatures are
+    listed only when building the mismatch error.
     """
     global _last_check, _last_ok, _last_error
     now = time.monotonic()
@@ -46,6 +49,13 @@ async def ensure_index_compatible() -> None:
     _last_ok = False
     _last_error = None
 
+    probe_stmt = text(
+        """
+        SELECT
+          EXISTS (SELECT 1 FROM chunks WHERE index_signature = :index_signature) AS active,
+          EXISTS (SELECT 1 FROM chunks) AS any_rows
+        """
+    )
     stmt = text(
         """
         SELECT embedding_model, embedding_dimension, index_version, COUNT(*) AS count
@@ -55,24 +65,19 @@ async def ensure_index_compatible() -> None:
     )
 
     async with AsyncSessionLocal() as session:
+        probe = (
+            await session.execute(probe_stmt, {"index_signature": active_index_signature()})
+        ).one()
+        if probe.active or not probe.any_rows:
+            # Active partition is populated, or the index is empty (retrieval
+            # will simply return no results).
+            _last_ok = True
+            return
         result = await session.execute(stmt)
         rows = result.mappings().all()
 
-    if not rows:
-        # Empty index is fine — retrieval will simply return no results.
-        _last_ok = True
-        return
-
     expected = _expected_signature()
-    matches = [
-        r
-        for r in rows
-        if r.get("embedding_model") == expected["embedding_model"]
-        and r.get("embedding_dimension") == expected["embedding_dimension"]
-        and r.get("index_version") == expected["index_version"]
-    ]
-
-    if not matches:
+    if rows:
         details = {
             "expected": expected,
             "available": [
@@ -93,11 +98,4 @@ async def ensure_index_compatible() -> None:
         _last_error = err
         raise err
 
-    if len(rows) > 1:
-        logger.warning(
-            "Multiple embedding configurations found in index",
-            expected=expected,
-            available=len(rows),
-        )
-
     _last_ok = True
@@ -0,0 +1,555 @@
+"""In-process memory-mapped vector index (alternative to pgvector HNSW).
+
+For small and mid-sized corpora a vectorized brute-force scan over one
+normalized embedding matrix is faster than an HNSW query plus a connection
+round trip. The matrix for the active (index_version, embedding_model,
+embedding_dimension) signature is persisted under ``LOCAL_INDEX_DIR`` as a
+raw memmap so restarts only need an incremental refresh.
+
+Searches run in worker threads and read one immutable snapshot. Refreshes
+and rebuilds assemble a new snapshot off the event loop and swap it in with
+a single attribute assignment.
+
+Worker processes share the directory. Refreshes hold an exclusive ``flock``
+on ``index.lock`` and first adopt whatever another process published. Vector
+files are append-only: a rebuild writes a new ``vectors-<id>.bin`` and the
+manifest switches to it, so bytes another process has mapped never change.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import structlog
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from agentic_rag.core.config import settings
+from agentic_rag.core.database import AsyncSessionLocal
+from agentic_rag.core.exceptions import DependencyUnavailable
+from agentic_rag.core.index_signature import active_index_signature
+
+logger = structlog.get_logger()
+
+# Rows scored per block; bounds the float32 upcast of a float16 matrix.
+_SCORE_BLOCK_ROWS = 8192
+_KMEANS_ITERATIONS = 10
+_KMEANS_SAMPLE = 20_000
+_LOCK_FILE = "index.lock"
+
+
+@dataclass(frozen=True, slots=True)
+class LocalHit:
+    """A vector-search hit from the local index (ids only; bodies come from Postgres)."""
+
+    id: str
+    document_id: str
+    similarity: float
+
+
+@dataclass(frozen=True, slots=True)
+class _Snapshot:
+    """One consistent view of the index; replaced wholesale, never mutated."""
+
+    matrix: np.ndarray
+    ids: tuple[str, ...]
+    doc_ids: tuple[str, ...]
+    content_mask: np.ndarray
+    centroids: np.ndarray | None
+    assignments: np.ndarray
+    watermark: datetime | None
+    # Sum of Postgres hashtext(id) over the indexed rows. Compared with the
+    # table to catch deletes/replacements that leave the row count unchanged.
+    checksum: int
+    vectors_file: str
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def version(self) -> tuple[str, int, int]:
+        return self.vectors_file, self.size, self.checksum
+
+
+@dataclass(frozen=True, slots=True)
+class _Batch:
+    """Rows already written to a vectors file but not yet published."""
+
+    ids: list[str]
+    doc_ids: list[str]
+    content: np.ndarray
+    checksum: int
+    watermark: datetime
+
+
+def _signature() -> dict[str, Any]:
+    return {
+        "index_version": settings.INDEX_VERSION,
+        "embedding_model": settings.EMBEDDING_MODEL,
+        "embedding_dimension": settings.EMBEDDING_DIMENSION,
+    }
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    normalized: np.ndarray = matrix / np.maximum(norms, 1e-10)
+    return normalized
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _save_atomic(path: Path, array: np.ndarray) -> None:
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with tmp.open("wb") as fh:
+        np.save(fh, array)
+    os.replace(tmp, path)
+
+
+class LocalVectorIndex:
+    """Cosine top-k over a memory-mapped, pre-normalized embedding matrix.
+
+    With ``LOCAL_INDEX_IVF_LISTS > 0`` rows are also assigned to spherical
+    k-means partitions and queries only scan the ``LOCAL_INDEX_IVF_PROBES``
+    closest partitions.
+    """
+
+    _instance: LocalVectorIndex | None = None
+
+    def __init__(self, root: Path | None = None):
+        signature = _signature()
+        digest = hashlib.sha256(json.dumps(signature, sort_keys=True).encode()).hexdigest()[:16]
+        self.signature = signature
+        self.dtype = np.dtype(settings.LOCAL_INDEX_DTYPE)
+        self.dim = settings.EMBEDDING_DIMENSION
+        self.path = (root or Path(settings.LOCAL_INDEX_DIR)) / digest
+
+        self._snapshot: _Snapshot | None = None
+        self._last_refresh = 0.0
+        self._lock: asyncio.Lock | None = None
+
+    @classmethod
+    def instance(cls) -> LocalVectorIndex:
+        """Return the process-wide index for the configured signature."""
+        if cls._instance is None or cls._instance.signature != _signature():
+            cls._instance = cls()
+        return cls._instance
+
+    @property
+    def size(self) -> int:
+        return self._snapshot.size if self._snapshot is not None else 0
+
+    # ------------------------------------------------------------------ loading
+
+    async def load(self) -> None:
+        """Open the on-disk index if it matches, otherwise rebuild it from Postgres."""
+        async with self._get_lock():
+            await self._refresh_locked()
+
+    async def ensure_fresh(self) -> None:
+        """Pick up newly ingested chunks at most every ``LOCAL_INDEX_REFRESH_SECONDS``.
+
+        Requests arriving while a refresh is running search the current
+        snapshot instead of waiting for it.
+        """
+        if self._snapshot is None:
+            await self.load()
+            return
+        if (time.monotonic() - self._last_refresh) < settings.LOCAL_INDEX_REFRESH_SECONDS:
+            return
+        lock = self._get_lock()
+        if lock.locked():
+            return
+        async with lock:
+            await self._refresh_locked()
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    @asynccontextmanager
+    async def _dir_lock(self) -> AsyncIterator[None]:
+        """Exclusive lock on the index directory, shared by all worker processes."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path / _LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            await asyncio.to_thread(fcntl.flock, fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # also releases the flock
+
+    def _empty(self, vectors_file: str) -> _Snapshot:
+        return _Snapshot(
+            matrix=np.zeros((0, self.dim), dtype=self.dtype),
+            ids=(),
+            doc_ids=(),
+            content_mask=np.zeros(0, dtype=bool),
+            centroids=None,
+            assignments=np.zeros(0, dtype=np.int32),
+            watermark=None,
+            checksum=0,
+            vectors_file=vectors_file,
+        )
+
+    def _read_manifest(self) -> dict[str, Any] | None:
+        try:
+            manifest: dict[str, Any] = json.loads((self.path / "manifest.json").read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Local vector index manifest unreadable", error=str(e))
+            return None
+        if (
+            manifest.get("signature") != self.signature
+            or manifest.get("dtype") != self.dtype.name
+            or manifest.get("ivf_lists") != settings.LOCAL_INDEX_IVF_LISTS
+            or "vectors_file" not in manifest
+        ):
+            return None
+        return manifest
+
+    def _current_from_disk(self) -> _Snapshot | None:
+        """The published snapshot, reusing ours when nobody else changed it.
+
+        Called with the directory lock held. Returns None when there is no
+        usable index on disk.
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            return None
+        version = (manifest["vectors_file"], manifest["count"], manifest["checksum"])
+        if self._snapshot is not None and self._snapshot.version == version:
+            return self._snapshot
+        try:
+            rows = json.loads((self.path / f"rows-{manifest['vectors_file']}.json").read_text())
+            if len(rows) != manifest["count"]:
+                raise ValueError("row list does not match manifest")
+            centroids: np.ndarray | None = None
+            assignments = np.zeros(0, dtype=np.int32)
+            if settings.LOCAL_INDEX_IVF_LISTS > 0 and (self.path / "centroids.npy").exists():
+                centroids = np.load(self.path / "centroids.npy")
+                assignments = np.load(self.path / "assignments.npy")
+                if len(assignments) != len(rows):
+                    raise ValueError("partition assignments do not match manifest")
+            snapshot = _Snapshot(
+                matrix=self._map_matrix(manifest["vectors_file"], len(rows)),
+                ids=tuple(r[0] for r in rows),
+                doc_ids=tuple(r[1] for r in rows),
+                content_mask=np.array([bool(r[2]) for r in rows], dtype=bool),
+                centroids=centroids,
+                assignments=assignments,
+                watermark=(
+                    datetime.fromisoformat(manifest["watermark"])
+                    if manifest.get("watermark")
+                    else None
+                ),
+                checksum=int(manifest["checksum"]),
+                vectors_file=manifest["vectors_file"],
+            )
+        except Exception as e:
+            logger.warning("Local vector index unreadable; rebuilding", error=str(e))
+            return None
+        logger.info("Local vector index opened", rows=snapshot.size, path=str(self.path))
+        return snapshot
+
+    def _map_matrix(self, vectors_file: str, rows: int) -> np.ndarray:
+        if not rows:
+            return np.zeros((0, self.dim), dtype=self.dtype)
+        return np.memmap(
+            self.path / vectors_file,
+            dtype=self.dtype,
+            mode="r",
+            shape=(rows, self.dim),
+        )
+
+    async def _rebuild(self) -> None:
+        """Build a fresh index for the active signature from all stored chunks.
+
+        Vectors go to a new file; searches here and in other processes keep
+        reading their old mapping until they pick up the new manifest.
+        """
+        started = time.perf_counter()
+        vectors_file = f"vectors-{uuid.uuid4().hex[:12]}.bin"
+        (self.path / vectors_file).write_bytes(b"")
+        base = self._empty(vectors_file)
+        batches = await self._load_batches(base, since=None)
+        self._snapshot = await asyncio.to_thread(self._publish, base, batches, True)
+        await asyncio.to_thread(self._remove_stale_files, vectors_file)
+        logger.info(
+            "Local vector index built",
+            rows=self.size,
+            seconds=round(time.perf_counter() - started, 3),
+        )
+
+    def _remove_stale_files(self, keep: str) -> None:
+        # Unlinking is safe for processes that still map an old file
+        stale = [*self.path.glob("vectors-*.bin"), *self.path.glob("rows-vectors-*.json")]
+        for path in stale:
+            if keep not in path.name:
+                path.unlink(missing_ok=True)
+        for legacy in ("vectors.bin", "vectors.next.bin", "rows.json"):
+            (self.path / legacy).unlink(missing_ok=True)
+
+    async def _db_marker(self, watermark: datetime | None) -> Any:
+        """Row count, plus count and id checksum of rows at/before ``watermark``."""
+        stmt = text("""
+            SELECT COUNT(*) AS count,
+                   COUNT(*) FILTER (WHERE created_at <= :watermark) AS indexed_count,
+                   COALESCE(
+                       SUM(hashtext(id::text)) FILTER (WHERE created_at <= :watermark), 0
+                   ) AS indexed_checksum
+            FROM chunks
+            WHERE index_signature = :index_signature
+        """)
+        params = {"index_signature": active_index_signature(), "watermark": watermark}
+        try:
+            async with AsyncSessionLocal() as session:
+                return (await session.execute(stmt, params)).one()
+        except SQLAlchemyError as e:
+            raise DependencyUnavailable(
+                "database", "local index refresh failed", {"error": str(e)}
+            ) from e
+
+    async def _refresh_locked(self) -> None:
+        self._last_refresh = time.monotonic()
+        async with self._dir_lock():
+            base = await asyncio.to_thread(self._current_from_disk)
+            if base is None:
+                await self._rebuild()
+                return
+            self._snapshot = base
+            marker = await self._db_marker(base.watermark)
+
+            if (marker.indexed_count, int(marker.indexed_checksum)) != (base.size, base.checksum):
+                # Indexed rows were deleted or replaced (e.g. a re-ingested document)
+                logger.info(
+                    "Local vector index out of sync; rebuilding", db=marker.count, local=base.size
+                )
+                await self._rebuild()
+                return
+            if marker.count == base.size:
+                return
+
+            batches = await self._load_batches(base, since=base.watermark)
+            if not batches:
+                return
+            self._snapshot = await asyncio.to_thread(self._publish, base, batches, False)
+            logger.info("Local vector index refreshed", added=self.size - base.size, rows=self.size)
+
+    async def _load_batches(self, base: _Snapshot, since: datetime | None) -> list[_Batch]:
+        """Stream rows created after ``since`` into ``base``'s vectors file, past its rows."""
+        since_filter = "AND created_at > :since" if since is not None else ""
+        stmt = text(f"""
+            SELECT id, document_id, embedding, created_at, is_toc, is_front_matter,
+                   hashtext(id::text) AS id_hash
+            FROM chunks
+            WHERE index_signature = :index_signature
+              {since_filter}
+            ORDER BY created_at, id
+        """).columns(embedding=Vector(self.dim))
+        params: dict[str, Any] = {"index_signature": active_index_signature()}
+        if since is not None:
+            params["since"] = since
+
+        target = self.path / base.vectors_file
+        row = base.size
+        batches: list[_Batch] = []
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.stream(stmt, params)
+                async for partition in result.partitions(2048):
+                    batch = await asyncio.to_thread(self._write_batch, target, row, partition)
+                    batches.append(batch)
+                    row += len(batch.ids)
+        except SQLAlchemyError as e:
+            raise DependencyUnavailable(
+                "database", "local index load failed", {"error": str(e)}
+            ) from e
+        return batches
+
+    def _write_batch(self, target: Path, start_row: int, rows: Sequence[Any]) -> _Batch:
+        """Write ``rows`` at row offset ``start_row``.
+
+        Bytes past the published rows belong to no snapshot (e.g. left by a
+        refresh that failed before publishing), so they are overwritten in
+        place instead of truncating a file other processes may have mapped.
+        """
+        vectors = _normalize(np.asarray([r.embedding for r in rows], dtype=np.float32))
+        with open(target, "r+b") as f:
+            f.seek(start_row * self.dim * self.dtype.itemsize)
+            f.write(vectors.astype(self.dtype).tobytes())
+        return _Batch(
+            ids=[str(r.id) for r in rows],
+            doc_ids=[str(r.document_id) for r in rows],
+            content=np.array([not (r.is_toc or r.is_front_matter) for r in rows], dtype=bool),
+            checksum=sum(int(r.id_hash) for r in rows),
+            watermark=max(r.created_at for r in rows),
+        )
+
+    def _publish(self, base: _Snapshot, batches: list[_Batch], rebuild: bool) -> _Snapshot:
+        """Persist and return the snapshot ``base`` + ``batches`` (runs in a worker thread)."""
+        ids = base.ids + tuple(i for b in batches for i in b.ids)
+        matrix = self._map_matrix(base.vectors_file, len(ids))
+        watermarks = [b.watermark for b in batches]
+        if base.watermark is not None:
+            watermarks.append(base.watermark)
+
+        centroids, assignments = base.centroids, base.assignments
+        if rebuild and settings.LOCAL_INDEX_IVF_LISTS > 0 and len(ids):
+            centroids, assignments = _train_ivf(matrix)
+        elif centroids is not None and len(ids) > base.size:
+            assignments = np.concatenate([assignments, _assign_rows(centroids, matrix, base.size)])
+
+        snapshot = _Snapshot(
+            matrix=matrix,
+            ids=ids,
+            doc_ids=base.doc_ids + tuple(d for b in batches for d in b.doc_ids),
+            content_mask=np.concatenate([base.content_mask, *(b.content for b in batches)]),
+            centroids=centroids,
+            assignments=assignments,
+            watermark=max(watermarks) if watermarks else None,
+            checksum=base.checksum + sum(b.checksum for b in batches),
+            vectors_file=base.vectors_file,
+        )
+        self._write_manifest(snapshot)
+        return snapshot
+
+    def _write_manifest(self, snapshot: _Snapshot) -> None:
+        """Write side files first and the manifest last, each by atomic rename."""
+        rows = [
+            [cid, did, bool(c)]
+            for cid, did, c in zip(
+                snapshot.ids, snapshot.doc_ids, snapshot.content_mask, strict=True
+            )
+        ]
+        rows_path = self.path / f"rows-{snapshot.vectors_file}.json"
+        _write_atomic(rows_path, json.dumps(rows).encode())
+        if snapshot.centroids is not None:
+            _save_atomic(self.path / "centroids.npy", snapshot.centroids)
+            _save_atomic(self.path / "assignments.npy", snapshot.assignments)
+        else:
+            (self.path / "centroids.npy").unlink(missing_ok=True)
+            (self.path / "assignments.npy").unlink(missing_ok=True)
+        manifest = {
+            "signature": self.signature,
+            "dtype": self.dtype.name,
+            "ivf_lists": settings.LOCAL_INDEX_IVF_LISTS,
+            "vectors_file": snapshot.vectors_file,
+            "count": snapshot.size,
+            "checksum": snapshot.checksum,
+            "watermark": snapshot.watermark.isoformat() if snapshot.watermark else None,
+        }
+        _write_atomic(self.path / "manifest.json", json.dumps(manifest).encode())
+
+    # ------------------------------------------------------------------- search
+
+    def search(
+        self,
+        embedding: list[float] | np.ndarray,
+        k: int,
+        include_toc: bool = False,
+        min_similarity: float | None = None,
+    ) -> list[LocalHit]:
+        """Return the top-``k`` hits by cosine similarity, best first."""
+        snap = self._snapshot
+        if snap is None or not snap.size or k <= 0:
+            return []
+        query = _normalize(np.asarray(embedding, dtype=np.float32))
+
+        candidates: np.ndarray | None = None
+        if snap.centroids is not None:
+            n_probe = min(settings.LOCAL_INDEX_IVF_PROBES, len(snap.centroids))
+            probes = np.argpartition(-(snap.centroids @ query), n_probe - 1)[:n_probe]
+            candidates = np.flatnonzero(np.isin(snap.assignments, probes))
+        if not include_toc:
+            content = np.flatnonzero(snap.content_mask)
+            candidates = content if candidates is None else np.intersect1d(candidates, content)
+
+        if candidates is None:
+            scores = np.concatenate(
+                [
+                    np.asarray(snap.matrix[i : i + _SCORE_BLOCK_ROWS], np.float32) @ query
+                    for i in range(0, snap.size, _SCORE_BLOCK_ROWS)
+                ]
+            )
+            row_idx = np.arange(snap.size)
+        else:
+            if not len(candidates):
+                return []
+            scores = np.concatenate(
+                [
+                    np.asarray(snap.matrix[candidates[i : i + _SCORE_BLOCK_ROWS]], np.float32)
+                    @ query
+                    for i in range(0, len(candidates), _SCORE_BLOCK_ROWS)
+                ]
+            )
+            row_idx = candidates
+
+        if min_similarity is not None:
+            keep = scores >= min_similarity
+            scores, row_idx = scores[keep], row_idx[keep]
+        if not len(scores):
+            return []
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            LocalHit(
+                id=snap.ids[row_idx[i]],
+                document_id=snap.doc_ids[row_idx[i]],
+                similarity=float(scores[i]),
+            )
+            for i in top
+        ]
+
+
+# ------------------------------------------------------------------------- IVF
+
+
+def _train_ivf(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means over (a sample of) the matrix; returns centroids and assignments."""
+    size = len(matrix)
+    n_lists = min(settings.LOCAL_INDEX_IVF_LISTS, size)
+    rng = np.random.default_rng(0)
+    sample_idx = rng.choice(size, size=min(size, _KMEANS_SAMPLE), replace=False)
+    sample = np.asarray(matrix[np.sort(sample_idx)], dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+    for _ in range(_KMEANS_ITERATIONS):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        for j in range(n_lists):
+            members = sample[labels == j]
+            if len(members):
+                centroids[j] = members.mean(axis=0)
+        centroids = _normalize(centroids)
+    return centroids, _assign_rows(centroids, matrix, 0)
+
+
+def _assign_rows(centroids: np.ndarray, matrix: np.ndarray, start: int) -> np.ndarray:
+    """Nearest-centroid partition for ``matrix[start:]``."""
+    parts = [
+        np.argmax(np.asarray(matrix[i : i + _SCORE_BLOCK_ROWS], np.float32) @ centroids.T, axis=1)
+        for i in range(start, len(matrix), _SCORE_BLOCK_ROWS)
+    ]
+    if not parts:
+        return np.zeros(0, dtype=np.int32)
+    return np.concatenate(parts).astype(np.int32)
@@ -1,6 +1,12 @@
 """Shared query embedding helpers to keep cache and retrieval aligned."""
 
-from agentic_rag.core.llm_factory import get_embedding_model
+from __future__ import annotations
+
+import asyncio
+
+from agentic_rag.core.embedding_batcher import embed_text, embed_texts
+from agentic_rag.core.exceptions import DependencyUnavailable
+from agentic_rag.core.llm_scheduler import Priority
 
 
 def build_query_embedding_text(query: str) -> str:
@@ -16,6 +22,63 @@ def build_query_embedding_text(query: str) -> str:
 
 async def get_query_embedding(query: str) -> list[float]:
     """Return the embedding for a query using the standardized query text."""
-    embed_model = get_embedding_model()
     query_text = build_query_embedding_text(query)
-    return await embed_model.aget_query_embedding(query_text)
+    return await embed_text(query_text)
+
+
+class QueryEmbeddingContext:
+    """Per-request query embeddings shared by the scope gate, cache and retriever.
+
+    Both vectors are computed lazily on first access in a single batched
+    embedding call, so a request that never needs them pays nothing and a
+    request that needs both pays one round trip.
+    """
+
+    def __init__(self, query: str):
+        self.query = query.strip()
+        self._vectors: tuple[list[float], list[float]] | None = None
+        self._lock = asyncio.Lock()
+
+    async def _ensure(self) -> tuple[list[float], list[float]]:
+        if self._vectors is not None:
+            return self._vectors
+        async with self._lock:
+            if self._vectors is None:
+                try:
+                    raw, instruct = await embed_texts(
+                        [self.query, build_query_embedding_text(self.query)]
+                    )
+                except Exception as e:
+                    raise DependencyUnavailable(
+                        "ollama", "embedding generation failed", {"error": str(e)}
+                    ) from e
+                self._vectors = (raw, instruct)
+        return self._vectors
+
+    async def text_embedding(self) -> list[float]:
+        """Embedding of the plain query text (used by the scope gate)."""
+        raw, _ = await self._ensure()
+        return raw
+
+    async def query_embedding(self) -> list[float]:
+        """Embedding of the instruct-prefixed query (used by cache and retrieval)."""
+        _, instruct = await self._ensure()
+        return instruct
+
+
+async def prefetch_query_embeddings(
+    contexts: list[QueryEmbeddingContext], priority: Priority = Priority.QUERY_EMBEDDING
+) -> None:
+    """Fill many contexts with one batched embedding call (bulk jobs)."""
+    pending = [ctx for ctx in contexts if ctx._vectors is None]
+    if not pending:
+        return
+    texts = [text for ctx in pending for text in (ctx.query, build_query_embedding_text(ctx.query))]
+    try:
+        vectors = await embed_texts(texts, priority)
+    except Exception as e:
+        raise DependencyUnavailable(
+            "ollama", "embedding generation failed", {"error": str(e)}
+        ) from e
+    for i, ctx in enumerate(pending):
+        ctx._vectors = (vectors[2 * i], vectors[2 * i + 1])
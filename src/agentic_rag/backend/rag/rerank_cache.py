@@ -0,0 +1,188 @@
+"""Process-wide rerank score cache.
+
+Scores are keyed by ``(query hash, chunk id, index signature, prompt version)``.
+An in-memory LRU answers repeats inside the process; the ``rerank_scores``
+table (migrations/007) shares scores across workers and survives restarts.
+Both tiers are best-effort: failures are logged and treated as misses.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any
+
+import structlog
+from sqlalchemy import text
+
+from agentic_rag.core import pg_fastpath
+from agentic_rag.core.config import settings
+from agentic_rag.core.database import AsyncSessionLocal
+from agentic_rag.core.index_signature import active_index_signature
+from agentic_rag.core.pg_fastpath import DB_ERRORS
+
+logger = structlog.get_logger()
+
+_CacheKey = tuple[str, str, str, str]
+
+# (query_hash, index_signature, prompt_version, chunk_id) -> (score, stored_at)
+_memory: OrderedDict[_CacheKey, tuple[float, float]] = OrderedDict()
+_lock = threading.Lock()
+
+_SELECT_SQL = text("""
+    SELECT chunk_id, score
+    FROM rerank_scores
+    WHERE query_hash = :query_hash
+      AND index_signature = :index_signature
+      AND prompt_version = :prompt_version
+      AND chunk_id = ANY(:chunk_ids)
+      AND expires_at > NOW()
+""")
+
+_DELETE_EXPIRED_SQL = text("DELETE FROM rerank_scores WHERE expires_at <= NOW()")
+
+_UPSERT_SQL = text("""
+    INSERT INTO rerank_scores (
+        query_hash, chunk_id, index_signature, prompt_version, score, expires_at
+    )
+    SELECT
+        :query_hash, t.chunk_id, :index_signature, :prompt_version, t.score,
+        NOW() + CAST(:ttl_seconds AS INTEGER) * INTERVAL '1 second'
+    FROM unnest(
+        CAST(:chunk_ids AS TEXT[]), CAST(:scores AS DOUBLE PRECISION[])
+    ) AS t(chunk_id, score)
+    ON CONFLICT (query_hash, index_signature, prompt_version, chunk_id)
+    DO UPDATE SET score = EXCLUDED.score, expires_at = EXCLUDED.expires_at
+""")
+
+
+def query_hash(query: str) -> str:
+    """Stable hash of a query (whitespace-normalized)."""
+    return hashlib.sha256(" ".join(query.split()).encode()).hexdigest()
+
+
+def prompt_version(template: str) -> str:
+    """Fingerprint of everything besides the passage that shapes a score."""
+    material = f"{settings.LLM_MODEL}\n{settings.RERANKER_MAX_PASSAGE_CHARS}\n{template}"
+    return hashlib.sha256(material.encode()).hexdigest()[:16]
+
+
+def clear_memory() -> None:
+    """Drop the in-process tier (the table is left untouched)."""
+    with _lock:
+        _memory.clear()
+
+
+def _memory_get(keys: list[_CacheKey]) -> dict[str, float]:
+    ttl = settings.RERANK_CACHE_TTL
+    if ttl <= 0:
+        return {}
+    now = time.monotonic()
+    hits: dict[str, float] = {}
+    with _lock:
+        for key in keys:
+            cached = _memory.get(key)
+            if cached is None:
+                continue
+            score, stored_at = cached
+            if (now - stored_at) > ttl:
+                _memory.pop(key, None)
+                continue
+            _memory.move_to_end(key)
+            hits[key[3]] = score
+    return hits
+
+
+def _memory_put(entries: dict[_CacheKey, float]) -> None:
+    if settings.RERANK_CACHE_TTL <= 0 or not entries:
+        return
+    now = time.monotonic()
+    with _lock:
+        for key, score in entries.items():
+            _memory[key] = (score, now)
+            _memory.move_to_end(key)
+        while len(_memory) > settings.RERANK_CACHE_MAX:
+            _memory.popitem(last=False)
+
+
+async def get_scores(q_hash: str, version: str, chunk_ids: list[str]) -> dict[str, float]:
+    """Return cached scores for ``chunk_ids`` (chunk_id -> score); misses are omitted."""
+    if not chunk_ids:
+        return {}
+    signature = active_index_signature()
+    keys = [(q_hash, signature, version, cid) for cid in chunk_ids]
+    hits = _memory_get(keys)
+    missing = [cid for cid in chunk_ids if cid not in hits]
+    if not missing or not settings.RERANK_CACHE_PERSIST:
+        return hits
+
+    params: dict[str, Any] = {
+        "query_hash": q_hash,
+        "index_signature": signature,
+        "prompt_version": version,
+        "chunk_ids": missing,
+    }
+    rows: Sequence[Any]
+    try:
+        if settings.DB_FASTPATH_ENABLED:
+            rows = await pg_fastpath.fetch(_SELECT_SQL.text, params)
+        else:
+            async with AsyncSessionLocal() as session:
+                rows = (await session.execute(_SELECT_SQL, params)).all()
+    except DB_ERRORS as e:
+        logger.warning("Rerank score cache lookup failed", error=str(e))
+        return hits
+
+    stored = {str(row.chunk_id): float(row.score) for row in rows}
+    _memory_put({(q_hash, signature, version, cid): score for cid, score in stored.items()})
+    return {**hits, **stored}
+
+
+async def put_scores(q_hash: str, version: str, scores: dict[str, float]) -> None:
+    """Store freshly computed scores in both tiers."""
+    if not scores:
+        return
+    signature = active_index_signature()
+    _memory_put({(q_hash, signature, version, cid): score for cid, score in scores.items()})
+
+    ttl = settings.RERANK_CACHE_DB_TTL_SECONDS
+    if not settings.RERANK_CACHE_PERSIST or ttl <= 0:
+        return
+
+    params: dict[str, Any] = {
+        "query_hash": q_hash,
+        "index_signature": signature,
+        "prompt_version": version,
+        "chunk_ids": list(scores),
+        "scores": list(scores.values()),
+        "ttl_seconds": ttl,
+    }
+    try:
+        if settings.DB_FASTPATH_ENABLED:
+            async with pg_fastpath.connection() as conn:
+                await conn.execute(_UPSERT_SQL.text, params)
+        else:
+            async with AsyncSessionLocal() as session:
+                await session.execute(_UPSERT_SQL, params)
+                await session.commit()
+    except DB_ERRORS as e:
+        logger.warning("Failed to store rerank scores", error=str(e))
+
+
+async def purge_expired() -> int:
+    """Delete expired rows (run by the cache janitor)."""
+    try:
+        if settings.DB_FASTPATH_ENABLED:
+            async with pg_fastpath.connection() as conn:
+                status = await conn.execute(_DELETE_EXPIRED_SQL.text)
+            return int(status.split()[-1])
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(_DELETE_EXPIRED_SQL)
+            await session.commit()
+            return int(getattr(result, "rowcount", 0) or 0)
+    except DB_ERRORS as e:
+        logger.warning("Expired row purge failed", table="rerank_scores", error=str(e))
+        return 0
@@ -1,38 +1,170 @@
 """LLM-based re-ranking for retrieved chunks.
 
-Uses Ollama LLM to score relevance of candidates and re-rank them.
+Uses Ollama LLM to score relevance of candidates and re-rank them, either
+one call per passage (pointwise) or all candidates in a single call
+(listwise, with pointwise fallback for anything the model did not score).
 """
 
 import asyncio
-import hashlib
 import json
 import re
-import time
-from collections import OrderedDict
+from collections.abc import Awaitable
+from typing import NamedTuple, Protocol, TypeVar
 
 import structlog
 from llama_index.core.schema import NodeWithScore
 
+from agentic_rag.backend.rag import rerank_cache
+from agentic_rag.backend.rag.cascade import CascadeReranker
+from agentic_rag.backend.rag.cross_encoder import CrossEncoderReranker
+from agentic_rag.backend.rag.query_embedding import QueryEmbeddingContext
 from agentic_rag.core.config import settings
-from agentic_rag.core.llm_factory import get_llm
+from agentic_rag.core.exceptions import DependencyUnavailable
+from agentic_rag.core.llm_factory import LLMBuckets, get_llm
+from agentic_rag.core.llm_scheduler import Priority, llm_slot
 from agentic_rag.core.prompts import PromptRegistry
 
 logger = structlog.get_logger()
 
+_T = TypeVar("_T")
+
+# Output budgets for num_ctx sizing; generous because thinking models may
+# reason before the JSON. Listwise adds ~16 tokens per scored passage.
+_POINTWISE_OUTPUT_TOKENS = 512
+_LISTWISE_OUTPUT_TOKENS = 512
+
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+
+
+def _first_json(text: str) -> object | None:
+    """Decode the first JSON object/array embedded in ``text``."""
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"[\[{]", text):
+        try:
+            value: object = decoder.raw_decode(text, match.start())[0]
+        except ValueError:
+            continue
+        return value
+    return None
+
+
+def _as_number(value: object) -> float | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int | float):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _normalize_score(raw: float) -> float:
+    """Map a 0-10 model score to the 0-1 range."""
+    return min(max(raw, 0.0), 10.0) / 10.0
+
+
+class ListwiseScores(NamedTuple):
+    """Per-passage 0-1 scores from a listwise reply (None = unscored).
+
+    ``ranked`` marks scores derived from a ranking: they only order this
+    candidate set and are not comparable across calls.
+    """
+
+    scores: list[float | None]
+    ranked: bool
+
+
+def parse_listwise_scores(text: str, count: int) -> ListwiseScores | None:
+    """Parse a listwise reply into 0-1 scores, one per passage.
+
+    Accepts ``{"scores": [...]}`` or a bare score list (passage order), and
+    ``{"ranking": [3, 1, 2]}`` (1-based passage ids, best first). Returns None
+    when nothing usable was found.
+    """
+    payload = _first_json(_THINK_RE.sub("", text or ""))
+    ranking = None
+    if isinstance(payload, dict):
+        ranking = payload.get("ranking") if isinstance(payload.get("ranking"), list) else None
+        payload = payload.get("scores")
+
+    scores: list[float | None] = [None] * count
+    if ranking is not None:
+        for rank, idx in enumerate(ranking):
+            if isinstance(idx, int) and 1 <= idx <= count and scores[idx - 1] is None:
+                scores[idx - 1] = 1.0 - rank / count
+    elif isinstance(payload, list):
+        for i, item in enumerate(payload[:count]):
+            value = _as_number(item)
+            if value is not None:
+                scores[i] = _normalize_score(value)
+
+    if not any(s is not None for s in scores):
+        return None
+    return ListwiseScores(scores, ranked=ranking is not None)
+
+
+class _PendingScores(NamedTuple):
+    """Fresh scores, plus the cacheable subsets per scoring method.
+
+    ``listwise`` holds absolute listwise scores only; scores derived from a
+    ranking are in ``scores`` but in neither subset.
+    """
+
+    scores: dict[str, float]
+    listwise: dict[str, float]
+    pointwise: dict[str, float]
+
+
+class Reranker(Protocol):
+    """Re-orders retrieved nodes by relevance and keeps the best ``top_n``."""
+
+    top_n: int
+
+    async def rerank(self, query: str, nodes: list[NodeWithScore]) -> list[NodeWithScore]: ...
+
+
+def get_reranker(embeddings: QueryEmbeddingContext | None = None) -> Reranker:
+    """Build the reranker selected by ``RERANKER_BACKEND``.
+
+    ``embeddings`` lets the cascade reuse the request's query vector. LLM call
+    concurrency is capped by the scheduler's ``rerank`` class. The
+    cross-encoder falls back to the LLM reranker when onnxruntime/tokenizers
+    are missing or its model files are missing or fail to load.
+    """
+    if settings.RERANKER_BACKEND == "cross_encoder":
+        try:
+            return CrossEncoderReranker()
+        except DependencyUnavailable as e:
+            logger.warning("Cross-encoder unavailable, using LLM reranker", error=str(e))
+    if settings.RERANKER_BACKEND == "cascade":
+        return CascadeReranker(embeddings=embeddings)
+    return LLMReranker()
+
 
 class LLMReranker:
-    """LLM-based re-ranker using prompt templates from Phoenix."""
+    """LLM-based re-ranker using prompt templates from Phoenix.
 
-    def __init__(self):
-        self.llm = get_llm(request_timeout=settings.RERANKER_TIMEOUT)
+    Scores are shared process-wide (and across workers) through
+    :mod:`rerank_cache`, so short-lived instances still benefit from them.
+    """
+
+    def __init__(self, mode: str | None = None):
+        self.llms = LLMBuckets(get_llm, request_timeout=settings.RERANKER_TIMEOUT)
         self.top_n = settings.TOP_K_RERANK
-        self._semaphore = asyncio.Semaphore(5)
-        self._score_cache: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self.mode = mode or settings.RERANKER_MODE
 
     async def rerank(self, query: str, nodes: list[NodeWithScore]) -> list[NodeWithScore]:
         """
         Re-rank nodes by LLM-scored relevance.
 
+        Scoring stops at ``RERANKER_TIMEOUT``: scores collected by then are
+        kept, and candidates without one are placed after every scored
+        candidate, in retrieval order. Their score is the normalized retrieval
+        score scaled below the lowest LLM score, so scores stay descending.
+
         Args:
             query: User query
             nodes: List of retrieved nodes with scores
@@ -44,70 +176,180 @@ class LLMReranker:
             return []
 
         candidates = nodes[: self.top_n * 2]
-        logger.info("Re-ranking candidates", count=len(candidates))
+        top_retrieval = max((n.score or 0.0) for n in candidates)
+        fallback = {
+            n.node.node_id: (n.score or 0.0) / top_retrieval if top_retrieval > 0 else 0.0
+            for n in candidates
+        }
 
-        timeout = settings.RERANKER_TIMEOUT
-        tasks = [self._score_node(query, n) for n in candidates]
-        try:
-            scored_nodes = await asyncio.wait_for(asyncio.gather(*tasks), timeout=timeout)
-        except TimeoutError:
-            logger.warning("Reranker timed out, returning original order", timeout=timeout)
-            return nodes[: self.top_n]
+        template = PromptRegistry.get_template("reranker_template")
+        q_hash = rerank_cache.query_hash(query)
+        # Each mode reads only its own cache namespace, so pointwise scores are
+        # never sorted together with scores from a listwise reply
+        pointwise_version = rerank_cache.prompt_version(template)
+        listwise_template = None
+        version = pointwise_version
+        if self.mode == "listwise":
+            listwise_template = PromptRegistry.get_template("reranker_listwise_template")
+            version = rerank_cache.prompt_version(f"listwise\n{listwise_template}")
 
+        scores = await rerank_cache.get_scores(
+            q_hash, version, [n.node.node_id for n in candidates]
+        )
+        if listwise_template is not None and len(scores) < len(candidates):
+            # A listwise reply may be a ranking of the set it was shown: send
+            # every candidate rather than mixing it with cached scores
+            scores = {}
+        pending = [n for n in candidates if n.node.node_id not in scores]
+        logger.info(
+            "Re-ranking candidates", count=len(candidates), cached=len(scores), mode=self.mode
+        )
+
+        if pending:
+            fresh = await self._score_pending(query, pending, template, listwise_template)
+            # Ranking-derived scores depend on the candidate set: not cached
+            await rerank_cache.put_scores(q_hash, version, fresh.listwise)
+            await rerank_cache.put_scores(q_hash, pointwise_version, fresh.pointwise)
+            scores = {**scores, **fresh.scores}
+
+        scored = [n for n in candidates if n.node.node_id in scores]
+        unscored = [n for n in candidates if n.node.node_id not in scores]
+        for n in scored:
+            n.score = scores[n.node.node_id]
         # Sort by re-ranked score descending
-        scored_nodes.sort(key=lambda x: x.score or 0.0, reverse=True)
-        return scored_nodes[: self.top_n]
+        scored.sort(key=lambda x: x.score or 0.0, reverse=True)
+
+        if unscored:
+            floor = min((n.score or 0.0) for n in scored) if scored else 1.0
+            for n in unscored:
+                n.score = fallback[n.node.node_id] * floor
+            logger.info("Unscored candidates kept at retrieval rank", unscored=len(unscored))
+        return (scored + unscored)[: self.top_n]
+
+    @staticmethod
+    async def _until_deadline(jobs: dict[str, Awaitable[_T]], deadline: float) -> dict[str, _T]:
+        """Run ``jobs`` concurrently and return the results finished by ``deadline``.
+
+        Unfinished jobs are cancelled so their Ollama requests are dropped
+        instead of holding generation slots; failed jobs are skipped.
+        """
+        tasks = {asyncio.ensure_future(job): key for key, job in jobs.items()}
+        timeout = max(0.0, deadline - asyncio.get_running_loop().time())
+        try:
+            done, not_done = await asyncio.wait(tasks, timeout=timeout)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        if not_done:
+            await asyncio.gather(*not_done, return_exceptions=True)
+            logger.warning(
+                "Reranker deadline reached, cancelled pending LLM calls",
+                completed=len(done),
+                cancelled=len(not_done),
+                timeout=settings.RERANKER_TIMEOUT,
+            )
+        return {
+            tasks[task]: task.result()
+            for task in done
+            if not task.cancelled() and task.exception() is None
+        }
 
-    async def _score_node(self, query: str, node: NodeWithScore) -> NodeWithScore:
-        """Score a single node using LLM."""
+    async def _score_pending(
+        self,
+        query: str,
+        pending: list[NodeWithScore],
+        template: str,
+        listwise_template: str | None,
+    ) -> _PendingScores:
+        """Score uncached nodes before the deadline.
+
+        Listwise mode makes one call and falls back to pointwise calls for
+        whatever it missed, within the same overall deadline.
+        """
+        deadline = asyncio.get_running_loop().time() + settings.RERANKER_TIMEOUT
+        scores: dict[str, float] = {}
+        absolute: dict[str, float] = {}
+        pointwise_scores: dict[str, float] = {}
+        remaining = pending
+        if listwise_template is not None and len(pending) > 1:
+            listwise = (
+                await self._until_deadline(
+                    {"listwise": self._score_listwise(query, pending, listwise_template)},
+                    deadline,
+                )
+            ).get("listwise")
+            if listwise is not None:
+                for n, score in zip(pending, listwise.scores, strict=False):
+                    if score is not None:
+                        scores[n.node.node_id] = score
+                if not listwise.ranked:
+                    absolute.update(scores)
+            remaining = [n for n in pending if n.node.node_id not in scores]
+            if remaining:
+                logger.info("Listwise rerank incomplete, scoring pointwise", missing=len(remaining))
+
+        if remaining:
+            pointwise = await self._until_deadline(
+                {n.node.node_id: self._score_node(query, n, template) for n in remaining},
+                deadline,
+            )
+            pointwise_scores = {k: v for k, v in pointwise.items() if v is not None}
+            scores.update(pointwise_scores)
+        return _PendingScores(scores, absolute, pointwise_scores)
+
+    async def _score_listwise(
+        self, query: str, nodes: list[NodeWithScore], template: str
+    ) -> ListwiseScores | None:
+        """Score all nodes in a single LLM call; None when nothing was scored."""
+        passages = [n.node.get_content()[: settings.RERANKER_MAX_PASSAGE_CHARS] for n in nodes]
+        prompt = PromptRegistry.render_source(template, query=query, passages=passages)
+
+        llm = self.llms.for_prompt(prompt, output_tokens=_LISTWISE_OUTPUT_TOKENS + 16 * len(nodes))
+        async with llm_slot(Priority.RERANK):
+            try:
+                response = await llm.acomplete(prompt)
+            except Exception as e:
+                logger.warning("Listwise re-ranking failed", error=str(e))
+                return None
+
+        scores = parse_listwise_scores(response.text or "", len(nodes))
+        if scores is None:
+            logger.warning("Listwise re-ranking returned no usable scores")
+        return scores
+
+    async def _score_node(self, query: str, node: NodeWithScore, template: str) -> float | None:
+        """Score a single node using LLM.
+
+        Returns the normalized score, or None when the call failed or the
+        model gave no usable score.
+        """
         passage = node.node.get_content()[: settings.RERANKER_MAX_PASSAGE_CHARS]
+        prompt = PromptRegistry.render_source(template, query=query, passage=passage)
 
-        cache_key = hashlib.sha256(f"{query}\n{passage}".encode()).hexdigest()
-        ttl = settings.RERANK_CACHE_TTL
-        now = time.monotonic()
-        if ttl > 0:
-            cached = self._score_cache.get(cache_key)
-            if cached is not None:
-                score, ts = cached
-                if (now - ts) <= ttl:
-                    self._score_cache.move_to_end(cache_key)
-                    node.score = score
-                    return node
-                self._score_cache.pop(cache_key, None)
-
-        prompt = PromptRegistry.render("reranker_template", query=query, passage=passage)
-
-        async with self._semaphore:
+        llm = self.llms.for_prompt(prompt, output_tokens=_POINTWISE_OUTPUT_TOKENS)
+        async with llm_slot(Priority.RERANK):
             try:
-                response = await self.llm.acomplete(prompt)
-                score_text = (response.text or "").strip()
-
-                raw_score = None
-                try:
-                    parsed = json.loads(score_text)
-                    if isinstance(parsed, dict) and "score" in parsed:
-                        raw_score = float(parsed["score"])
-                except Exception:
-                    raw_score = None
-
-                if raw_score is None:
-                    match = re.search(r"\b(10|[0-9](?:\.[0-9]+)?)\b", score_text)
-                    if match:
-                        raw_score = float(match.group(1))
-
-                if raw_score is not None:
-                    # Normalize to 0-1 range
-                    node.score = min(max(raw_score, 0.0), 10.0) / 10.0
-                else:
-                    node.score = 0.5
+                response = await llm.acomplete(prompt)
             except Exception as e:
                 logger.warning("Re-ranking failed for node", error=str(e))
-                # Keep original score on failure
-                pass
+                return None
+
+        score_text = (response.text or "").strip()
+        raw_score = None
+        try:
+            parsed = json.loads(score_text)
+            if isinstance(parsed, dict) and "score" in parsed:
+                raw_score = float(parsed["score"])
+        except Exception:
+            raw_score = None
 
-        if ttl > 0 and node.score is not None:
-            self._score_cache[cache_key] = (float(node.score), now)
-            if len(self._score_cache) > settings.RERANK_CACHE_MAX:
-                self._score_cache.popitem(last=False)
+        if raw_score is None:
+            match = re.search(r"\b(10|[0-9](?:\.[0-9]+)?)\b", score_text)
+            if match:
+                raw_score = float(match.group(1))
 
-        return node
+        if raw_score is None:
+            return None
+        # Normalize to 0-1 range
+        return _normalize_score(raw_score)
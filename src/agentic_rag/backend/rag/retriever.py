@@ -1,25 +1,50 @@
 """Hybrid retrieval combining semantic and keyword search via RRF."""
 
 import asyncio
+import re
 import time
 from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from typing import Any
 
 import structlog
 from llama_index.core.retrievers import BaseRetriever
 from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import Integer, bindparam, text
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import Float, Integer, TextClause, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from agentic_rag.backend.rag.index_guard import ensure_index_compatible
+from agentic_rag.backend.rag.local_index import LocalVectorIndex
 from agentic_rag.backend.rag.query_embedding import build_query_embedding_text
+from agentic_rag.core import pg_fastpath
 from agentic_rag.core.config import settings
 from agentic_rag.core.database import AsyncSessionLocal
+from agentic_rag.core.embedding_batcher import embed_text
 from agentic_rag.core.exceptions import DependencyUnavailable
-from agentic_rag.core.llm_factory import get_embedding_model
+from agentic_rag.core.index_signature import active_index_signature
+from agentic_rag.core.pg_fastpath import DB_ERRORS
 
 logger = structlog.get_logger()
 
+# pgvector's built-in hnsw.ef_search default
+_PGVECTOR_DEFAULT_EF_SEARCH = 40
+# First pgvector release with hnsw.iterative_scan
+_ITERATIVE_SCAN_MIN_VERSION = (0, 8, 0)
+
+
+@dataclass(frozen=True, slots=True)
+class _ChunkRow:
+    """Chunk body loaded in the second phase of two-phase retrieval."""
+
+    id: str
+    document_id: str
+    content: str
+    metadata: dict[str, Any]
+
 
 class HybridRetriever(BaseRetriever):
     """Custom Hybrid Retriever using parallel execution and type-safe vector binding."""
@@ -27,15 +52,16 @@ class HybridRetriever(BaseRetriever):
     RRF_K = 60
     _EMBED_CACHE_MAX = 128
     _embedding_cache: "OrderedDict[str, tuple[list[float], float]]" = OrderedDict()
-    # Filter out TOC and front-matter chunks by default
-    _FILTER_TOC_FM = """
-        AND COALESCE((metadata->>'is_toc')::boolean, false) = false
-        AND COALESCE((metadata->>'is_front_matter')::boolean, false) = false
-    """
+    # Hot chunk rows for two-phase retrieval, keyed by (chunk id, index signature)
+    _chunk_cache: "OrderedDict[tuple[str, str], _ChunkRow]" = OrderedDict()
+    # Installed pgvector version, probed once per process
+    _pgvector_version: tuple[int, ...] | None = None
+    # Filter out TOC and front-matter chunks by default (generated columns that
+    # match the partial HNSW/GIN index predicates from migration 005)
+    _FILTER_TOC_FM = "AND NOT is_toc AND NOT is_front_matter"
 
     def __init__(self, include_toc: bool = False):
         super().__init__()
-        self.embed_model = get_embedding_model()
         self.top_k = settings.TOP_K_RETRIEVAL
         self.include_toc = include_toc
 
@@ -47,36 +73,46 @@ class HybridRetriever(BaseRetriever):
         query = query_bundle.query_str
         logger.info("Starting Hybrid Search", query=query)
         await ensure_index_compatible()
-        return await self._aretrieve_single(query)
+        return await self._aretrieve_single(query, query_bundle.embedding)
 
-    async def _aretrieve_single(self, query: str) -> list[NodeWithScore]:
-        """Single-query hybrid retrieval (vector + keyword with RRF)."""
-        query_embedding = await self._get_query_embedding(query)
+    async def _aretrieve_single(
+        self,
+        query: str,
+        query_embedding: list[float] | None = None,
+    ) -> list[NodeWithScore]:
+        """Single-query hybrid retrieval (vector + keyword with RRF).
 
-        async with AsyncSessionLocal() as s1, AsyncSessionLocal() as s2:
-            results = await asyncio.gather(
-                self._vector_search(s1, query_embedding),
-                self._keyword_search(s2, query),
-            )
-            vector_rows, keyword_rows = results
+        A precomputed ``query_embedding`` (instruct-prefixed) skips the embed call.
+        """
+        if query_embedding is None:
+            query_embedding = await self._get_query_embedding(query)
+
+        local_vectors = settings.VECTOR_BACKEND == "local"
+        if settings.HYBRID_SEARCH_MODE == "fused" and not local_vectors:
+            return await self._aretrieve_fused(query, query_embedding)
+
+        if local_vectors:
+            async with self._db() as session:
+                vector_rows, keyword_rows = await asyncio.gather(
+                    self._local_vector_search(query_embedding),
+                    self._keyword_search(session, query),
+                )
+        else:
+            async with self._db(transaction=True) as s1, self._db() as s2:
+                vector_rows, keyword_rows = await asyncio.gather(
+                    self._vector_search(s1, query_embedding),
+                    self._keyword_search(s2, query),
+                )
 
         fused_scores: dict[str, float] = {}
-        node_map: dict[str, dict] = {}
+        row_map: dict[str, Any] = {}
 
         def process_rows(rows, weight=1.0):
             for rank, row in enumerate(rows):
                 row_id = str(row.id)
                 score = 1.0 / (self.RRF_K + rank)
                 fused_scores[row_id] = fused_scores.get(row_id, 0.0) + (score * weight)
-
-                if row_id not in node_map:
-                    meta = dict(row.metadata) if row.metadata else {}
-                    meta["document_id"] = str(row.document_id)
-
-                    node_map[row_id] = {
-                        "content": row.content,
-                        "metadata": meta,
-                    }
+                row_map.setdefault(row_id, row)
 
         process_rows(vector_rows, weight=settings.RRF_WEIGHT_VECTOR)
         process_rows(keyword_rows, weight=settings.RRF_WEIGHT_KEYWORD)
@@ -85,19 +121,19 @@ class HybridRetriever(BaseRetriever):
         # Keep a wider candidate set for reranking, but only if configured.
         candidate_k = max(self.top_k, settings.TOP_K_RERANK)
         final_ids = sorted_ids[:candidate_k]
+        if self._ids_only():
+            row_map = await self._fetch_chunks(final_ids)
 
-        nodes = []
-        for vid in final_ids:
-            data = node_map[vid]
-            node = TextNode(
-                text=data["content"],
-                metadata=data["metadata"],
-                id_=vid,
-            )
-            nodes.append(NodeWithScore(node=node, score=fused_scores[vid]))
+        nodes = [
+            self._row_to_node(row_map[vid], fused_scores[vid])
+            for vid in final_ids
+            if vid in row_map
+        ]
 
         logger.info(
             "Hybrid Retrieval Complete",
+            mode="parallel",
+            vector_backend=settings.VECTOR_BACKEND,
             vector_candidates=len(vector_rows),
             keyword_candidates=len(keyword_rows),
             final_results=len(nodes),
@@ -105,96 +141,380 @@ class HybridRetriever(BaseRetriever):
 
         return nodes
 
-    async def _vector_search(self, session, embedding: list[float]):
-        """Cosine search via pgvector <=> (matches vector_cosine_ops HNSW index)."""
-        if settings.HNSW_EF_SEARCH is not None and settings.HNSW_EF_SEARCH > 0:
-            await session.execute(
-                text("SET LOCAL hnsw.ef_search = :val"),
-                {"val": settings.HNSW_EF_SEARCH},
-            )
-        filter_clause = "" if self.include_toc else self._FILTER_TOC_FM
-        distance_filter = ""
-        params = {
+    async def _aretrieve_fused(self, query: str, embedding: list[float]) -> list[NodeWithScore]:
+        """Hybrid retrieval in one statement: both legs ranked and RRF-fused in Postgres.
+
+        Uses a single pooled connection and returns only the final candidate rows,
+        with the same weighted ``1 / (RRF_K + rank)`` scoring as the parallel path.
+        """
+        params: dict[str, Any] = {
             "embed": embedding,
+            "query": query,
             "limit": self.top_k * 2,
-            "index_version": settings.INDEX_VERSION,
-            "embedding_model": settings.EMBEDDING_MODEL,
-            "embedding_dimension": settings.EMBEDDING_DIMENSION,
+            "candidate_k": max(self.top_k, settings.TOP_K_RERANK),
+            "rrf_k": self.RRF_K,
+            "weight_vector": settings.RRF_WEIGHT_VECTOR,
+            "weight_keyword": settings.RRF_WEIGHT_KEYWORD,
         }
-        if settings.VECTOR_MIN_SIMILARITY is not None:
-            max_distance = 1.0 - settings.VECTOR_MIN_SIMILARITY
-            distance_filter = "AND (embedding <=> :embed) <= :max_distance"
-            params["max_distance"] = max_distance
+        vector_where = self._vector_where(params)
+        keyword_where = self._keyword_where(params)
+        keyword_rank = "ts_rank(content_tsv, websearch_to_tsquery('simple', :query))"
+        if settings.RETRIEVAL_TWO_PHASE:
+            final_columns, final_join = "f.id", ""
+        else:
+            final_columns = "c.id, c.document_id, c.content, c.metadata"
+            final_join = "JOIN chunks c ON c.id = f.id AND c.index_signature = :index_signature"
         stmt = text(f"""
-            SELECT id, document_id, content, metadata
-            FROM chunks
-            WHERE index_version = :index_version
-              AND embedding_model = :embedding_model
-              AND embedding_dimension = :embedding_dimension
-              {filter_clause}
-              {distance_filter}
-            ORDER BY embedding <=> :embed
-            LIMIT :limit
+            WITH vector_hits AS (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY embedding <=> :embed) AS rank
+                FROM chunks
+                WHERE {vector_where}
+                ORDER BY embedding <=> :embed
+                LIMIT :limit
+            ),
+            keyword_hits AS (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY {keyword_rank} DESC) AS rank
+                FROM chunks
+                WHERE {keyword_where}
+                ORDER BY {keyword_rank} DESC
+                LIMIT :limit
+            ),
+            fused AS (
+                SELECT id, SUM(score) AS rrf_score
+                FROM (
+                    SELECT id, CAST(:weight_vector AS double precision) / (:rrf_k + rank - 1)
+                        AS score
+                    FROM vector_hits
+                    UNION ALL
+                    SELECT id, CAST(:weight_keyword AS double precision) / (:rrf_k + rank - 1)
+                        AS score
+                    FROM keyword_hits
+                ) AS legs
+                GROUP BY id
+                ORDER BY rrf_score DESC
+                LIMIT :candidate_k
+            )
+            SELECT {final_columns}, f.rrf_score,
+                   (SELECT COUNT(*) FROM vector_hits) AS vector_candidates,
+                   (SELECT COUNT(*) FROM keyword_hits) AS keyword_candidates
+            FROM fused f
+            {final_join}
+            ORDER BY f.rrf_score DESC
         """).bindparams(
             bindparam("embed", type_=Vector(settings.EMBEDDING_DIMENSION)),
             bindparam("limit", type_=Integer),
-            bindparam("index_version"),
-            bindparam("embedding_model"),
-            bindparam("embedding_dimension"),
+            bindparam("candidate_k", type_=Integer),
+            bindparam("rrf_k", type_=Integer),
+            bindparam("weight_vector", type_=Float),
+            bindparam("weight_keyword", type_=Float),
+        )
+
+        async def run(session) -> Sequence[Any]:
+            try:
+                return await self._fetch(session, stmt, params)
+            except DB_ERRORS as e:
+                raise DependencyUnavailable(
+                    "database",
+                    "hybrid search failed",
+                    {"error": str(e)},
+                ) from e
+
+        async with self._db(transaction=True) as session:
+            rows = await self._run_filtered_ann(
+                session,
+                run,
+                count=lambda rows: rows[0].vector_candidates if rows else 0,
+                limit=params["limit"],
+            )
+
+        if settings.RETRIEVAL_TWO_PHASE:
+            row_map = await self._fetch_chunks([str(row.id) for row in rows])
+            nodes = [
+                self._row_to_node(row_map[str(row.id)], float(row.rrf_score))
+                for row in rows
+                if str(row.id) in row_map
+            ]
+        else:
+            nodes = [self._row_to_node(row, float(row.rrf_score)) for row in rows]
+        logger.info(
+            "Hybrid Retrieval Complete",
+            mode="fused",
+            vector_candidates=rows[0].vector_candidates if rows else 0,
+            keyword_candidates=rows[0].keyword_candidates if rows else 0,
+            final_results=len(nodes),
         )
-        if "max_distance" in params:
-            stmt = stmt.bindparams(bindparam("max_distance"))
+        return nodes
 
+    @staticmethod
+    def _ids_only() -> bool:
+        """True when search legs return ids and bodies are fetched afterwards."""
+        return settings.RETRIEVAL_TWO_PHASE or settings.VECTOR_BACKEND == "local"
+
+    @classmethod
+    def _leg_columns(cls) -> str:
+        """Columns returned by each search leg (ids only in two-phase mode)."""
+        if cls._ids_only():
+            return "id, document_id"
+        return "id, document_id, content, metadata"
+
+    async def _fetch_chunks(self, ids: list[str]) -> dict[str, _ChunkRow]:
+        """Load chunk bodies for the surviving ids, serving hot rows from the LRU."""
+        signature = active_index_signature()
+        found: dict[str, _ChunkRow] = {}
+        misses: list[str] = []
+        for chunk_id in ids:
+            key = (chunk_id, signature)
+            cached = self._chunk_cache.get(key)
+            if cached is not None:
+                self._chunk_cache.move_to_end(key)
+                found[chunk_id] = cached
+            else:
+                misses.append(chunk_id)
+
+        if misses:
+            stmt = text("""
+                SELECT id, document_id, content, metadata
+                FROM chunks
+                WHERE id = ANY(:ids)
+                  AND index_signature = :index_signature
+            """).bindparams(bindparam("ids", type_=ARRAY(UUID(as_uuid=False))))
+            try:
+                async with self._db() as session:
+                    rows = await self._fetch(
+                        session, stmt, {"ids": misses, "index_signature": signature}
+                    )
+            except DB_ERRORS as e:
+                raise DependencyUnavailable(
+                    "database",
+                    "chunk fetch failed",
+                    {"error": str(e)},
+                ) from e
+
+            for row in rows:
+                chunk = _ChunkRow(
+                    id=str(row.id),
+                    document_id=str(row.document_id),
+                    content=row.content,
+                    metadata=dict(row.metadata) if row.metadata else {},
+                )
+                found[chunk.id] = chunk
+                self._chunk_cache[(chunk.id, signature)] = chunk
+            while len(self._chunk_cache) > settings.CHUNK_ROW_CACHE_MAX:
+                self._chunk_cache.popitem(last=False)
+
+        logger.debug("Fetched chunk bodies", requested=len(ids), cache_misses=len(misses))
+        return found
+
+    async def fetch_embeddings(self, ids: list[str]) -> dict[str, list[float]]:
+        """Stored chunk embeddings for ``ids`` in the active index (one round trip)."""
+        if not ids:
+            return {}
+        # real[] decodes to a float list on both the SQLAlchemy and asyncpg paths
+        stmt = text("""
+            SELECT id, CAST(embedding AS REAL[]) AS embedding
+            FROM chunks
+            WHERE id = ANY(:ids)
+              AND index_signature = :index_signature
+        """).bindparams(bindparam("ids", type_=ARRAY(UUID(as_uuid=False))))
         try:
-            result = await session.execute(stmt, params)
-            return result.fetchall()
-        except SQLAlchemyError as e:
+            async with self._db() as session:
+                rows = await self._fetch(
+                    session, stmt, {"ids": ids, "index_signature": active_index_signature()}
+                )
+        except DB_ERRORS as e:
             raise DependencyUnavailable(
                 "database",
-                "vector search failed",
+                "embedding fetch failed",
                 {"error": str(e)},
             ) from e
+        return {str(row.id): list(row.embedding) for row in rows}
+
+    @staticmethod
+    def _row_to_node(row, score: float) -> NodeWithScore:
+        meta = dict(row.metadata) if row.metadata else {}
+        meta["document_id"] = str(row.document_id)
+        node = TextNode(text=row.content, metadata=meta, id_=str(row.id))
+        return NodeWithScore(node=node, score=score)
+
+    @staticmethod
+    def _db(transaction: bool = False) -> AbstractAsyncContextManager[Any]:
+        """A SQLAlchemy session, or an asyncpg connection when the fast path is on."""
+        if settings.DB_FASTPATH_ENABLED:
+            return pg_fastpath.connection(transaction=transaction)
+        return AsyncSessionLocal()
+
+    @staticmethod
+    async def _fetch(
+        session: AsyncSession | pg_fastpath.FastConnection,
+        stmt: TextClause,
+        params: dict[str, Any] | None = None,
+    ) -> Sequence[Any]:
+        """Run ``stmt`` on either kind of connection from ``_db``."""
+        if isinstance(session, pg_fastpath.FastConnection):
+            return await session.fetch(stmt.text, params)
+        result = await session.execute(stmt, params)
+        return result.fetchall()
+
+    @classmethod
+    async def _apply_ef_search(cls, session, ef_search: int | None = None) -> None:
+        ef_search = ef_search or settings.HNSW_EF_SEARCH
+        if ef_search is not None and ef_search > 0:
+            # SET cannot take bind parameters; set_config(..., true) is SET LOCAL.
+            await cls._fetch(
+                session,
+                text("SELECT set_config('hnsw.ef_search', :val, true)"),
+                {"val": str(ef_search)},
+            )
+
+    async def _iterative_scan_supported(self, session) -> bool:
+        """True when the server's pgvector has ``hnsw.iterative_scan`` (>= 0.8)."""
+        cls = type(self)
+        if cls._pgvector_version is None:
+            try:
+                rows = await self._fetch(
+                    session, text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+                )
+                raw = rows[0].extversion if rows else "0"
+            except DB_ERRORS as e:
+                raise DependencyUnavailable(
+                    "database",
+                    "pgvector version check failed",
+                    {"error": str(e)},
+                ) from e
+            cls._pgvector_version = tuple(int(p) for p in re.findall(r"\d+", raw)[:3])
+            logger.info("Detected pgvector", version=raw)
+        return cls._pgvector_version >= _ITERATIVE_SCAN_MIN_VERSION
+
+    async def _run_filtered_ann(
+        self,
+        session,
+        run: Callable[[Any], Awaitable[Sequence[Any]]],
+        count: Callable[[Sequence[Any]], int],
+        limit: int,
+    ) -> Sequence[Any]:
+        """Run an HNSW-backed query so WHERE filters do not starve the result.
+
+        Uses pgvector's iterative index scan when available. Otherwise an
+        under-filled vector leg is retried with a doubled ``ef_search`` (up to
+        ``HNSW_EF_SEARCH_MAX``) until it fills or stops growing.
+        """
+        await self._apply_ef_search(session)
+        iterative = settings.HNSW_ITERATIVE_SCAN and await self._iterative_scan_supported(session)
+        if iterative:
+            await self._fetch(
+                session, text("SELECT set_config('hnsw.iterative_scan', 'strict_order', true)")
+            )
+
+        rows = await run(session)
+        ef_search = settings.HNSW_EF_SEARCH or _PGVECTOR_DEFAULT_EF_SEARCH
+        retries = 0
+        while not iterative and count(rows) < limit and ef_search < settings.HNSW_EF_SEARCH_MAX:
+            ef_search = min(ef_search * 2, settings.HNSW_EF_SEARCH_MAX)
+            await self._apply_ef_search(session, ef_search)
+            retry_rows = await run(session)
+            retries += 1
+            if count(retry_rows) <= count(rows):
+                # The filters, not ef_search, are what limit the result.
+                break
+            rows = retry_rows
+
+        log = logger.info if retries else logger.debug
+        log(
+            "Vector candidates",
+            requested=limit,
+            returned=count(rows),
+            iterative_scan=iterative,
+            ef_search=ef_search,
+            retries=retries,
+        )
+        return rows
+
+    def _signature_where(self, params: dict[str, Any]) -> str:
+        # Equality on the partition key prunes to the active partition.
+        params["index_signature"] = active_index_signature()
+        filter_clause = "" if self.include_toc else self._FILTER_TOC_FM
+        return f"""index_signature = :index_signature
+              {filter_clause}"""
+
+    def _vector_where(self, params: dict[str, Any]) -> str:
+        """WHERE clause for the vector leg; adds its bind values to ``params``."""
+        where = self._signature_where(params)
+        if settings.VECTOR_MIN_SIMILARITY is not None:
+            params["max_distance"] = 1.0 - settings.VECTOR_MIN_SIMILARITY
+            where += "\n              AND (embedding <=> :embed) <= :max_distance"
+        return where
+
+    def _keyword_where(self, params: dict[str, Any]) -> str:
+        """WHERE clause for the keyword leg; adds its bind values to ``params``."""
+        where = "content_tsv @@ websearch_to_tsquery('simple', :query)\n              AND "
+        where += self._signature_where(params)
+        if settings.KEYWORD_MIN_SCORE is not None:
+            params["min_score"] = settings.KEYWORD_MIN_SCORE
+            where += (
+                "\n              AND ts_rank(content_tsv, websearch_to_tsquery('simple', :query))"
+                " >= :min_score"
+            )
+        return where
+
+    async def _vector_search(self, session, embedding: list[float]):
+        """Cosine search via pgvector <=> (matches vector_cosine_ops HNSW index)."""
+        params: dict[str, Any] = {
+            "embed": embedding,
+            "limit": self.top_k * 2,
+        }
+        stmt = text(f"""
+            SELECT {self._leg_columns()}
+            FROM chunks
+            WHERE {self._vector_where(params)}
+            ORDER BY embedding <=> :embed
+            LIMIT :limit
+        """).bindparams(
+            bindparam("embed", type_=Vector(settings.EMBEDDING_DIMENSION)),
+            bindparam("limit", type_=Integer),
+        )
+
+        async def run(session) -> Sequence[Any]:
+            try:
+                return await self._fetch(session, stmt, params)
+            except DB_ERRORS as e:
+                raise DependencyUnavailable(
+                    "database",
+                    "vector search failed",
+                    {"error": str(e)},
+                ) from e
+
+        return await self._run_filtered_ann(session, run, count=len, limit=params["limit"])
+
+    async def _local_vector_search(self, embedding: list[float]):
+        """Cosine search against the in-process memory-mapped index."""
+        index = LocalVectorIndex.instance()
+        await index.ensure_fresh()
+        return await asyncio.to_thread(
+            index.search,
+            embedding,
+            self.top_k * 2,
+            include_toc=self.include_toc,
+            min_similarity=settings.VECTOR_MIN_SIMILARITY,
+        )
 
     async def _keyword_search(self, session, query: str):
         """Lexical search with type-safe bindings."""
-        filter_clause = "" if self.include_toc else self._FILTER_TOC_FM
-        score_filter = ""
-        params = {
+        params: dict[str, Any] = {
             "query": query,
             "limit": self.top_k * 2,
-            "index_version": settings.INDEX_VERSION,
-            "embedding_model": settings.EMBEDDING_MODEL,
-            "embedding_dimension": settings.EMBEDDING_DIMENSION,
         }
-        if settings.KEYWORD_MIN_SCORE is not None:
-            score_filter = (
-                "AND ts_rank(content_tsv, websearch_to_tsquery('simple', :query)) >= :min_score"
-            )
-            params["min_score"] = settings.KEYWORD_MIN_SCORE
         stmt = text(f"""
-            SELECT id, document_id, content, metadata
+            SELECT {self._leg_columns()}
             FROM chunks
-            WHERE content_tsv @@ websearch_to_tsquery('simple', :query)
-              AND index_version = :index_version
-              AND embedding_model = :embedding_model
-              AND embedding_dimension = :embedding_dimension
-            {filter_clause}
-            {score_filter}
+            WHERE {self._keyword_where(params)}
             ORDER BY ts_rank(content_tsv, websearch_to_tsquery('simple', :query)) DESC
             LIMIT :limit
         """).bindparams(
-            bindparam("query"),
             bindparam("limit", type_=Integer),
-            bindparam("index_version"),
-            bindparam("embedding_model"),
-            bindparam("embedding_dimension"),
         )
-        if "min_score" in params:
-            stmt = stmt.bindparams(bindparam("min_score"))
         try:
-            result = await session.execute(stmt, params)
-            return result.fetchall()
-        except SQLAlchemyError as e:
+            return await self._fetch(session, stmt, params)
+        except DB_ERRORS as e:
             raise DependencyUnavailable(
                 "database",
                 "keyword search failed",
@@ -215,7 +535,7 @@ class HybridRetriever(BaseRetriever):
             self._embedding_cache.pop(query_text, None)
 
         try:
-            embedding = await self.embed_model.aget_query_embedding(query_text)
+            embedding = await embed_text(query_text)
         except Exception as e:
             raise DependencyUnavailable(
                 "ollama", "embedding generation failed", {"error": str(e)}
@@ -1,7 +1,19 @@
-"""Semantic cache for fast RAG responses."""
+"""Semantic cache for fast RAG responses.
+
+Lookups try the in-process L1 (:mod:`semantic_l1`) before the HNSW query on
+``semantic_cache``; inserts and expiry deletes are announced over NOTIFY so
+every worker's L1 stays coherent. Stores go through a write-behind queue and
+expired rows are purged by the cache janitor, both off the request path.
+
+Stores upsert on a normalized-query hash and are skipped when a different
+query already answers within the similarity threshold. Hit counts drive LFU
+eviction once ``SEMANTIC_CACHE_MAX_ENTRIES`` is exceeded.
+"""
 
 from __future__ import annotations
 
+import hashlib
+from collections import Counter
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from typing import Any
@@ -9,11 +21,23 @@ from typing import Any
 import structlog
 from pgvector.sqlalchemy import Vector
 from sqlalchemy import Integer, bindparam, text
+from sqlalchemy.dialects.postgresql import JSONB
 
-from agentic_rag.backend.rag.query_embedding import get_query_embedding
+from agentic_rag.backend.rag.query_embedding import QueryEmbeddingContext, get_query_embedding
+from agentic_rag.backend.rag.semantic_l1 import (
+    NOTIFY_SQL,
+    L1Entry,
+    SemanticL1,
+    delete_payloads,
+    insert_payload,
+)
+from agentic_rag.core import pg_fastpath
 from agentic_rag.core.config import settings
 from agentic_rag.core.database import AsyncSessionLocal
+from agentic_rag.core.index_signature import active_index_signature
+from agentic_rag.core.pg_fastpath import DB_ERRORS
 from agentic_rag.core.schemas import Citation
+from agentic_rag.core.write_behind import WriteBehindQueue
 
 logger = structlog.get_logger()
 
@@ -38,8 +62,20 @@ def _parse_citations(payload: Any) -> list[Citation]:
     return citations
 
 
-async def lookup_cache(query: str) -> CachedResponse | None:
-    """Lookup a cached response by semantic similarity."""
+async def _embed_for_cache(query: str, embeddings: QueryEmbeddingContext | None) -> list[float]:
+    if embeddings is not None:
+        return await embeddings.query_embedding()
+    return await get_query_embedding(query)
+
+
+async def lookup_cache(
+    query: str,
+    embeddings: QueryEmbeddingContext | None = None,
+) -> CachedResponse | None:
+    """Lookup a cached response by semantic similarity.
+
+    Reuses the request's ``embeddings`` context when given.
+    """
     if not settings.SEMANTIC_CACHE_ENABLED:
         return None
 
@@ -48,29 +84,41 @@ async def lookup_cache(query: str) -> CachedResponse | None:
         return None
 
     try:
-        embedding = await get_query_embedding(cleaned)
+        embedding = await _embed_for_cache(cleaned, embeddings)
     except Exception as e:
         logger.warning("Semantic cache embedding failed", error=str(e))
         return None
 
+    signature = active_index_signature()
+    l1 = SemanticL1.instance()
+    if l1.active() and settings.SEMANTIC_CACHE_MIN_SIMILARITY is not None:
+        local = l1.lookup(embedding, signature, settings.SEMANTIC_CACHE_MIN_SIMILARITY)
+        if local is not None:
+            entry_id, entry, similarity = local
+            await hit_writer.submit((entry_id, signature))
+            logger.info("Semantic cache hit", similarity=similarity, tier="l1")
+            return CachedResponse(answer=entry.answer, citations=_parse_citations(entry.citations))
+
     similarity_filter = ""
     params: dict[str, Any] = {
         "embed": embedding,
         "limit": 1,
-        "index_version": settings.INDEX_VERSION,
-        "embedding_model": settings.EMBEDDING_MODEL,
-        "embedding_dimension": settings.EMBEDDING_DIMENSION,
+        "index_signature": signature,
     }
     if settings.SEMANTIC_CACHE_MIN_SIMILARITY is not None:
         similarity_filter = "AND (1 - (query_embedding <=> :embed)) >= :min_similarity"
         params["min_similarity"] = settings.SEMANTIC_CACHE_MIN_SIMILARITY
 
     stmt = text(f"""
-        SELECT answer, citations, (1 - (query_embedding <=> :embed)) AS similarity
+        SELECT
+            id::text AS id,
+            query_embedding,
+            answer,
+            citations,
+            CAST(EXTRACT(EPOCH FROM expires_at) AS DOUBLE PRECISION) AS expires_epoch,
+            (1 - (query_embedding <=> :embed)) AS similarity
         FROM semantic_cache
-        WHERE index_version = :index_version
-          AND embedding_model = :embedding_model
-          AND embedding_dimension = :embedding_dimension
+        WHERE index_signature = :index_signature
           AND expires_at > NOW()
           {similarity_filter}
         ORDER BY query_embedding <=> :embed
@@ -78,16 +126,21 @@ async def lookup_cache(query: str) -> CachedResponse | None:
     """).bindparams(
         bindparam("embed", type_=Vector(settings.EMBEDDING_DIMENSION)),
         bindparam("limit", type_=Integer),
-        bindparam("index_version"),
-        bindparam("embedding_model"),
-        bindparam("embedding_dimension"),
+        bindparam("index_signature"),
     )
     if "min_similarity" in params:
         stmt = stmt.bindparams(bindparam("min_similarity"))
 
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(stmt, params)
-        row = result.mappings().first()
+    row: Any
+    if settings.DB_FASTPATH_ENABLED:
+        rows = await pg_fastpath.fetch(stmt.text, params)
+        row = rows[0] if rows else None
+    else:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                stmt.columns(query_embedding=Vector(settings.EMBEDDING_DIMENSION)), params
+            )
+            row = result.mappings().first()
 
     if not row:
         return None
@@ -97,12 +150,251 @@ async def lookup_cache(query: str) -> CachedResponse | None:
     if not answer:
         return None
 
+    if l1.active():
+        l1.add(
+            row["id"],
+            row["query_embedding"],
+            L1Entry(answer, row.get("citations"), signature, float(row["expires_epoch"])),
+        )
+    await hit_writer.submit((row["id"], signature))
     logger.info("Semantic cache hit", similarity=row.get("similarity"))
     return CachedResponse(answer=answer, citations=citations)
 
 
-async def store_cache(query: str, answer: str, citations: list[Citation]) -> None:
-    """Store a response in the semantic cache."""
+# Upsert on the normalized-query hash. The row is skipped when the nearest
+# live entry is a different query already above the similarity threshold
+# (a NULL :min_similarity disables that check).
+_UPSERT_SQL = text(
+    """
+    WITH nearest AS (
+        SELECT query_hash, 1 - (query_embedding <=> :query_embedding) AS similarity
+        FROM semantic_cache
+        WHERE index_signature = :index_signature
+          AND expires_at > NOW()
+        ORDER BY query_embedding <=> :query_embedding
+        LIMIT 1
+    )
+    INSERT INTO semantic_cache (
+        query_text,
+        query_hash,
+        query_embedding,
+        answer,
+        citations,
+        embedding_model,
+        embedding_dimension,
+        index_version,
+        index_signature,
+        expires_at
+    )
+    SELECT
+        :query_text,
+        :query_hash,
+        :query_embedding,
+        :answer,
+        :citations,
+        :embedding_model,
+        :embedding_dimension,
+        :index_version,
+        :index_signature,
+        :expires_at
+    WHERE NOT EXISTS (
+        SELECT 1 FROM nearest
+        WHERE nearest.query_hash <> :query_hash
+          AND nearest.similarity >= CAST(:min_similarity AS DOUBLE PRECISION)
+    )
+    ON CONFLICT (index_signature, query_hash) DO UPDATE SET
+        query_text = EXCLUDED.query_text,
+        query_embedding = EXCLUDED.query_embedding,
+        answer = EXCLUDED.answer,
+        citations = EXCLUDED.citations,
+        expires_at = EXCLUDED.expires_at
+    RETURNING id::text
+    """
+).bindparams(
+    bindparam("query_embedding", type_=Vector(settings.EMBEDDING_DIMENSION)),
+    bindparam("citations", type_=JSONB),
+)
+
+# Keep the SEMANTIC_CACHE_MAX_ENTRIES most used rows (LFU, ties by recency);
+# rows younger than the grace window rank first so new answers get a chance to
+# earn hits instead of being the first victims.
+_EVICT_SQL = text("""
+    DELETE FROM semantic_cache AS s
+    USING (
+        SELECT id
+        FROM semantic_cache
+        WHERE index_signature = :index_signature
+        ORDER BY created_at > NOW() - :grace_seconds * INTERVAL '1 second' DESC,
+                 hit_count DESC,
+                 last_hit_at DESC
+        OFFSET :max_entries
+    ) AS victims
+    WHERE s.id = victims.id
+      AND s.index_signature = :index_signature
+    RETURNING s.id::text
+""").bindparams(
+    bindparam("max_entries", type_=Integer),
+    bindparam("grace_seconds", type_=Integer),
+)
+
+_RECORD_HITS_SQL = text("""
+    UPDATE semantic_cache AS s
+    SET hit_count = s.hit_count + h.hits, last_hit_at = NOW()
+    FROM unnest(
+        CAST(:ids AS TEXT[]), CAST(:index_signatures AS TEXT[]), CAST(:hits AS INTEGER[])
+    ) AS h(id, index_signature, hits)
+    WHERE s.id = CAST(h.id AS UUID)
+      AND s.index_signature = h.index_signature
+""")
+
+_DELETE_EXPIRED_SQL = text(
+    "DELETE FROM semantic_cache WHERE expires_at <= NOW() RETURNING id::text"
+)
+
+_NOTIFY_SQL = text(NOTIFY_SQL)
+
+
+def query_hash(query: str) -> str:
+    """SHA-256 of the normalized query (lower-cased, whitespace collapsed).
+
+    migrations/009 backfills existing rows with the same normalization.
+    """
+    return hashlib.sha256(" ".join(query.lower().split()).encode()).hexdigest()
+
+
+async def _notify(conn: Any, payloads: list[str]) -> None:
+    channel = settings.SEMANTIC_CACHE_NOTIFY_CHANNEL
+    for payload in payloads:
+        params = {"channel": channel, "payload": payload}
+        if settings.DB_FASTPATH_ENABLED:
+            await conn.execute(_NOTIFY_SQL.text, params)
+        else:
+            await conn.execute(_NOTIFY_SQL, params)
+
+
+async def _fetch_ids(conn: Any, stmt: Any, params: dict[str, Any]) -> list[str]:
+    if settings.DB_FASTPATH_ENABLED:
+        return [row.id for row in await conn.fetch(stmt.text, params)]
+    return [str(i) for i in (await conn.execute(stmt, params)).scalars()]
+
+
+async def write_entries(entries: list[dict[str, Any]]) -> None:
+    """Upsert a batch of cache rows, evict over capacity, and announce changes.
+
+    Rows run one by one in a single transaction, so a near-duplicate later in
+    the batch already sees the earlier rows. Notifications are delivered on
+    commit; each worker's listener pulls stored rows into its L1.
+    """
+    stored: list[tuple[str, str]] = []
+    evicted: list[str] = []
+
+    async def _apply(conn: Any) -> None:
+        for params in entries:
+            ids = await _fetch_ids(conn, _UPSERT_SQL, params)
+            stored.extend((entry_id, params["index_signature"]) for entry_id in ids)
+        max_entries = settings.SEMANTIC_CACHE_MAX_ENTRIES
+        if stored and max_entries > 0:
+            for signature in {sig for _, sig in stored}:
+                evicted.extend(
+                    await _fetch_ids(
+                        conn,
+                        _EVICT_SQL,
+                        {
+                            "index_signature": signature,
+                            "max_entries": max_entries,
+                            "grace_seconds": settings.SEMANTIC_CACHE_EVICT_GRACE_SECONDS,
+                        },
+                    )
+                )
+        await _notify(
+            conn,
+            [*delete_payloads(evicted), *(insert_payload(i, sig) for i, sig in stored)],
+        )
+
+    try:
+        if settings.DB_FASTPATH_ENABLED:
+            async with pg_fastpath.connection(transaction=True) as conn:
+                await _apply(conn)
+        else:
+            async with AsyncSessionLocal() as session:
+                await _apply(session)
+                await session.commit()
+    except DB_ERRORS as e:
+        logger.warning("Failed to store semantic cache", error=str(e), entries=len(entries))
+        return
+
+    SemanticL1.instance().remove(evicted)
+    if len(stored) < len(entries) or evicted:
+        logger.debug(
+            "Semantic cache batch written",
+            stored=len(stored),
+            skipped=len(entries) - len(stored),
+            evicted=len(evicted),
+        )
+
+
+async def write_hits(hits: list[tuple[str, str]]) -> None:
+    """Add a batch of ``(id, index_signature)`` hits to the rows' counters."""
+    counts = Counter(hits)
+    params = {
+        "ids": [entry_id for entry_id, _ in counts],
+        "index_signatures": [signature for _, signature in counts],
+        "hits": list(counts.values()),
+    }
+    try:
+        if settings.DB_FASTPATH_ENABLED:
+            async with pg_fastpath.connection() as conn:
+                await conn.execute(_RECORD_HITS_SQL.text, params)
+        else:
+            async with AsyncSessionLocal() as session:
+                await session.execute(_RECORD_HITS_SQL, params)
+                await session.commit()
+    except DB_ERRORS as e:
+        logger.warning("Failed to record semantic cache hits", error=str(e))
+
+
+writer: WriteBehindQueue[dict[str, Any]] = WriteBehindQueue(
+    "semantic_cache",
+    write_entries,
+    maxsize=settings.SEMANTIC_CACHE_WRITE_QUEUE_MAX,
+    batch_size=settings.SEMANTIC_CACHE_WRITE_BATCH,
+)
+
+# Hit counters are flushed in batches too, so an L1 hit stays DB-free
+hit_writer: WriteBehindQueue[tuple[str, str]] = WriteBehindQueue(
+    "semantic_cache_hits",
+    write_hits,
+    maxsize=settings.SEMANTIC_CACHE_WRITE_QUEUE_MAX,
+    batch_size=settings.SEMANTIC_CACHE_WRITE_QUEUE_MAX,
+)
+
+
+async def purge_expired() -> int:
+    """Delete expired rows and announce their ids (run by the cache janitor)."""
+    try:
+        if settings.DB_FASTPATH_ENABLED:
+            async with pg_fastpath.connection(transaction=True) as conn:
+                expired = await _fetch_ids(conn, _DELETE_EXPIRED_SQL, {})
+                await _notify(conn, delete_payloads(expired))
+        else:
+            async with AsyncSessionLocal() as session:
+                expired = await _fetch_ids(session, _DELETE_EXPIRED_SQL, {})
+                await _notify(session, delete_payloads(expired))
+                await session.commit()
+    except DB_ERRORS as e:
+        logger.warning("Semantic cache purge failed", error=str(e))
+        return 0
+    SemanticL1.instance().remove(expired)
+    return len(expired)
+
+
+async def store_cache(
+    query: str,
+    answer: str,
+    citations: list[Citation],
+    embeddings: QueryEmbeddingContext | None = None,
+) -> None:
+    """Queue a response for the semantic cache (written in the background)."""
     if not settings.SEMANTIC_CACHE_ENABLED:
         return
 
@@ -115,56 +407,23 @@ async def store_cache(query: str, answer: str, citations: list[Citation]) -> Non
         return
 
     try:
-        embedding = await get_query_embedding(cleaned)
+        embedding = await _embed_for_cache(cleaned, embeddings)
     except Exception as e:
         logger.warning("Semantic cache embedding failed", error=str(e))
         return
 
-    expires_at = datetime.now(UTC) + timedelta(seconds=ttl)
-    citations_payload = [c.model_dump(mode="json") for c in citations]
-
-    delete_stmt = text("DELETE FROM semantic_cache WHERE expires_at <= NOW()")
-    insert_stmt = text(
-        """
-        INSERT INTO semantic_cache (
-            query_text,
-            query_embedding,
-            answer,
-            citations,
-            embedding_model,
-            embedding_dimension,
-            index_version,
-            expires_at
-        ) VALUES (
-            :query_text,
-            :query_embedding,
-            :answer,
-            :citations,
-            :embedding_model,
-            :embedding_dimension,
-            :index_version,
-            :expires_at
-        )
-        """
-    ).bindparams(bindparam("query_embedding", type_=Vector(settings.EMBEDDING_DIMENSION)))
-
-    async with AsyncSessionLocal() as session:
-        try:
-            await session.execute(delete_stmt)
-            await session.execute(
-                insert_stmt,
-                {
-                    "query_text": cleaned,
-                    "query_embedding": embedding,
-                    "answer": answer,
-                    "citations": citations_payload,
-                    "embedding_model": settings.EMBEDDING_MODEL,
-                    "embedding_dimension": settings.EMBEDDING_DIMENSION,
-                    "index_version": settings.INDEX_VERSION,
-                    "expires_at": expires_at,
-                },
-            )
-            await session.commit()
-        except Exception as e:
-            await session.rollback()
-            logger.warning("Failed to store semantic cache", error=str(e))
+    await writer.submit(
+        {
+            "query_text": cleaned,
+            "query_hash": query_hash(cleaned),
+            "query_embedding": embedding,
+            "answer": answer,
+            "citations": [c.model_dump(mode="json") for c in citations],
+            "embedding_model": settings.EMBEDDING_MODEL,
+            "embedding_dimension": settings.EMBEDDING_DIMENSION,
+            "index_version": settings.INDEX_VERSION,
+            "index_signature": active_index_signature(),
+            "expires_at": datetime.now(UTC) + timedelta(seconds=ttl),
+            "min_similarity": settings.SEMANTIC_CACHE_MIN_SIMILARITY,
+        }
+    )
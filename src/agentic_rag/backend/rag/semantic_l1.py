@@ -0,0 +1,305 @@
+"""In-process (L1) tier of the semantic cache.
+
+A small, pre-normalized NumPy matrix of recent ``semantic_cache`` entries is
+checked with one vectorized cosine before falling through to the HNSW query in
+Postgres, so hot questions are answered with no DB round trip.
+
+Workers and replicas stay coherent through Postgres LISTEN/NOTIFY:
+the cache writer notifies on upsert (every listener pulls the row into its own
+L1) and on eviction and expiry deletes (listeners drop the ids). The L1 only answers
+while its listener connection is up; on disconnect it is cleared, since
+notifications may have been missed, and rebuilt as traffic comes in.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import asyncpg
+import numpy as np
+import structlog
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import bindparam, text
+
+from agentic_rag.core import pg_fastpath
+from agentic_rag.core.config import settings
+from agentic_rag.core.database import AsyncSessionLocal
+from agentic_rag.core.pg_fastpath import DB_ERRORS
+
+logger = structlog.get_logger()
+
+_RECONNECT_SECONDS = 5.0
+# Ids per delete notification (NOTIFY payloads are capped at 8000 bytes)
+_IDS_PER_NOTIFY = 100
+
+NOTIFY_SQL = "SELECT pg_notify(:channel, :payload)"
+
+_ROW_SQL = text("""
+    SELECT
+        id::text AS id,
+        index_signature,
+        query_embedding,
+        answer,
+        citations,
+        CAST(EXTRACT(EPOCH FROM expires_at) AS DOUBLE PRECISION) AS expires_epoch
+    FROM semantic_cache
+    WHERE id = CAST(:id AS UUID)
+      AND index_signature = :index_signature
+      AND expires_at > NOW()
+""")
+
+
+@dataclass(slots=True)
+class L1Entry:
+    """A cached answer as held in the L1 (citations stay as stored JSON)."""
+
+    answer: str
+    citations: Any
+    index_signature: str
+    expires_epoch: float
+
+
+def insert_payload(entry_id: str, index_signature: str) -> str:
+    return json.dumps({"op": "insert", "id": entry_id, "sig": index_signature})
+
+
+def delete_payloads(ids: list[str]) -> list[str]:
+    return [
+        json.dumps({"op": "delete", "ids": ids[i : i + _IDS_PER_NOTIFY]})
+        for i in range(0, len(ids), _IDS_PER_NOTIFY)
+    ]
+
+
+def _as_array(embedding: Any) -> np.ndarray:
+    # The asyncpg codec yields pgvector.Vector; SQLAlchemy yields ndarray/list
+    if hasattr(embedding, "to_numpy"):
+        embedding = embedding.to_numpy()
+    return np.asarray(embedding, dtype=np.float32)
+
+
+class SemanticL1:
+    """Fixed-capacity cosine lookup over recent cache entries (LRU eviction)."""
+
+    _instance: SemanticL1 | None = None
+
+    def __init__(self, capacity: int, dim: int):
+        self.capacity = capacity
+        self.dim = dim
+        self.matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.expires = np.zeros(capacity, dtype=np.float64)
+        self.last_used = np.zeros(capacity, dtype=np.float64)
+        self.ids: list[str | None] = [None] * capacity
+        self.entries: list[L1Entry | None] = [None] * capacity
+        self.slots: dict[str, int] = {}
+        # Set while the listener is connected; no answers are served otherwise.
+        self.coherent = False
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> SemanticL1:
+        if cls._instance is None:
+            cls._instance = cls(settings.SEMANTIC_CACHE_L1_MAX, settings.EMBEDDING_DIMENSION)
+        return cls._instance
+
+    def active(self) -> bool:
+        return self.coherent and self.capacity > 0
+
+    def lookup(
+        self, embedding: Any, index_signature: str, min_similarity: float
+    ) -> tuple[str, L1Entry, float] | None:
+        """Best live ``(id, entry, cosine)`` with cosine >= ``min_similarity``, or None."""
+        query = _as_array(embedding)
+        norm = float(np.linalg.norm(query))
+        if norm == 0.0 or query.shape != (self.dim,):
+            return None
+        now = time.time()
+        with self._lock:
+            if not self.slots:
+                self.misses += 1
+                return None
+            scores = self.matrix @ (query / norm)
+            scores[~(self.live & (self.expires > now))] = -np.inf
+            for slot in np.argsort(scores)[::-1]:
+                score = float(scores[slot])
+                if score < min_similarity:
+                    break
+                entry_id, entry = self.ids[slot], self.entries[slot]
+                if (
+                    entry_id is not None
+                    and entry is not None
+                    and entry.index_signature == index_signature
+                ):
+                    self.last_used[slot] = now
+                    self.hits += 1
+                    return entry_id, entry, score
+            self.misses += 1
+            return None
+
+    def add(self, entry_id: str, embedding: Any, entry: L1Entry) -> None:
+        vector = _as_array(embedding)
+        norm = float(np.linalg.norm(vector))
+        if self.capacity <= 0 or norm == 0.0 or vector.shape != (self.dim,):
+            return
+        now = time.time()
+        with self._lock:
+            slot = self.slots.get(entry_id)
+            if slot is None:
+                free = np.flatnonzero(~self.live)
+                slot = int(free[0]) if free.size else int(np.argmin(self.last_used))
+                old_id = self.ids[slot]
+                if old_id is not None:
+                    self.slots.pop(old_id, None)
+            self.matrix[slot] = vector / norm
+            self.live[slot] = True
+            self.expires[slot] = entry.expires_epoch
+            self.last_used[slot] = now
+            self.ids[slot] = entry_id
+            self.entries[slot] = entry
+            self.slots[entry_id] = slot
+
+    def remove(self, ids: Iterable[str]) -> None:
+        with self._lock:
+            for entry_id in ids:
+                slot = self.slots.pop(entry_id, None)
+                if slot is None:
+                    continue
+                self.live[slot] = False
+                self.ids[slot] = None
+                self.entries[slot] = None
+
+    def contains(self, entry_id: str) -> bool:
+        return entry_id in self.slots
+
+    def clear(self) -> None:
+        with self._lock:
+            self.live[:] = False
+            self.ids = [None] * self.capacity
+            self.entries = [None] * self.capacity
+            self.slots.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "coherent": self.coherent,
+            "entries": len(self.slots),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+async def _pull(entry_id: str, index_signature: str) -> None:
+    """Load one announced (inserted or updated) row into the L1."""
+    l1 = SemanticL1.instance()
+    params = {"id": entry_id, "index_signature": index_signature}
+    row: Any
+    try:
+        if settings.DB_FASTPATH_ENABLED:
+            rows = await pg_fastpath.fetch(_ROW_SQL.text, params)
+            row = rows[0] if rows else None
+        else:
+            stmt = _ROW_SQL.bindparams(bindparam("id"), bindparam("index_signature")).columns(
+                query_embedding=Vector(settings.EMBEDDING_DIMENSION)
+            )
+            async with AsyncSessionLocal() as session:
+                row = (await session.execute(stmt, params)).mappings().first()
+    except DB_ERRORS as e:
+        logger.warning("Semantic L1 pull failed", error=str(e))
+        return
+    if row is None:
+        return
+    l1.add(
+        entry_id,
+        row["query_embedding"],
+        L1Entry(
+            answer=row["answer"],
+            citations=row["citations"],
+            index_signature=row["index_signature"],
+            expires_epoch=float(row["expires_epoch"]),
+        ),
+    )
+
+
+class _Listener:
+    """Keeps one LISTEN connection open and applies cache notifications."""
+
+    def __init__(self) -> None:
+        self.task: asyncio.Task[None] | None = None
+        self.pulls: set[asyncio.Task[None]] = set()
+
+    def _on_notify(self, conn: Any, pid: int, channel: str, payload: str) -> None:
+        # Runs inside asyncpg's listener callback: bad messages (including
+        # ones from older writers without "sig") are logged and dropped
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            message = None
+        op = message.get("op") if isinstance(message, dict) else None
+        if op == "delete":
+            ids = message.get("ids")
+            if isinstance(ids, list) and all(isinstance(i, str) for i in ids):
+                SemanticL1.instance().remove(ids)
+                return
+        elif op == "insert":
+            entry_id, signature = message.get("id"), message.get("sig")
+            if isinstance(entry_id, str) and entry_id and isinstance(signature, str):
+                task = asyncio.get_running_loop().create_task(_pull(entry_id, signature))
+                self.pulls.add(task)
+                task.add_done_callback(self.pulls.discard)
+                return
+        logger.warning("Semantic L1 dropped malformed notification", payload=payload[:200])
+
+    async def run(self) -> None:
+        l1 = SemanticL1.instance()
+        channel = settings.SEMANTIC_CACHE_NOTIFY_CHANNEL
+        while True:
+            closed = asyncio.Event()
+            conn: asyncpg.Connection | None = None
+            try:
+                conn = await pg_fastpath.connect()
+                conn.add_termination_listener(lambda _conn, done=closed: done.set())
+                await conn.add_listener(channel, self._on_notify)
+                l1.coherent = True
+                logger.info("Semantic L1 listener connected", channel=channel)
+                await closed.wait()
+                logger.warning("Semantic L1 listener disconnected")
+            except DB_ERRORS as e:
+                logger.warning("Semantic L1 listener unavailable", error=str(e))
+            finally:
+                l1.coherent = False
+                l1.clear()
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(_RECONNECT_SECONDS)
+
+
+_listener: _Listener | None = None
+
+
+async def start_listener() -> None:
+    """Start the LISTEN loop (application startup)."""
+    global _listener
+    if settings.SEMANTIC_CACHE_L1_MAX <= 0 or _listener is not None:
+        return
+    _listener = _Listener()
+    _listener.task = asyncio.create_task(_listener.run())
+
+
+async def stop_listener() -> None:
+    """Stop the LISTEN loop (application shutdown)."""
+    global _listener
+    if _listener is None:
+        return
+    tasks = [t for t in (_listener.task, *_listener.pulls) if t is not None]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _listener = None
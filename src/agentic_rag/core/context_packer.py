@@ -0,0 +1,128 @@
+"""Token-budgeted packing of ranked passages into an LLM prompt.
+
+Passages are taken in rank order until the token budget is spent. A passage
+that mostly repeats one already kept is dropped, and the passage that
+overflows the budget is trimmed at a sentence boundary (falling back to a
+word boundary) rather than cut mid-word at a fixed character count.
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+from collections.abc import Callable, Sequence
+
+from .llm_factory import count_tokens
+
+# Sentence ends (., !, ? followed by whitespace) and line breaks
+_SENTENCE_END_RE = re.compile(r"[.!?](?=\s)|\n")
+_WORD_END_RE = re.compile(r"\S(?=\s)")
+_WORD_RE = re.compile(r"\w+")
+
+# A trimmed tail shorter than this is not worth its header
+MIN_PASSAGE_TOKENS = 32
+
+# Context text when no passage fits (or none was retrieved)
+NO_CONTEXT_MESSAGE = "No relevant information found in the knowledge base."
+
+
+def _shingles(text: str, size: int = 3) -> set[tuple[str, ...]]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def overlap(a: set[tuple[str, ...]], b: set[tuple[str, ...]]) -> float:
+    """Share of the smaller passage's word 3-grams that also appear in the other."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+
+def _longest_prefix(
+    text: str, cuts: list[int], max_tokens: int, count: Callable[[str], int]
+) -> str | None:
+    """Longest ``text[:cut]`` within ``max_tokens`` (binary search over ``cuts``)."""
+    lo, hi, best = 0, len(cuts) - 1, None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        prefix = text[: cuts[mid]].rstrip()
+        if count(prefix) <= max_tokens:
+            best, lo = prefix, mid + 1
+        else:
+            hi = mid - 1
+    return best
+
+
+def trim_to_tokens(text: str, max_tokens: int, count: Callable[[str], int] = count_tokens) -> str:
+    """Cut ``text`` to at most ``max_tokens``, at a sentence end when possible."""
+    text = text.strip()
+    if max_tokens <= 0:
+        return ""
+    if count(text) <= max_tokens:
+        return text
+    sentence_cuts = [m.end() for m in _SENTENCE_END_RE.finditer(text)]
+    trimmed = _longest_prefix(text, sentence_cuts, max_tokens, count)
+    if trimmed:
+        return trimmed
+    word_cuts = [m.end() for m in _WORD_END_RE.finditer(text)]
+    # Only word ends inside the first sentence matter at this point
+    if sentence_cuts:
+        word_cuts = word_cuts[: bisect.bisect_right(word_cuts, sentence_cuts[0])]
+    return _longest_prefix(text, word_cuts, max_tokens, count) or ""
+
+
+def pack_passages(
+    passages: Sequence[str],
+    budget_tokens: int,
+    *,
+    overhead_tokens: Sequence[int] | None = None,
+    max_passage_tokens: int | None = None,
+    dedup_threshold: float | None = 0.8,
+    count: Callable[[str], int] = count_tokens,
+) -> list[tuple[int, str]]:
+    """Fill ``budget_tokens`` greedily with passages in rank order.
+
+    ``overhead_tokens[i]`` is what passage ``i`` costs beyond its text (source
+    header, separator). A passage whose word 3-grams overlap a kept passage by
+    ``dedup_threshold`` or more is skipped. Returns ``(index, text)`` pairs of
+    the kept passages, in rank order. A passage that does not fit is trimmed
+    when at least ``MIN_PASSAGE_TOKENS`` remain and skipped otherwise; later
+    passages that fit whole are still packed. The list is empty when nothing
+    fits; callers should then use :data:`NO_CONTEXT_MESSAGE` as the context.
+    """
+    packed: list[tuple[int, str]] = []
+    kept_shingles: list[set[tuple[str, ...]]] = []
+    remaining = budget_tokens
+
+    for i, passage in enumerate(passages):
+        text = passage.strip()
+        if not text:
+            continue
+        if dedup_threshold is not None:
+            shingles = _shingles(text)
+            if any(overlap(shingles, seen) >= dedup_threshold for seen in kept_shingles):
+                continue
+
+        overhead = overhead_tokens[i] if overhead_tokens is not None else 0
+        available = remaining - overhead
+        if max_passage_tokens is not None:
+            available = min(available, max_passage_tokens)
+
+        tokens = count(text)
+        if tokens > available:
+            # Not worth a stub; a shorter later passage may still fit whole
+            if available < MIN_PASSAGE_TOKENS:
+                continue
+            text = trim_to_tokens(text, available, count)
+            if not text:
+                continue
+            tokens = count(text)
+
+        packed.append((i, text))
+        if dedup_threshold is not None:
+            kept_shingles.append(shingles)
+        remaining -= tokens + overhead
+
+    return packed
@@ -0,0 +1,136 @@
+"""Process-wide micro-batching of embedding requests sent to Ollama.
+
+Concurrent callers (query embedding, retriever, scope gate, chunker) each
+submit single texts; the batcher coalesces everything pending within a short
+window into one ``/api/embed`` call with a list input and fans the vectors
+back out to the waiting futures.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import structlog
+
+from .config import settings
+from .llm_factory import ollama_embed
+from .llm_scheduler import Priority, llm_slot
+
+logger = structlog.get_logger()
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent embedding requests into batched Ollama calls.
+
+    Each :class:`Priority` class has its own pending batch and window, so a
+    large ingestion flush never runs at query priority or holds up a query
+    that arrives during it. Texts of one class submitted within ``window_ms``
+    of its first pending text (or until ``max_batch`` distinct texts are
+    pending) are embedded together. A text already pending at the same or a
+    more urgent priority shares that slot.
+    """
+
+    def __init__(self, window_ms: float, max_batch: int):
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch = max(max_batch, 1)
+        self._loop = asyncio.get_running_loop()
+        self._pending: dict[Priority, dict[str, asyncio.Future[list[float]]]] = {}
+        self._timers: dict[Priority, asyncio.TimerHandle] = {}
+        self._inflight: set[asyncio.Task[None]] = set()
+
+    async def embed(self, text: str, priority: Priority = Priority.QUERY_EMBEDDING) -> list[float]:
+        """Embed a single text through the shared batch window."""
+        vectors = await self.embed_many([text], priority)
+        return vectors[0]
+
+    async def embed_many(
+        self, texts: list[str], priority: Priority = Priority.QUERY_EMBEDDING
+    ) -> list[list[float]]:
+        """Embed several texts; they may be split across or merged into batches."""
+        futures = [self._submit(t, priority) for t in texts]
+        # Shield the shared futures so one cancelled caller does not cancel
+        # the result for every other caller waiting on the same text.
+        return list(await asyncio.gather(*(asyncio.shield(f) for f in futures)))
+
+    def _submit(self, text: str, priority: Priority) -> asyncio.Future[list[float]]:
+        key = text.strip()
+        for level, pending in self._pending.items():
+            if level <= priority and key in pending:
+                return pending[key]
+
+        fut = self._loop.create_future()
+        pending = self._pending.setdefault(priority, {})
+        pending[key] = fut
+        if len(pending) >= self.max_batch:
+            self._flush(priority)
+        elif priority not in self._timers:
+            self._timers[priority] = self._loop.call_later(self.window, self._flush, priority)
+        return fut
+
+    def _flush(self, priority: Priority) -> None:
+        timer = self._timers.pop(priority, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(priority, None)
+        if not batch:
+            return
+        task = self._loop.create_task(self._run(batch, priority))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, batch: dict[str, asyncio.Future[list[float]]], priority: Priority) -> None:
+        texts = list(batch)
+        try:
+            async with llm_slot(priority):
+                vectors = await ollama_embed(texts)
+            if len(vectors) != len(texts):
+                raise ValueError(f"Expected {len(texts)} embeddings, got {len(vectors)}")
+        except Exception as e:
+            logger.warning("Batched embedding failed", batch_size=len(texts), error=str(e))
+            for fut in batch.values():
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        logger.debug("Embedded batch", batch_size=len(texts))
+        for text, vector in zip(texts, vectors, strict=True):
+            fut = batch[text]
+            if not fut.done():
+                fut.set_result(vector)
+
+
+_batcher: EmbeddingBatcher | None = None
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """Return the process-wide batcher bound to the running event loop."""
+    global _batcher
+    loop = asyncio.get_running_loop()
+    if _batcher is None or _batcher._loop is not loop:
+        _batcher = EmbeddingBatcher(
+            window_ms=settings.EMBED_BATCH_WINDOW_MS,
+            max_batch=settings.EMBED_BATCH_MAX_SIZE,
+        )
+    return _batcher
+
+
+async def embed_texts(
+    texts: list[str], priority: Priority = Priority.QUERY_EMBEDDING
+) -> list[list[float]]:
+    """Embed texts via the shared batcher, or directly when batching is disabled."""
+    if not texts:
+        return []
+    if not settings.EMBED_BATCH_ENABLED:
+        size = max(settings.EMBED_BATCH_MAX_SIZE, 1)
+        vectors: list[list[float]] = []
+        for start in range(0, len(texts), size):
+            async with llm_slot(priority):
+                vectors.extend(await ollama_embed(texts[start : start + size]))
+        return vectors
+    return await get_embedding_batcher().embed_many(texts, priority)
+
+
+async def embed_text(text: str, priority: Priority = Priority.QUERY_EMBEDDING) -> list[float]:
+    """Embed a single text via the shared batcher."""
+    vectors = await embed_texts([text], priority)
+    return vectors[0]
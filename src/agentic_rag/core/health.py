@@ -4,14 +4,17 @@ Provides async health checks for database, Ollama, and Phoenix.
 Used by the /health endpoint to report service status.
 """
 
+import asyncio
 from typing import Literal
 
 import httpx
 import structlog
 from sqlalchemy import text
 
+from . import ollama_client
 from .config import settings
 from .database import engine
+from .ollama_router import get_router
 
 logger = structlog.get_logger()
 
@@ -35,30 +38,47 @@ async def check_database() -> tuple[ServiceStatus, str]:
         return "unhealthy", str(e)
 
 
-async def check_ollama() -> tuple[ServiceStatus, str]:
-    """
-    Check Ollama service availability by hitting /api/tags.
-
-    Returns:
-        Tuple of (status, message)
-    """
+async def _check_ollama_backend(base_url: str) -> tuple[ServiceStatus, str]:
+    """Hit /api/tags on one Ollama replica."""
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{settings.OLLAMA_BASE_URL}/api/tags")
-            if response.status_code == 200:
-                data = response.json()
-                model_count = len(data.get("models", []))
-                return "healthy", f"{model_count} models available"
-            return "degraded", f"Unexpected status: {response.status_code}"
+        response = await ollama_client.get_client().get(f"{base_url}/api/tags", timeout=5.0)
+        if response.status_code == 200:
+            data = response.json()
+            model_count = len(data.get("models", []))
+            return "healthy", f"{model_count} models available"
+        return "degraded", f"Unexpected status: {response.status_code}"
     except httpx.ConnectError:
         return "unhealthy", "Connection refused"
     except httpx.TimeoutException:
         return "unhealthy", "Request timeout"
     except Exception as e:
-        logger.error("Ollama health check failed", error=str(e))
+        logger.error("Ollama health check failed", url=base_url, error=str(e))
         return "unhealthy", str(e)
 
 
+async def check_ollama() -> tuple[ServiceStatus, str]:
+    """
+    Check Ollama service availability by hitting /api/tags on every replica.
+
+    Healthy if all replicas answer, degraded if only some do.
+
+    Returns:
+        Tuple of (status, message)
+    """
+    urls = list(get_router().backends)
+    results = await asyncio.gather(*(_check_ollama_backend(u) for u in urls))
+    if len(results) == 1:
+        return results[0]
+
+    healthy = sum(1 for status, _ in results if status == "healthy")
+    details = "; ".join(f"{u}: {msg}" for u, (_, msg) in zip(urls, results, strict=True))
+    if healthy == len(results):
+        return "healthy", details
+    if healthy == 0:
+        return "unhealthy", details
+    return "degraded", details
+
+
 async def check_phoenix() -> tuple[ServiceStatus, str]:
     """
     Check Phoenix observability service availability.
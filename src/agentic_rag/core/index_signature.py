@@ -0,0 +1,41 @@
+"""Active index signature and its table partitions.
+
+``chunks`` and ``semantic_cache`` are list-partitioned by
+``"<index_version>|<embedding_model>|<embedding_dimension>"``
+(migrations/006), so every query filters on the active signature and old
+index versions can stay in the database without slowing searches down.
+"""
+
+from __future__ import annotations
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from .config import settings
+from .database import AsyncSessionLocal
+from .exceptions import DependencyUnavailable
+
+logger = structlog.get_logger()
+
+# Tables list-partitioned by index signature
+PARTITIONED_TABLES = ("chunks", "semantic_cache")
+
+
+def active_index_signature() -> str:
+    """Partition key of the configured index (matches the DB CHECK constraint)."""
+    return f"{settings.INDEX_VERSION}|{settings.EMBEDDING_MODEL}|{settings.EMBEDDING_DIMENSION}"
+
+
+async def ensure_active_partitions() -> None:
+    """Create the active signature's partitions if missing (idempotent)."""
+    signature = active_index_signature()
+    stmt = text("SELECT ensure_signature_partition(:parent, :signature)")
+    try:
+        async with AsyncSessionLocal() as session:
+            for parent in PARTITIONED_TABLES:
+                await session.execute(stmt, {"parent": parent, "signature": signature})
+            await session.commit()
+    except SQLAlchemyError as e:
+        raise DependencyUnavailable("database", "partition setup failed", {"error": str(e)}) from e
+    logger.info("Active index partitions ready", index_signature=signature)
@@ -3,39 +3,47 @@
 from __future__ import annotations
 
 import json as json_mod
+import math
 from collections.abc import AsyncGenerator, Callable
+from typing import Any
 
-import httpx
 import structlog
 from llama_index.core import Settings as LlamaIndexSettings
 from llama_index.embeddings.ollama import OllamaEmbedding
 from llama_index.llms.ollama import Ollama
 
+from . import ollama_client
 from .config import settings
+from .llm_scheduler import Priority, llm_slot
+from .ollama_router import get_router
 
 logger = structlog.get_logger()
 
 
-def get_llm(request_timeout: float = 300.0) -> Ollama:
-    """Return the configured Ollama LLM instance."""
+def get_llm(request_timeout: float = 300.0, num_ctx: int | None = None) -> Ollama:
+    """Return the configured Ollama LLM instance.
+
+    ``num_ctx`` should come from :func:`fit_num_ctx` when the prompt is known;
+    it defaults to the largest context bucket.
+    """
     return Ollama(
         model=settings.LLM_MODEL,
-        base_url=settings.OLLAMA_BASE_URL,
+        base_url=get_router().base_url(settings.LLM_MODEL),
         request_timeout=request_timeout,
         temperature=settings.LLM_TEMPERATURE,
-        context_window=8192,
+        context_window=num_ctx or max(settings.LLM_NUM_CTX_BUCKETS),
     )
 
 
-def get_eval_llm() -> Ollama:
+def get_eval_llm(num_ctx: int | None = None) -> Ollama:
     """Return an Ollama LLM instance configured for evaluation (separate model)."""
     logger.info("Using evaluator model", model=settings.EVAL_MODEL)
     return Ollama(
         model=settings.EVAL_MODEL,
-        base_url=settings.OLLAMA_BASE_URL,
+        base_url=get_router().base_url(settings.EVAL_MODEL),
         request_timeout=600.0,
         temperature=0.0,
-        context_window=8192,
+        context_window=num_ctx or max(settings.LLM_NUM_CTX_BUCKETS),
     )
 
 
@@ -43,7 +51,7 @@ def get_embedding_model() -> OllamaEmbedding:
     """Return the configured Ollama Embedding instance."""
     return OllamaEmbedding(
         model_name=settings.EMBEDDING_MODEL,
-        base_url=settings.OLLAMA_BASE_URL,
+        base_url=get_router().base_url(settings.EMBEDDING_MODEL),
     )
 
 
@@ -99,19 +107,74 @@ def get_tokenizer() -> Callable[[str], list[int]]:
     return tok
 
 
+# Headroom for the chat template around each message and for the gap between
+# the chunking tokenizer (cl100k_base by default) and the model's own tokenizer.
+_TOKENS_PER_MESSAGE = 16
+_TOKEN_MARGIN = 1.1
+
+
+def count_tokens(text: str) -> int:
+    """Approximate model tokens in ``text`` using :func:`get_tokenizer` (with margin)."""
+    return math.ceil(len(get_tokenizer()(text)) * _TOKEN_MARGIN)
+
+
+def count_prompt_tokens(*messages: str) -> int:
+    """Approximate prompt tokens for ``messages``, including chat-template overhead."""
+    return sum(count_tokens(m) for m in messages) + _TOKENS_PER_MESSAGE * len(messages)
+
+
+def fit_num_ctx(*messages: str, output_tokens: int | None = None, think: bool = False) -> int:
+    """Smallest ``LLM_NUM_CTX_BUCKETS`` size that holds the prompt plus the output budget.
+
+    Rounding up to a few fixed sizes keeps Ollama from reloading the model for
+    every distinct ``num_ctx``. Prompts larger than every bucket get the largest
+    one (Ollama truncates the prompt, as it did with the old fixed 8192).
+    """
+    needed = count_prompt_tokens(*messages)
+    needed += settings.LLM_OUTPUT_TOKENS if output_tokens is None else output_tokens
+    if think:
+        needed += settings.LLM_THINKING_TOKENS
+    buckets = sorted(settings.LLM_NUM_CTX_BUCKETS)
+    return next((b for b in buckets if b >= needed), buckets[-1])
+
+
+class LLMBuckets:
+    """:func:`get_llm` instances keyed by ``num_ctx`` bucket, built on first use.
+
+    LlamaIndex fixes ``num_ctx`` per instance, so callers that complete
+    prompts of varying size pick the instance whose bucket fits each prompt.
+    """
+
+    def __init__(self, factory: Callable[..., Ollama] = get_llm, **kwargs: Any):
+        self._factory = factory
+        self._kwargs = kwargs
+        self._llms: dict[int, Ollama] = {}
+
+    def for_prompt(self, prompt: str, output_tokens: int | None = None) -> Ollama:
+        num_ctx = fit_num_ctx(prompt, output_tokens=output_tokens)
+        if num_ctx not in self._llms:
+            self._llms[num_ctx] = self._factory(num_ctx=num_ctx, **self._kwargs)
+        return self._llms[num_ctx]
+
+
 async def ollama_chat_with_thinking(
     system_prompt: str,
     user_message: str,
     think: bool = True,
     model: str | None = None,
+    priority: Priority = Priority.INTERACTIVE,
+    output_tokens: int | None = None,
 ) -> tuple[str, str, dict[str, int]]:
     """Call Ollama chat API directly with thinking support.
 
     Returns (thinking_text, content_text, token_usage).
     token_usage has keys: prompt_tokens, completion_tokens, total_tokens.
+    The call holds an LLM scheduler slot of ``priority``. ``num_ctx`` is sized
+    from the prompt plus ``output_tokens`` (default ``LLM_OUTPUT_TOKENS``).
     """
+    model = model or settings.LLM_MODEL
     payload = {
-        "model": model or settings.LLM_MODEL,
+        "model": model,
         "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_message},
@@ -120,29 +183,32 @@ async def ollama_chat_with_thinking(
         "think": think,
         "options": {
             "temperature": settings.LLM_TEMPERATURE,
-            "num_ctx": 8192,
+            "num_ctx": fit_num_ctx(
+                system_prompt, user_message, output_tokens=output_tokens, think=think
+            ),
         },
     }
 
-    async with httpx.AsyncClient(timeout=300.0) as client:
-        resp = await client.post(
-            f"{settings.OLLAMA_BASE_URL}/api/chat",
-            json=payload,
-        )
+    async with llm_slot(priority), get_router().route(model) as base_url:
+        resp = await ollama_client.get_client().post(f"{base_url}/api/chat", json=payload)
         resp.raise_for_status()
         data = resp.json()
 
     msg = data.get("message", {})
     thinking = msg.get("thinking", "") or ""
     content = msg.get("content", "") or ""
-    prompt_tokens = data.get("prompt_eval_count", 0)
-    completion_tokens = data.get("eval_count", 0)
-    usage = {
+    return thinking, content, token_usage(data)
+
+
+def token_usage(data: dict) -> dict[str, int]:
+    """OpenAI-style usage from an Ollama chat reply (or final stream chunk)."""
+    prompt_tokens = int(data.get("prompt_eval_count", 0) or 0)
+    completion_tokens = int(data.get("eval_count", 0) or 0)
+    return {
         "prompt_tokens": prompt_tokens,
         "completion_tokens": completion_tokens,
         "total_tokens": prompt_tokens + completion_tokens,
     }
-    return thinking, content, usage
 
 
 async def ollama_chat_stream(
@@ -150,13 +216,19 @@ async def ollama_chat_stream(
     user_message: str,
     think: bool = True,
     model: str | None = None,
+    priority: Priority = Priority.INTERACTIVE,
+    output_tokens: int | None = None,
 ) -> AsyncGenerator[dict, None]:
     """Stream from Ollama chat API with thinking support.
 
-    Yields dicts with keys: 'thinking' (str|None), 'content' (str|None), 'done' (bool).
+    Yields dicts with keys: 'thinking' (str|None), 'content' (str|None), 'done' (bool)
+    and 'usage' (token usage dict on the final chunk, else None).
+    The scheduler slot is held until the stream ends or is closed. ``num_ctx``
+    is sized as in :func:`ollama_chat_with_thinking`.
     """
+    model = model or settings.LLM_MODEL
     payload = {
-        "model": model or settings.LLM_MODEL,
+        "model": model,
         "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_message},
@@ -165,27 +237,42 @@ async def ollama_chat_stream(
         "think": think,
         "options": {
             "temperature": settings.LLM_TEMPERATURE,
-            "num_ctx": 8192,
+            "num_ctx": fit_num_ctx(
+                system_prompt, user_message, output_tokens=output_tokens, think=think
+            ),
         },
     }
 
-    async with httpx.AsyncClient(timeout=300.0) as client:
-        async with client.stream(
-            "POST",
-            f"{settings.OLLAMA_BASE_URL}/api/chat",
-            json=payload,
-        ) as resp:
-            resp.raise_for_status()
-            async for line in resp.aiter_lines():
-                if not line.strip():
-                    continue
-                chunk = json_mod.loads(line)
-                msg = chunk.get("message", {})
-                yield {
-                    "thinking": msg.get("thinking", None),
-                    "content": msg.get("content", None),
-                    "done": chunk.get("done", False),
-                }
+    async with (
+        llm_slot(priority),
+        get_router().route(model) as base_url,
+        ollama_client.get_client().stream("POST", f"{base_url}/api/chat", json=payload) as resp,
+    ):
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.strip():
+                continue
+            chunk = json_mod.loads(line)
+            msg = chunk.get("message", {})
+            done = chunk.get("done", False)
+            yield {
+                "thinking": msg.get("thinking", None),
+                "content": msg.get("content", None),
+                "done": done,
+                "usage": token_usage(chunk) if done else None,
+            }
+
+
+async def ollama_embed(texts: list[str], model: str | None = None) -> list[list[float]]:
+    """Embed texts in one ``/api/embed`` call over the shared Ollama client."""
+    model = model or settings.EMBEDDING_MODEL
+    async with get_router().route(model) as base_url:
+        resp = await ollama_client.get_client().post(
+            f"{base_url}/api/embed", json={"model": model, "input": texts}
+        )
+        resp.raise_for_status()
+    vectors: list[list[float]] = resp.json().get("embeddings", [])
+    return vectors
 
 
 def validate_embedding_dimension() -> None:
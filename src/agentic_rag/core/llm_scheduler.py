@@ -0,0 +1,174 @@
+"""Process-wide priority scheduler for Ollama chat and embedding calls.
+
+Every call to Ollama takes a slot with :func:`llm_slot`. Slots are limited
+globally (``LLM_MAX_CONCURRENCY``) and per priority class
+(``LLM_CLASS_CONCURRENCY``). When a slot frees up, the best-priority class
+with waiters that is under its cap goes next (FIFO within a class). Waiters
+gain one priority level per ``LLM_SCHEDULER_AGING_SECONDS`` queued, so
+background work is delayed but never starved.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import statistics
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any
+
+import structlog
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+
+class Priority(IntEnum):
+    """Call classes, most urgent first."""
+
+    INTERACTIVE = 0  # answer generation for a live user (chat, streaming, greetings)
+    QUERY_EMBEDDING = 1  # query/scope-gate embeddings on the request path
+    RERANK = 2
+    BACKGROUND = 3  # follow-up questions, titles, evaluator calls
+    INGESTION = 4  # indexer context generation and chunk embeddings
+
+
+# Queue-time samples kept per class for percentiles
+_QUEUE_SAMPLES = 512
+
+
+class LLMScheduler:
+    """Priority/aging admission control for LLM slots on one event loop."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        class_limits: dict[str, int],
+        aging_seconds: float,
+    ):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.class_limits = {
+            p: max(class_limits.get(p.name.lower(), self.max_concurrency), 1) for p in Priority
+        }
+        self.aging_seconds = aging_seconds
+        self._loop = asyncio.get_running_loop()
+        self._running = dict.fromkeys(Priority, 0)
+        self._waiters: dict[Priority, deque[tuple[float, asyncio.Future[None]]]] = {
+            p: deque() for p in Priority
+        }
+        self._acquired = dict.fromkeys(Priority, 0)
+        self._queue_ms: dict[Priority, deque[float]] = {
+            p: deque(maxlen=_QUEUE_SAMPLES) for p in Priority
+        }
+
+    @property
+    def running(self) -> int:
+        return sum(self._running.values())
+
+    async def acquire(self, priority: Priority) -> None:
+        """Wait for a slot in ``priority``'s class."""
+        enqueued = self._loop.time()
+        fut: asyncio.Future[None] = self._loop.create_future()
+        self._waiters[priority].append((enqueued, fut))
+        self._dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Granted in the same tick the caller was cancelled
+                self.release(priority)
+            else:
+                self._discard(priority, fut)
+            raise
+
+        queue_ms = (self._loop.time() - enqueued) * 1000
+        self._acquired[priority] += 1
+        self._queue_ms[priority].append(queue_ms)
+        logger.debug("LLM slot acquired", priority=priority.name, queue_ms=round(queue_ms, 1))
+
+    def release(self, priority: Priority) -> None:
+        self._running[priority] -= 1
+        self._dispatch()
+
+    def _discard(self, priority: Priority, fut: asyncio.Future[None]) -> None:
+        queue = self._waiters[priority]
+        for entry in queue:
+            if entry[1] is fut:
+                queue.remove(entry)
+                break
+
+    def _next_class(self) -> Priority | None:
+        """Class whose head waiter goes next (best aged priority, then oldest)."""
+        now = self._loop.time()
+        best: tuple[float, float, Priority] | None = None
+        for priority, queue in self._waiters.items():
+            while queue and queue[0][1].done():
+                queue.popleft()
+            if not queue or self._running[priority] >= self.class_limits[priority]:
+                continue
+            enqueued = queue[0][0]
+            aged = 0.0
+            if self.aging_seconds > 0:
+                aged = (now - enqueued) // self.aging_seconds
+            candidate = (priority - aged, enqueued, priority)
+            if best is None or candidate < best:
+                best = candidate
+        return best[2] if best else None
+
+    def _dispatch(self) -> None:
+        while self.running < self.max_concurrency:
+            priority = self._next_class()
+            if priority is None:
+                return
+            _, fut = self._waiters[priority].popleft()
+            self._running[priority] += 1
+            fut.set_result(None)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Per-class running/waiting counts and queue-time summary."""
+        out: dict[str, dict[str, Any]] = {}
+        for p in Priority:
+            samples = sorted(self._queue_ms[p])
+            out[p.name.lower()] = {
+                "running": self._running[p],
+                "waiting": sum(1 for _, f in self._waiters[p] if not f.done()),
+                "limit": self.class_limits[p],
+                "acquired": self._acquired[p],
+                "queue_p50_ms": round(statistics.median(samples), 1) if samples else 0.0,
+                "queue_p95_ms": (
+                    round(samples[min(len(samples) - 1, int(0.95 * len(samples)))], 1)
+                    if samples
+                    else 0.0
+                ),
+                "queue_max_ms": round(samples[-1], 1) if samples else 0.0,
+            }
+        return out
+
+
+_scheduler: LLMScheduler | None = None
+
+
+def get_scheduler() -> LLMScheduler:
+    """Return the process-wide scheduler bound to the running event loop."""
+    global _scheduler
+    loop = asyncio.get_running_loop()
+    if _scheduler is None or _scheduler._loop is not loop:
+        _scheduler = LLMScheduler(
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            class_limits=settings.LLM_CLASS_CONCURRENCY,
+            aging_seconds=settings.LLM_SCHEDULER_AGING_SECONDS,
+        )
+    return _scheduler
+
+
+@asynccontextmanager
+async def llm_slot(priority: Priority) -> AsyncIterator[None]:
+    """Hold one scheduler slot of ``priority`` for the duration of the block."""
+    scheduler = get_scheduler()
+    await scheduler.acquire(priority)
+    try:
+        yield
+    finally:
+        scheduler.release(priority)
@@ -7,11 +7,23 @@ from llama_index.core.llms import ChatMessage, MessageRole
 from sqlalchemy import delete, desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from agentic_rag.core import pg_fastpath
+from agentic_rag.core.config import settings
 from agentic_rag.core.database import AsyncSessionLocal
 from agentic_rag.core.models import Conversation
 
 logger = structlog.get_logger()
 
+_ROLE_MAP = {"user": MessageRole.USER, "assistant": MessageRole.ASSISTANT}
+
+
+def _to_chat_message(role: str, content: str, metadata: dict | None) -> ChatMessage:
+    return ChatMessage(
+        role=_ROLE_MAP.get(role, MessageRole.SYSTEM),
+        content=content,
+        additional_kwargs=metadata or {},
+    )
+
 
 class ConversationMemory:
     """Manages persistent conversation history in PostgreSQL."""
@@ -48,6 +60,19 @@ class ConversationMemory:
     async def get_history(self, limit: int = 10) -> list[ChatMessage]:
         """Retrieve recent messages in chronological order."""
         try:
+            if settings.DB_FASTPATH_ENABLED:
+                records = await pg_fastpath.fetch(
+                    """
+                    SELECT role, content, metadata
+                    FROM conversations
+                    WHERE session_id = :session_id
+                    ORDER BY created_at DESC
+                    LIMIT :limit
+                    """,
+                    {"session_id": self.session_id, "limit": limit},
+                )
+                return [_to_chat_message(r.role, r.content, r.metadata) for r in reversed(records)]
+
             async with AsyncSessionLocal() as session:
                 stmt = (
                     select(Conversation)
@@ -58,24 +83,9 @@ class ConversationMemory:
                 result = await session.execute(stmt)
                 rows = result.scalars().all()
 
-                history = []
-                for row in reversed(rows):
-                    if row.role == "user":
-                        role_enum = MessageRole.USER
-                    elif row.role == "assistant":
-                        role_enum = MessageRole.ASSISTANT
-                    else:
-                        role_enum = MessageRole.SYSTEM
-
-                    history.append(
-                        ChatMessage(
-                            role=role_enum,
-                            content=row.content,
-                            additional_kwargs=row.metadata_ or {},
-                        )
-                    )
-
-                return history
+                return [
+                    _to_chat_message(row.role, row.content, row.metadata_) for row in reversed(rows)
+                ]
         except Exception as e:
             logger.error(
                 "Failed to retrieve history",
@@ -28,7 +28,7 @@ _DEFAULT_DIR = pathlib.Path("migrations")
 _SOURCE_DIR = pathlib.Path(__file__).resolve().parents[3] / "migrations"
 
 
-def _asyncpg_dsn() -> str:
+def asyncpg_dsn() -> str:
     """Convert the SQLAlchemy-style DATABASE_URL to a plain asyncpg DSN."""
     url = settings.DATABASE_URL
     if url.startswith("postgresql+asyncpg://"):
@@ -49,7 +49,7 @@ async def run_migrations(migrations_dir: pathlib.Path | None = None) -> None:
         logger.info("no migration files found", path=str(migrations_dir))
         return
 
-    dsn = _asyncpg_dsn()
+    dsn = asyncpg_dsn()
     conn: asyncpg.Connection = await asyncpg.connect(dsn)
     try:
         # Acquire advisory lock (session-level) — blocks until available.
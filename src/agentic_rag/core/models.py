@@ -5,12 +5,24 @@ from datetime import datetime
 from typing import Any
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, func, text
+from sqlalchemy import (
+    Boolean,
+    Computed,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .config import settings
 from .database import Base
+from .index_signature import active_index_signature
 
 
 class Document(Base):
@@ -55,6 +67,10 @@ class Chunk(Base):
     __tablename__ = "chunks"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # List-partition key (migrations/006); part of the primary key
+    index_signature: Mapped[str] = mapped_column(
+        Text, primary_key=True, default=active_index_signature
+    )
     document_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("documents.id", ondelete="CASCADE"), nullable=False
     )
@@ -68,6 +84,18 @@ class Chunk(Base):
         "metadata", JSONB, server_default=text("'{}'::jsonb"), nullable=False
     )
 
+    # Generated from metadata flags (migration 005); used by partial indexes
+    is_toc: Mapped[bool] = mapped_column(
+        Boolean,
+        Computed("COALESCE((metadata->>'is_toc')::boolean, false)", persisted=True),
+        nullable=False,
+    )
+    is_front_matter: Mapped[bool] = mapped_column(
+        Boolean,
+        Computed("COALESCE((metadata->>'is_front_matter')::boolean, false)", persisted=True),
+        nullable=False,
+    )
+
     embedding: Mapped[Any] = mapped_column(Vector(settings.EMBEDDING_DIMENSION), nullable=False)
 
     # Index versioning metadata
@@ -112,7 +140,13 @@ class SemanticCache(Base):
     __tablename__ = "semantic_cache"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # List-partition key (migrations/006); part of the primary key
+    index_signature: Mapped[str] = mapped_column(
+        Text, primary_key=True, default=active_index_signature
+    )
     query_text: Mapped[str] = mapped_column(Text, nullable=False)
+    # SHA-256 of the normalized query; unique per index signature (migrations/009)
+    query_hash: Mapped[str] = mapped_column(String(64), nullable=False)
     query_embedding: Mapped[Any] = mapped_column(
         Vector(settings.EMBEDDING_DIMENSION), nullable=False
     )
@@ -123,6 +157,48 @@ class SemanticCache(Base):
     embedding_model: Mapped[str] = mapped_column(String(255), nullable=False)
     embedding_dimension: Mapped[int] = mapped_column(Integer, nullable=False)
     index_version: Mapped[str] = mapped_column(String(32), nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    last_hit_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class RerankScore(Base):
+    """Persisted reranker relevance score for a (query, chunk) pair."""
+
+    __tablename__ = "rerank_scores"
+
+    query_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    index_signature: Mapped[str] = mapped_column(
+        Text, primary_key=True, default=active_index_signature
+    )
+    prompt_version: Mapped[str] = mapped_column(Text, primary_key=True)
+    chunk_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class GenerationCacheEntry(Base):
+    """Persisted deterministic LLM reply keyed by its rendered-prompt hash."""
+
+    __tablename__ = "generation_cache"
+
+    prompt_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    index_signature: Mapped[str] = mapped_column(
+        Text, nullable=False, default=active_index_signature
+    )
+    model: Mapped[str] = mapped_column(Text, nullable=False)
+    thinking: Mapped[str] = mapped_column(Text, nullable=False, server_default="")
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    prompt_tokens: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    completion_tokens: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
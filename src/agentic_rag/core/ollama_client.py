@@ -0,0 +1,64 @@
+"""Shared, long-lived HTTP client for the Ollama API.
+
+One ``httpx.AsyncClient`` per event loop keeps connections to Ollama alive
+across calls, so the several chat/embed requests of a single turn reuse warm
+connections instead of opening a new pool each time. The FastAPI lifespan
+opens it at startup and closes it on shutdown; CLI entry points wrap their
+coroutine in :func:`closing`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable
+from typing import TypeVar
+
+import httpx
+import structlog
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+_T = TypeVar("_T")
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client bound to the running event loop."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is not None and _client_loop is loop and not _client.is_closed:
+        return _client
+
+    # No base_url: requests carry the replica URL chosen by ollama_router.
+    _client = httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.OLLAMA_TIMEOUT, connect=settings.OLLAMA_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OLLAMA_MAX_KEEPALIVE,
+            keepalive_expiry=settings.OLLAMA_KEEPALIVE_EXPIRY,
+        ),
+    )
+    _client_loop = loop
+    logger.info("Ollama client created", max_connections=settings.OLLAMA_MAX_CONNECTIONS)
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client (application shutdown)."""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _client_loop = None
+
+
+async def closing(coro: Awaitable[_T]) -> _T:
+    """Await ``coro``, then close the shared client (for ``asyncio.run`` entry points)."""
+    try:
+        return await coro
+    finally:
+        await close_client()
@@ -0,0 +1,202 @@
+"""Health-aware routing across Ollama replicas.
+
+``OLLAMA_BASE_URLS`` lists the replicas (falling back to ``OLLAMA_BASE_URL``).
+Each call goes to the least-loaded healthy replica allowed for its model:
+
+* **Least outstanding requests** — the replica with the fewest in-flight calls
+  from this process wins; ties rotate round-robin.
+* **Passive health** — transport errors and 5xx responses count as failures.
+  After ``OLLAMA_EJECT_AFTER_FAILURES`` consecutive failures a replica is
+  ejected; every ``OLLAMA_PROBE_INTERVAL_SECONDS`` it is probed with
+  ``GET /api/tags`` and re-admitted once the probe succeeds.
+* **Model affinity** — ``OLLAMA_MODEL_AFFINITY`` pins a model to a subset of
+  replicas, e.g. embeddings on one host and chat on another.
+
+Only calls made through :meth:`OllamaRouter.route` (the direct chat, stream
+and embed helpers in ``llm_factory``) are routed per request. LlamaIndex and
+CrewAI clients manage their own connections: they take one replica from
+:meth:`OllamaRouter.base_url` when they are built and keep it, their calls are
+not counted as outstanding and their errors do not count towards ejection.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+import structlog
+
+from . import ollama_client
+from .config import settings
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class OllamaBackend:
+    """Routing state of one Ollama replica."""
+
+    url: str
+    outstanding: int = 0
+    failures: int = 0
+    ejected: bool = False
+    next_probe_at: float = 0.0
+    probing: bool = field(default=False, repr=False)
+
+
+def is_backend_failure(exc: BaseException) -> bool:
+    """Whether ``exc`` says the replica (not the request) is unhealthy."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+class OllamaRouter:
+    """Pick an Ollama replica per call and track its health."""
+
+    def __init__(
+        self,
+        urls: list[str],
+        affinity: dict[str, list[str]] | None = None,
+        eject_after: int = 3,
+        probe_interval: float = 10.0,
+    ):
+        if not urls:
+            raise ValueError("OllamaRouter needs at least one backend URL")
+        self.backends = {u.rstrip("/"): OllamaBackend(u.rstrip("/")) for u in urls}
+        self.affinity = {
+            model: [u.rstrip("/") for u in targets if u.rstrip("/") in self.backends]
+            for model, targets in (affinity or {}).items()
+        }
+        self.eject_after = max(eject_after, 1)
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._rotation = 0
+
+    def _candidates(self, model: str | None) -> list[OllamaBackend]:
+        targets = self.affinity.get(model or "")
+        if targets:
+            return [self.backends[u] for u in targets]
+        return list(self.backends.values())
+
+    def pick(self, model: str | None = None) -> OllamaBackend:
+        """Least-outstanding healthy replica for ``model`` (ejected ones as a last resort)."""
+        with self._lock:
+            candidates = self._candidates(model)
+            self._schedule_probes(candidates)
+            healthy = [b for b in candidates if not b.ejected] or candidates
+            least = min(b.outstanding for b in healthy)
+            tied = [b for b in healthy if b.outstanding == least]
+            self._rotation += 1
+            return tied[self._rotation % len(tied)]
+
+    def base_url(self, model: str | None = None) -> str:
+        """Replica URL for a client that manages its own connections.
+
+        Picked once, like :meth:`pick`; the client's calls are not tracked.
+        """
+        return self.pick(model).url
+
+    @asynccontextmanager
+    async def route(self, model: str | None = None) -> AsyncIterator[str]:
+        """Hold an outstanding-request slot on the chosen replica and yield its URL."""
+        backend = self.pick(model)
+        with self._lock:
+            backend.outstanding += 1
+        try:
+            yield backend.url
+        except BaseException as e:
+            if is_backend_failure(e):
+                self.record_failure(backend, str(e) or type(e).__name__)
+            raise
+        else:
+            self.record_success(backend)
+        finally:
+            with self._lock:
+                backend.outstanding -= 1
+
+    def record_success(self, backend: OllamaBackend) -> None:
+        with self._lock:
+            backend.failures = 0
+            if backend.ejected:
+                backend.ejected = False
+                logger.info("Ollama backend re-admitted", url=backend.url)
+
+    def record_failure(self, backend: OllamaBackend, error: str) -> None:
+        with self._lock:
+            backend.failures += 1
+            if not backend.ejected and backend.failures >= self.eject_after:
+                backend.ejected = True
+                backend.next_probe_at = time.monotonic() + self.probe_interval
+                logger.warning(
+                    "Ollama backend ejected",
+                    url=backend.url,
+                    failures=backend.failures,
+                    error=error,
+                )
+
+    def _schedule_probes(self, candidates: list[OllamaBackend]) -> None:
+        """Start a probe for each ejected candidate whose interval elapsed (lock held)."""
+        now = time.monotonic()
+        for backend in candidates:
+            if not backend.ejected or backend.probing or now < backend.next_probe_at:
+                continue
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # Sync caller (e.g. a LlamaIndex factory): no loop to probe on.
+                # The replica stays ejected until an async caller probes it.
+                continue
+            backend.probing = True
+            loop.create_task(self._probe(backend))
+
+    async def _probe(self, backend: OllamaBackend) -> None:
+        try:
+            resp = await ollama_client.get_client().get(f"{backend.url}/api/tags", timeout=5.0)
+            healthy = resp.status_code == 200
+        except Exception:
+            healthy = False
+        with self._lock:
+            backend.probing = False
+            if not healthy:
+                backend.next_probe_at = time.monotonic() + self.probe_interval
+                logger.debug("Ollama backend probe failed", url=backend.url)
+                return
+        self.record_success(backend)
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Per-replica outstanding requests, failure streak and ejection state."""
+        with self._lock:
+            return [
+                {
+                    "url": b.url,
+                    "outstanding": b.outstanding,
+                    "failures": b.failures,
+                    "ejected": b.ejected,
+                }
+                for b in self.backends.values()
+            ]
+
+
+_router: OllamaRouter | None = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> OllamaRouter:
+    """Return the process-wide router built from settings."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = OllamaRouter(
+                urls=settings.OLLAMA_BASE_URLS or [settings.OLLAMA_BASE_URL],
+                affinity=settings.OLLAMA_MODEL_AFFINITY,
+                eject_after=settings.OLLAMA_EJECT_AFTER_FAILURES,
+                probe_interval=settings.OLLAMA_PROBE_INTERVAL_SECONDS,
+            )
+        return _router
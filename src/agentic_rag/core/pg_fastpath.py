@@ -0,0 +1,176 @@
+"""Optional raw asyncpg fast path for hot queries.
+
+With ``DB_FASTPATH_ENABLED`` the retriever, semantic cache and conversation
+memory run their hot statements on a dedicated asyncpg pool instead of
+SQLAlchemy ``text()``: statements hit asyncpg's per-connection prepared
+statement cache and pgvector values use the binary codec (NumPy in, NumPy
+out) rather than being formatted and parsed as text on every call.
+
+Statements keep SQLAlchemy's ``:name`` placeholders; they are rewritten to
+``$n`` once and cached, so both paths share the same SQL.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any
+
+import asyncpg
+import structlog
+from asyncpg.exceptions import InterfaceError, PostgresError
+from pgvector.asyncpg import register_vector
+from sqlalchemy.exc import SQLAlchemyError
+
+from .config import settings
+from .migrator import asyncpg_dsn
+
+logger = structlog.get_logger()
+
+# Errors raised by either data-access path
+DB_ERRORS: tuple[type[BaseException], ...] = (
+    SQLAlchemyError,
+    PostgresError,
+    InterfaceError,
+    OSError,
+)
+
+# ":name" bind parameters; skips "::type" casts. Quoted literals (including
+# E'...' escape strings), quoted identifiers and comments match first and are
+# copied through unchanged, so a literal like '12:30' never becomes a parameter.
+_PARAM_RE = re.compile(
+    r"(?<!\w)[Ee]'(?:[^'\\]|\\.|'')*'"
+    r"|'(?:[^']|'')*'"
+    r'|"(?:[^"]|"")*"'
+    r"|--[^\n]*"
+    r"|/\*.*?\*/"
+    r"|(?<![:\w]):([A-Za-z_]\w*)",
+    re.DOTALL,
+)
+
+
+class FastRecord(asyncpg.Record):
+    """asyncpg record with attribute access, like SQLAlchemy rows."""
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+@lru_cache(maxsize=256)
+def _compile(sql: str) -> tuple[str, tuple[str, ...]]:
+    """Rewrite ``:name`` placeholders to ``$n`` and return the parameter order."""
+    names: list[str] = []
+
+    def _sub(match: re.Match[str]) -> str:
+        name = match.group(1)
+        if name is None:
+            return match.group(0)
+        if name not in names:
+            names.append(name)
+        return f"${names.index(name) + 1}"
+
+    return _PARAM_RE.sub(_sub, sql), tuple(names)
+
+
+def _bind(sql: str, params: dict[str, Any] | None) -> tuple[str, list[Any]]:
+    query, names = _compile(sql)
+    params = params or {}
+    return query, [params[name] for name in names]
+
+
+class FastConnection:
+    """A pooled asyncpg connection that accepts ``:name`` parameters."""
+
+    def __init__(self, conn: asyncpg.Connection):
+        self._conn = conn
+
+    async def fetch(self, sql: str, params: dict[str, Any] | None = None) -> list[FastRecord]:
+        query, args = _bind(sql, params)
+        rows: list[FastRecord] = await self._conn.fetch(query, *args)
+        return rows
+
+    async def execute(self, sql: str, params: dict[str, Any] | None = None) -> str:
+        query, args = _bind(sql, params)
+        status: str = await self._conn.execute(query, *args)
+        return status
+
+    async def executemany(self, sql: str, rows: list[dict[str, Any]]) -> None:
+        query, names = _compile(sql)
+        await self._conn.executemany(query, [[row[name] for name in names] for row in rows])
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    await register_vector(conn)
+    await conn.set_type_codec("jsonb", encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+
+_pool: asyncpg.Pool | None = None
+_pool_loop: asyncio.AbstractEventLoop | None = None
+_pool_lock: asyncio.Lock | None = None
+
+
+async def get_pool() -> asyncpg.Pool:
+    """Return the process-wide pool bound to the running event loop."""
+    global _pool, _pool_loop, _pool_lock
+    loop = asyncio.get_running_loop()
+    if _pool is not None and _pool_loop is loop:
+        return _pool
+    if _pool_lock is None or _pool_loop is not loop:
+        _pool_lock = asyncio.Lock()
+        _pool_loop = loop
+        _pool = None
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await asyncpg.create_pool(
+                asyncpg_dsn(),
+                min_size=1,
+                max_size=settings.DB_FASTPATH_POOL_SIZE,
+                init=_init_connection,
+                record_class=FastRecord,
+            )
+            logger.info("asyncpg fast path pool created", max_size=settings.DB_FASTPATH_POOL_SIZE)
+    return _pool
+
+
+async def connect() -> asyncpg.Connection:
+    """Open a standalone connection with the pool's codecs (e.g. for LISTEN)."""
+    conn: asyncpg.Connection = await asyncpg.connect(asyncpg_dsn(), record_class=FastRecord)
+    await _init_connection(conn)
+    return conn
+
+
+async def close_pool() -> None:
+    """Close the pool (application shutdown)."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+@asynccontextmanager
+async def connection(transaction: bool = False) -> AsyncIterator[FastConnection]:
+    """Acquire a pooled connection, optionally inside a transaction.
+
+    Use ``transaction=True`` when the statement relies on ``SET LOCAL``-style
+    settings (e.g. ``hnsw.ef_search``).
+    """
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        if transaction:
+            async with conn.transaction():
+                yield FastConnection(conn)
+        else:
+            yield FastConnection(conn)
+
+
+async def fetch(sql: str, params: dict[str, Any] | None = None) -> list[FastRecord]:
+    """Run one read statement on a pooled connection."""
+    async with connection() as conn:
+        return await conn.fetch(sql, params)
@@ -58,7 +58,11 @@ class PromptRegistry:
     @classmethod
     def render(cls, name: str, **kwargs: Any) -> str:
         """Render a prompt template. In prod, fetches from Phoenix first."""
-        template_str = cls.get_template(name)
+        return cls.render_source(cls.get_template(name), **kwargs)
+
+    @classmethod
+    def render_source(cls, template_str: str, **kwargs: Any) -> str:
+        """Render an already-fetched template string with the domain variables."""
         template = cls._env.from_string(template_str)
         return template.render(**{**cls._domain_vars(), **kwargs})
 
@@ -2,24 +2,48 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import numpy as np
 import structlog
 
 from agentic_rag.core.config import settings
-from agentic_rag.core.llm_factory import get_embedding_model
+from agentic_rag.core.embedding_batcher import embed_text, embed_texts
+
+if TYPE_CHECKING:
+    from agentic_rag.backend.rag.query_embedding import QueryEmbeddingContext
 
 logger = structlog.get_logger()
 
 ANCHORS_FILE = Path(__file__).resolve().parent.parent / "prompts" / "scope_anchors.txt"
 
 
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
 class ScopeGate:
-    """Embedding-based scope classifier. Caches anchor embeddings on first use."""
+    """Embedding-based scope classifier.
+
+    Anchor embeddings are computed in one batched embed call, L2-normalized and
+    saved as ``.npy`` under ``SCOPE_GATE_CACHE_DIR``, keyed by embedding model,
+    dimension and anchor file contents; later processes load them from disk.
+    The best anchor similarity per normalized query is memoized in an LRU.
+    """
 
     _anchor_embeddings: np.ndarray | None = None
     _anchors: list[str] = []
+    _init_lock: asyncio.Lock | None = None
+    _init_loop: asyncio.AbstractEventLoop | None = None
+    _memo: OrderedDict[str, float] = OrderedDict()
+    _memo_lock = threading.Lock()
 
     @classmethod
     def _load_anchors(cls) -> list[str]:
@@ -31,40 +55,141 @@ class ScopeGate:
         ]
         return cls._anchors
 
+    @classmethod
+    def _cache_path(cls, anchors: list[str]) -> Path:
+        """Anchor matrix file for the current model, dimension and anchor list."""
+        key = {
+            "model": settings.EMBEDDING_MODEL,
+            "dim": settings.EMBEDDING_DIMENSION,
+            "anchors": hashlib.sha256("\n".join(anchors).encode()).hexdigest(),
+        }
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+        return Path(settings.SCOPE_GATE_CACHE_DIR) / f"anchors-{digest}.npy"
+
+    @classmethod
+    def _read_cached(cls, path: Path, expected_rows: int) -> np.ndarray | None:
+        if not path.exists():
+            return None
+        try:
+            matrix: np.ndarray = np.load(path)
+        except (OSError, ValueError) as e:
+            logger.warning("Scope gate anchor cache unreadable", path=str(path), error=str(e))
+            return None
+        if matrix.shape != (expected_rows, settings.EMBEDDING_DIMENSION):
+            logger.warning("Scope gate anchor cache shape mismatch", shape=matrix.shape)
+            return None
+        return matrix
+
+    @classmethod
+    def _write_cached(cls, path: Path, matrix: np.ndarray) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with tmp.open("wb") as fh:
+                np.save(fh, matrix)
+            # Atomic swap so concurrent workers never read a partial file
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Scope gate anchor cache not written", path=str(path), error=str(e))
+
+    @classmethod
+    def _get_init_lock(cls) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if cls._init_lock is None or cls._init_loop is not loop:
+            cls._init_lock = asyncio.Lock()
+            cls._init_loop = loop
+        return cls._init_lock
+
     @classmethod
     async def _get_anchor_embeddings(cls) -> np.ndarray:
-        """Compute and cache anchor embeddings."""
+        """Return the normalized anchor matrix, loading or computing it once."""
         if cls._anchor_embeddings is not None:
             return cls._anchor_embeddings
 
-        anchors = cls._load_anchors()
-        embed_model = get_embedding_model()
+        # Concurrent first requests wait here instead of each embedding the anchors
+        async with cls._get_init_lock():
+            if cls._anchor_embeddings is not None:
+                return cls._anchor_embeddings
+
+            anchors = cls._load_anchors()
+            path = cls._cache_path(anchors)
+            matrix = cls._read_cached(path, len(anchors))
+            source = "disk"
+            if matrix is None:
+                embeddings = np.asarray(await embed_texts(anchors), dtype=np.float32)
+                norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+                matrix = embeddings / np.maximum(norms, 1e-10)
+                await asyncio.to_thread(cls._write_cached, path, matrix)
+                source = "embedded"
+
+            cls._anchor_embeddings = matrix
+            logger.info("Scope gate initialized", num_anchors=len(anchors), source=source)
+            return matrix
+
+    @classmethod
+    async def warmup(cls) -> None:
+        """Load anchor embeddings at startup; failures are retried on first use."""
+        try:
+            await cls._get_anchor_embeddings()
+        except Exception as e:
+            logger.warning("Scope gate warmup failed", error=str(e))
+
+    @classmethod
+    def _memo_get(cls, key: str) -> float | None:
+        with cls._memo_lock:
+            max_sim = cls._memo.get(key)
+            if max_sim is not None:
+                cls._memo.move_to_end(key)
+            return max_sim
 
-        embeddings = []
-        for anchor in anchors:
-            emb = await embed_model.aget_text_embedding(anchor)
-            embeddings.append(emb)
+    @classmethod
+    def _memo_put(cls, key: str, max_sim: float) -> None:
+        if settings.SCOPE_GATE_MEMO_MAX <= 0:
+            return
+        with cls._memo_lock:
+            cls._memo[key] = max_sim
+            cls._memo.move_to_end(key)
+            while len(cls._memo) > settings.SCOPE_GATE_MEMO_MAX:
+                cls._memo.popitem(last=False)
 
-        cls._anchor_embeddings = np.array(embeddings)
-        logger.info("Scope gate initialized", num_anchors=len(anchors))
-        return cls._anchor_embeddings
+    @classmethod
+    def clear_memo(cls) -> None:
+        with cls._memo_lock:
+            cls._memo.clear()
 
     @classmethod
-    async def is_in_scope(cls, query: str) -> tuple[bool, float]:
+    async def is_in_scope(
+        cls,
+        query: str,
+        embeddings: QueryEmbeddingContext | None = None,
+    ) -> tuple[bool, float]:
         """Check if query is semantically within the configured domain scope.
 
+        When the request's ``embeddings`` context is given, its plain-text
+        vector is reused instead of embedding the query again. Repeated
+        queries are answered from the memo without embedding at all.
+
         Returns (in_scope, max_similarity).
         """
-        anchor_embs = await cls._get_anchor_embeddings()
-        embed_model = get_embedding_model()
+        memo_key = _normalize_query(query)
+        max_sim_memo = cls._memo_get(memo_key)
+        if max_sim_memo is not None:
+            # The threshold is applied on read so a settings change takes effect
+            return max_sim_memo >= settings.SCOPE_GATE_THRESHOLD, max_sim_memo
+
+        anchor_norms = await cls._get_anchor_embeddings()
+        if embeddings is not None:
+            query_embedding = await embeddings.text_embedding()
+        else:
+            query_embedding = await embed_text(query)
 
-        query_emb = np.array(await embed_model.aget_text_embedding(query))
+        query_emb = np.array(query_embedding)
 
-        # Cosine similarity against all anchors
+        # Cosine similarity against all anchors (rows are pre-normalized)
         query_norm = query_emb / (np.linalg.norm(query_emb) + 1e-10)
-        anchor_norms = anchor_embs / (np.linalg.norm(anchor_embs, axis=1, keepdims=True) + 1e-10)
         similarities = anchor_norms @ query_norm
         max_sim = float(np.max(similarities))
+        cls._memo_put(memo_key, max_sim)
 
         in_scope = max_sim >= settings.SCOPE_GATE_THRESHOLD
         logger.info(
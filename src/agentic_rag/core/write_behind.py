@@ -0,0 +1,102 @@
+"""Bounded write-behind queue for best-effort cache writes.
+
+Request handlers :meth:`~WriteBehindQueue.submit` items and return at once. A
+background task drains the queue and hands everything pending (up to
+``batch_size``) to one ``write_batch`` call. When the queue is full new items
+are dropped with a warning, since a lost cache write only costs a later miss.
+The FastAPI lifespan starts the task and flushes the queue on shutdown. When
+the task is not running (CLI entry points, tests) ``submit`` writes inline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar, cast
+
+import structlog
+
+logger = structlog.get_logger()
+
+_T = TypeVar("_T")
+
+# Pushed by stop(); everything queued before it is still written.
+_STOP = object()
+
+
+class WriteBehindQueue(Generic[_T]):
+    """Queue of pending writes drained in batches by one background task."""
+
+    def __init__(
+        self,
+        name: str,
+        write_batch: Callable[[list[_T]], Awaitable[None]],
+        maxsize: int,
+        batch_size: int,
+    ):
+        self.name = name
+        self.write_batch = write_batch
+        self.maxsize = maxsize
+        self.batch_size = max(1, batch_size)
+        self.dropped = 0
+        self.written = 0
+        self._queue: asyncio.Queue[object] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, item: _T) -> None:
+        """Queue ``item`` (or write it inline when the queue is not running)."""
+        if not self.running or self._queue is None:
+            await self._write([item])
+            return
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning("Write-behind queue full; dropping write", queue=self.name)
+
+    async def stop(self) -> None:
+        """Write everything queued so far, then stop the task."""
+        if self._task is None or self._queue is None:
+            return
+        if self.running:
+            await self._queue.put(_STOP)
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._queue = None
+
+    async def _write(self, batch: list[_T]) -> None:
+        try:
+            await self.write_batch(batch)
+            self.written += len(batch)
+        except Exception:
+            logger.exception("Write-behind batch failed", queue=self.name, size=len(batch))
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        stopping = False
+        while not stopping:
+            items = [await queue.get()]
+            while len(items) < self.batch_size and not queue.empty():
+                items.append(queue.get_nowait())
+            stopping = any(item is _STOP for item in items)
+            batch = cast(list[_T], [item for item in items if item is not _STOP])
+            if batch:
+                await self._write(batch)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,369 @@
+"""Latency/recall microbenchmarks for retrieval backends.
+
+Unlike the RAGAS evaluation these runs do not generate answers: they embed
+the testset questions once and then time individual retrieval components
+(the reranker benchmark is the only one that calls the chat model).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import time
+from collections.abc import Awaitable
+from typing import Any
+
+import structlog
+from llama_index.core.schema import NodeWithScore
+
+from agentic_rag.backend.rag.cascade import CascadeReranker, cascade_stats
+from agentic_rag.backend.rag.cross_encoder import CrossEncoderReranker
+from agentic_rag.backend.rag.local_index import LocalVectorIndex
+from agentic_rag.backend.rag.query_embedding import (
+    QueryEmbeddingContext,
+    build_query_embedding_text,
+)
+from agentic_rag.backend.rag.reranker import LLMReranker, Reranker
+from agentic_rag.backend.rag.retriever import HybridRetriever
+from agentic_rag.backend.rag.semantic_cache import lookup_cache
+from agentic_rag.core import ollama_client, pg_fastpath
+from agentic_rag.core.config import settings
+from agentic_rag.core.database import AsyncSessionLocal
+from agentic_rag.core.embedding_batcher import embed_texts
+from agentic_rag.core.exceptions import DependencyUnavailable
+from agentic_rag.core.memory import ConversationMemory
+from agentic_rag.evaluator.metrics import _compute_retrieval_metrics, _extract_relevant_ids
+
+logger = structlog.get_logger()
+
+
+def _load_testset(testset_path: str, limit: int | None) -> list[dict[str, Any]]:
+    with open(testset_path, encoding="utf-8") as f:
+        testset = json.load(f)
+    if not isinstance(testset, list):
+        raise ValueError("Testset must be a list of samples")
+    items = [item for item in testset if item.get("question")]
+    return items[:limit] if limit else items
+
+
+def _load_questions(testset_path: str, limit: int | None) -> list[str]:
+    return [str(item["question"]) for item in _load_testset(testset_path, limit)]
+
+
+def _latency_summary(samples_ms: list[float]) -> dict[str, float]:
+    ordered = sorted(samples_ms)
+    p95_index = min(len(ordered) - 1, max(0, int(round(0.95 * len(ordered))) - 1))
+    return {
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[p95_index], 3),
+    }
+
+
+async def bench_vector_backends(
+    testset_path: str,
+    output_path: str,
+    repeats: int = 5,
+    limit: int | None = None,
+) -> dict[str, Any]:
+    """Compare the pgvector HNSW leg with the local memory-mapped index.
+
+    Reports per-query latency for both backends and overlap@k of the local
+    results against pgvector (the reference).
+    """
+    questions = _load_questions(testset_path, limit)
+    if not questions:
+        raise ValueError("Testset has no questions")
+    embeddings = await embed_texts([build_query_embedding_text(q) for q in questions])
+
+    retriever = HybridRetriever()
+    k = retriever.top_k * 2
+    index = LocalVectorIndex.instance()
+    load_started = time.perf_counter()
+    await index.load()
+    load_seconds = time.perf_counter() - load_started
+
+    pg_ms: list[float] = []
+    local_ms: list[float] = []
+    overlaps: list[float] = []
+    for embedding in embeddings:
+        pg_ids: list[str] = []
+        for _ in range(repeats):
+            async with AsyncSessionLocal() as session:
+                started = time.perf_counter()
+                rows = await retriever._vector_search(session, embedding)
+                pg_ms.append((time.perf_counter() - started) * 1000)
+            pg_ids = [str(r.id) for r in rows]
+
+        local_ids: list[str] = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            hits = index.search(
+                embedding,
+                k,
+                include_toc=retriever.include_toc,
+                min_similarity=settings.VECTOR_MIN_SIMILARITY,
+            )
+            local_ms.append((time.perf_counter() - started) * 1000)
+            local_ids = [h.id for h in hits]
+
+        if pg_ids:
+            overlaps.append(len(set(pg_ids) & set(local_ids)) / len(pg_ids))
+
+    payload: dict[str, Any] = {
+        "config": {
+            "testset": testset_path,
+            "queries": len(questions),
+            "repeats": repeats,
+            "k": k,
+            "index_rows": index.size,
+            "local_dtype": settings.LOCAL_INDEX_DTYPE,
+            "local_ivf_lists": settings.LOCAL_INDEX_IVF_LISTS,
+            "local_ivf_probes": settings.LOCAL_INDEX_IVF_PROBES,
+            "hnsw_ef_search": settings.HNSW_EF_SEARCH,
+        },
+        "local_load_seconds": round(load_seconds, 3),
+        "pgvector": _latency_summary(pg_ms),
+        "local": _latency_summary(local_ms),
+        "local_overlap_at_k": round(statistics.fmean(overlaps), 4) if overlaps else None,
+    }
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+    logger.info("Vector backend benchmark complete", output=output_path, **payload["config"])
+    return payload
+
+
+class _PrecomputedEmbeddings(QueryEmbeddingContext):
+    """Embedding context that never calls the embedding model."""
+
+    def __init__(self, query: str, embedding: list[float]):
+        super().__init__(query)
+        self._vectors = (embedding, embedding)
+
+
+async def _time_db_path(
+    questions: list[str],
+    embeddings: list[list[float]],
+    repeats: int,
+) -> tuple[dict[str, dict[str, float]], list[list[str]]]:
+    """Time retrieval, cache lookup and history fetch on the configured DB path."""
+    retriever = HybridRetriever()
+    memory = ConversationMemory("bench-db")
+    wall: dict[str, list[float]] = {"retrieval": [], "cache_lookup": [], "history": []}
+    cpu: dict[str, list[float]] = {k: [] for k in wall}
+    results: list[list[str]] = []
+
+    async def timed(name: str, awaitable: Awaitable[Any]) -> Any:
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        out = await awaitable
+        wall[name].append((time.perf_counter() - wall_start) * 1000)
+        cpu[name].append((time.process_time() - cpu_start) * 1000)
+        return out
+
+    for question, embedding in zip(questions, embeddings, strict=True):
+        ctx = _PrecomputedEmbeddings(question, embedding)
+        nodes: list[Any] = []
+        for _ in range(repeats):
+            nodes = await timed("retrieval", retriever._aretrieve_single(question, embedding))
+            await timed("cache_lookup", lookup_cache(question, embeddings=ctx))
+            await timed("history", memory.get_history(settings.CONVERSATION_HISTORY_LIMIT))
+        results.append([n.node.node_id for n in nodes])
+
+    summary = {
+        name: {
+            **_latency_summary(wall[name]),
+            "cpu_mean_ms": round(statistics.fmean(cpu[name]), 3),
+        }
+        for name in wall
+    }
+    return summary, results
+
+
+async def bench_db_paths(
+    testset_path: str,
+    output_path: str,
+    repeats: int = 5,
+    limit: int | None = None,
+) -> dict[str, Any]:
+    """Compare the SQLAlchemy path with the asyncpg fast path (DB_FASTPATH_ENABLED).
+
+    Reports wall-clock latency and API-process CPU time per operation, and
+    whether both paths returned identical retrieval results.
+    """
+    questions = _load_questions(testset_path, limit)
+    if not questions:
+        raise ValueError("Testset has no questions")
+    embeddings = await embed_texts([build_query_embedding_text(q) for q in questions])
+
+    original = settings.DB_FASTPATH_ENABLED
+    try:
+        settings.DB_FASTPATH_ENABLED = False
+        sqlalchemy_stats, sqlalchemy_results = await _time_db_path(questions, embeddings, repeats)
+        settings.DB_FASTPATH_ENABLED = True
+        # Warm the pool so connection setup is not counted.
+        await pg_fastpath.get_pool()
+        fastpath_stats, fastpath_results = await _time_db_path(questions, embeddings, repeats)
+    finally:
+        settings.DB_FASTPATH_ENABLED = original
+        await pg_fastpath.close_pool()
+
+    payload: dict[str, Any] = {
+        "config": {
+            "testset": testset_path,
+            "queries": len(questions),
+            "repeats": repeats,
+            "hybrid_search_mode": settings.HYBRID_SEARCH_MODE,
+            "retrieval_two_phase": settings.RETRIEVAL_TWO_PHASE,
+        },
+        "sqlalchemy": sqlalchemy_stats,
+        "asyncpg": fastpath_stats,
+        "identical_results": sqlalchemy_results == fastpath_results,
+    }
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+    logger.info("DB path benchmark complete", output=output_path, **payload["config"])
+    return payload
+
+
+def _rank_metrics(item: dict[str, Any], nodes: list[NodeWithScore], k: int) -> dict[str, float]:
+    """Retrieval metrics of ``nodes`` against the test item's relevant ids."""
+    relevant_doc_ids, relevant_chunk_ids = _extract_relevant_ids(item)
+    doc_ids = [
+        str((n.node.metadata or {}).get("document_id"))
+        for n in nodes
+        if (n.node.metadata or {}).get("document_id") is not None
+    ]
+    chunk_ids = [str(n.node.node_id) for n in nodes]
+    return _compute_retrieval_metrics(doc_ids, chunk_ids, relevant_doc_ids, relevant_chunk_ids, k)
+
+
+async def bench_rerankers(
+    testset_path: str,
+    output_path: str,
+    candidates: int = 10,
+    limit: int | None = None,
+) -> dict[str, Any]:
+    """Compare reranker backends (LLM, cascade, cross-encoder) on latency and quality.
+
+    Every backend reranks the same retrieved candidates; quality is MRR /
+    NDCG@k / hit rate against the testset's relevant ids, with the plain
+    retrieval order as the baseline. The rerank score cache is bypassed.
+    """
+    items = _load_testset(testset_path, limit)
+    if not items:
+        raise ValueError("Testset has no questions")
+
+    backends: dict[str, Reranker] = {"llm": LLMReranker(), "cascade": CascadeReranker()}
+    try:
+        backends["cross_encoder"] = CrossEncoderReranker()
+    except DependencyUnavailable as e:
+        logger.warning("Skipping cross-encoder benchmark", error=str(e))
+    k = settings.TOP_K_RERANK
+
+    retriever = HybridRetriever(include_toc=False)
+    latency: dict[str, list[float]] = {name: [] for name in backends}
+    quality: dict[str, list[dict[str, float]]] = {"retrieval": [], **{n: [] for n in backends}}
+    original = (settings.RERANK_CACHE_TTL, settings.RERANK_CACHE_PERSIST)
+    try:
+        settings.RERANK_CACHE_TTL, settings.RERANK_CACHE_PERSIST = 0, False
+        for item in items:
+            nodes = (await retriever.aretrieve(str(item["question"])))[:candidates]
+            quality["retrieval"].append(_rank_metrics(item, nodes, k))
+            for name, backend in backends.items():
+                # Rerankers overwrite scores in place; give each one fresh copies
+                fresh = [NodeWithScore(node=n.node, score=n.score) for n in nodes]
+                started = time.perf_counter()
+                ranked = await backend.rerank(str(item["question"]), fresh)
+                latency[name].append((time.perf_counter() - started) * 1000)
+                quality[name].append(_rank_metrics(item, ranked, k))
+    finally:
+        settings.RERANK_CACHE_TTL, settings.RERANK_CACHE_PERSIST = original
+
+    def _mean_metrics(rows: list[dict[str, float]]) -> dict[str, float]:
+        return {m: round(statistics.fmean(r[m] for r in rows), 4) for m in rows[0]}
+
+    payload: dict[str, Any] = {
+        "config": {
+            "testset": testset_path,
+            "queries": len(items),
+            "candidates": candidates,
+            "k": k,
+            "reranker_mode": settings.RERANKER_MODE,
+            "cross_encoder_model_dir": settings.CROSS_ENCODER_MODEL_DIR,
+            "cascade_escalation_margin": settings.CASCADE_ESCALATION_MARGIN,
+        },
+        "cascade_escalation": cascade_stats(),
+        "retrieval": {"quality": _mean_metrics(quality["retrieval"])},
+        **{
+            name: {
+                "latency": _latency_summary(latency[name]),
+                "quality": _mean_metrics(quality[name]),
+            }
+            for name in backends
+        },
+    }
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+    logger.info("Reranker benchmark complete", output=output_path, **payload["config"])
+    return payload
+
+
+def bench_vector_sync(
+    testset_path: str,
+    output_path: str,
+    repeats: int = 5,
+    limit: int | None = None,
+) -> dict[str, Any]:
+    """Synchronous entry point for the CLI."""
+    return asyncio.run(
+        ollama_client.closing(
+            bench_vector_backends(
+                testset_path=testset_path,
+                output_path=output_path,
+                repeats=repeats,
+                limit=limit,
+            )
+        )
+    )
+
+
+def bench_db_sync(
+    testset_path: str,
+    output_path: str,
+    repeats: int = 5,
+    limit: int | None = None,
+) -> dict[str, Any]:
+    """Synchronous entry point for the CLI."""
+    return asyncio.run(
+        ollama_client.closing(
+            bench_db_paths(
+                testset_path=testset_path,
+                output_path=output_path,
+                repeats=repeats,
+                limit=limit,
+            )
+        )
+    )
+
+
+def bench_rerank_sync(
+    testset_path: str,
+    output_path: str,
+    candidates: int = 10,
+    limit: int | None = None,
+) -> dict[str, Any]:
+    """Synchronous entry point for the CLI."""
+    return asyncio.run(
+        ollama_client.closing(
+            bench_rerankers(
+                testset_path=testset_path,
+                output_path=output_path,
+                candidates=candidates,
+                limit=limit,
+            )
+        )
+    )
@@ -0,0 +1,199 @@
+"""Offline semantic cache warmer.
+
+After a reindex or an ``INDEX_VERSION`` bump the semantic cache starts empty
+for the new index signature. The warmer runs a question list through the fast
+RAG pipeline (scope gate, retrieval, generation) and stores the answers under
+the current signature, so the first users get cached answers.
+
+Progress is appended to a JSONL state file keyed by (signature, normalized
+question). A rerun skips questions already finished for the same signature,
+so an interrupted run resumes where it stopped. Questions already in the
+cache are skipped without generating.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from agentic_rag.backend.api.v1.chat_service import answer_for_cache
+from agentic_rag.backend.rag.query_embedding import (
+    QueryEmbeddingContext,
+    prefetch_query_embeddings,
+)
+from agentic_rag.backend.rag.semantic_cache import lookup_cache, query_hash, store_cache
+from agentic_rag.core import ollama_client, pg_fastpath
+from agentic_rag.core.config import settings
+from agentic_rag.core.index_signature import active_index_signature, ensure_active_partitions
+from agentic_rag.core.llm_scheduler import Priority
+from agentic_rag.core.scope_gate import ScopeGate
+
+logger = structlog.get_logger()
+
+# Outcomes that are final for a signature; "failed" is retried on resume.
+DONE_STATUSES = frozenset({"stored", "cached", "out_of_scope", "no_context"})
+
+
+def load_questions(path: str, limit: int | None = None) -> list[str]:
+    """Read questions from an evaluator testset JSON or a text file (one per line).
+
+    Blank lines and ``#`` comments are ignored in text files. Repeats of the
+    same normalized question are dropped.
+    """
+    source = Path(path)
+    raw: list[str]
+    if source.suffix.lower() == ".json":
+        data = json.loads(source.read_text(encoding="utf-8"))
+        if not isinstance(data, list):
+            raise ValueError("Testset must be a list of samples")
+        raw = [
+            str(item["question"] if isinstance(item, dict) else item)
+            for item in data
+            if (item.get("question") if isinstance(item, dict) else item)
+        ]
+    else:
+        lines = source.read_text(encoding="utf-8").splitlines()
+        raw = [line for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+    questions: list[str] = []
+    seen: set[str] = set()
+    for question in raw:
+        cleaned = question.strip()
+        key = query_hash(cleaned)
+        if cleaned and key not in seen:
+            seen.add(key)
+            questions.append(cleaned)
+    return questions[:limit] if limit else questions
+
+
+def _load_state(state_path: Path, signature: str) -> set[str]:
+    done: set[str] = set()
+    if not state_path.exists():
+        return done
+    for line in state_path.read_text(encoding="utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue  # torn last line from an interrupted run
+        if record.get("signature") == signature and record.get("status") in DONE_STATUSES:
+            done.add(record["hash"])
+    return done
+
+
+def pending_questions(
+    questions_path: str, state_path: str, limit: int | None = None
+) -> tuple[list[str], list[str]]:
+    """All questions, and those not yet finished for the active signature."""
+    done = _load_state(Path(state_path), active_index_signature())
+    questions = load_questions(questions_path, limit)
+    return questions, [q for q in questions if query_hash(q) not in done]
+
+
+async def _warm_one(question: str, embeddings: QueryEmbeddingContext) -> str:
+    """Run one question through the fast RAG path; returns its outcome."""
+    in_scope, _ = await ScopeGate.is_in_scope(question, embeddings=embeddings)
+    if not in_scope:
+        return "out_of_scope"
+    if await lookup_cache(question, embeddings=embeddings) is not None:
+        return "cached"
+
+    result = await answer_for_cache(question, embeddings=embeddings)
+    if result is None:
+        return "no_context"
+    answer, citations = result
+    # Written inline (the write-behind queue is not running here), so the
+    # state file never claims a row that is not in the table.
+    await store_cache(question, answer, citations, embeddings=embeddings)
+    return "stored"
+
+
+async def warm_cache(
+    questions_path: str,
+    state_path: str,
+    concurrency: int = 2,
+    limit: int | None = None,
+    on_progress: Callable[[str, str], None] | None = None,
+) -> dict[str, Any]:
+    """Populate the semantic cache for every question in ``questions_path``.
+
+    ``on_progress(question, status)`` is called as each question finishes.
+    Returns counts per outcome.
+    """
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        raise ValueError("SEMANTIC_CACHE_ENABLED is false; nothing to warm")
+
+    # The API may not have started since an INDEX_VERSION/model bump; cache
+    # rows for a signature without its partition would all fail to insert
+    await ensure_active_partitions()
+    signature = active_index_signature()
+    state = Path(state_path)
+    questions, pending = pending_questions(questions_path, state_path, limit)
+    counts: dict[str, int] = {"resumed": len(questions) - len(pending)}
+    logger.info(
+        "Cache warm-up started",
+        questions=len(questions),
+        pending=len(pending),
+        signature=signature,
+    )
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    # One embedding call per window (question + instruct text per item)
+    window = max(concurrency, settings.EMBED_BATCH_MAX_SIZE // 2, 1)
+
+    with state.open("a", encoding="utf-8") as out:
+
+        async def _run(question: str, embeddings: QueryEmbeddingContext) -> None:
+            async with semaphore:
+                try:
+                    status = await _warm_one(question, embeddings)
+                except Exception as e:
+                    logger.warning("Cache warm-up failed", question=question[:80], error=str(e))
+                    status = "failed"
+            counts[status] = counts.get(status, 0) + 1
+            record = {"signature": signature, "hash": query_hash(question), "status": status}
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            if on_progress is not None:
+                on_progress(question, status)
+
+        for start in range(0, len(pending), window):
+            batch = pending[start : start + window]
+            contexts = [QueryEmbeddingContext(q) for q in batch]
+            await prefetch_query_embeddings(contexts, Priority.BACKGROUND)
+            await asyncio.gather(*(_run(q, ctx) for q, ctx in zip(batch, contexts, strict=True)))
+
+    logger.info("Cache warm-up finished", **counts)
+    return counts
+
+
+async def _warm_and_close(**kwargs: Any) -> dict[str, Any]:
+    try:
+        return await warm_cache(**kwargs)
+    finally:
+        await pg_fastpath.close_pool()
+
+
+def warm_cache_sync(
+    questions_path: str,
+    state_path: str,
+    concurrency: int = 2,
+    limit: int | None = None,
+    on_progress: Callable[[str, str], None] | None = None,
+) -> dict[str, Any]:
+    """Synchronous entry point for the CLI."""
+    return asyncio.run(
+        ollama_client.closing(
+            _warm_and_close(
+                questions_path=questions_path,
+                state_path=state_path,
+                concurrency=concurrency,
+                limit=limit,
+                on_progress=on_progress,
+            )
+        )
+    )
@@ -4,6 +4,10 @@ Provides the 'agentic-eval' command with subcommands:
   - generate: Create synthetic test set from DB chunks
   - evaluate: Run retrieval+answer pipeline and compute RAGAS metrics
   - report: Pretty-print evaluation results
+  - bench-vector: Compare pgvector and local vector backend latency/recall
+  - bench-db: Compare the SQLAlchemy and asyncpg fast-path data access
+  - bench-rerank: Compare LLM, cascade and cross-encoder reranker latency/quality
+  - warm-cache: Pre-populate the semantic cache from a question list
 """
 
 import time
@@ -12,11 +16,14 @@ from pathlib import Path
 
 import typer
 from rich.console import Console
+from rich.progress import Progress
 from rich.table import Table
 
 from agentic_rag.core.config import settings
 from agentic_rag.core.observability import setup_observability
 from agentic_rag.core.prompts import PromptRegistry
+from agentic_rag.evaluator.benchmarks import bench_db_sync, bench_rerank_sync, bench_vector_sync
+from agentic_rag.evaluator.cache_warmer import pending_questions, warm_cache_sync
 from agentic_rag.evaluator.generation import generate_sync
 from agentic_rag.evaluator.metrics import evaluate_sync
 
@@ -87,6 +94,126 @@ def report(
     console.print(table)
 
 
+@app.command("bench-vector")
+def bench_vector(
+    testset: str = typer.Option(..., help="Path to test set JSON (questions are used as queries)"),
+    output: str = typer.Option("bench_vector.json", help="Output path for benchmark JSON"),
+    repeats: int = typer.Option(5, help="Timed runs per query and backend"),
+    limit: int | None = typer.Option(None, help="Only use the first N questions"),
+):
+    """Benchmark the pgvector vector leg against the local memory-mapped index."""
+    console.print(f"[bold]Benchmarking vector backends:[/bold] {testset} -> {output}")
+    result = bench_vector_sync(
+        testset_path=testset, output_path=output, repeats=repeats, limit=limit
+    )
+
+    table = Table(title=f"Vector backends ({result['config']['index_rows']} rows)")
+    table.add_column("Backend", style="cyan")
+    for col in ("mean_ms", "p50_ms", "p95_ms"):
+        table.add_column(col, style="green")
+    for backend in ("pgvector", "local"):
+        stats = result[backend]
+        table.add_row(backend, *(f"{stats[c]:.3f}" for c in ("mean_ms", "p50_ms", "p95_ms")))
+    console.print(table)
+    console.print(f"local overlap@k vs pgvector: {result['local_overlap_at_k']}")
+
+
+@app.command("bench-db")
+def bench_db(
+    testset: str = typer.Option(..., help="Path to test set JSON (questions are used as queries)"),
+    output: str = typer.Option("bench_db.json", help="Output path for benchmark JSON"),
+    repeats: int = typer.Option(5, help="Timed runs per query and path"),
+    limit: int | None = typer.Option(None, help="Only use the first N questions"),
+):
+    """Benchmark hot queries on the SQLAlchemy path vs the asyncpg fast path."""
+    console.print(f"[bold]Benchmarking DB access paths:[/bold] {testset} -> {output}")
+    result = bench_db_sync(testset_path=testset, output_path=output, repeats=repeats, limit=limit)
+
+    table = Table(title="DB access paths (per operation)")
+    table.add_column("Operation", style="cyan")
+    table.add_column("Path", style="cyan")
+    for col in ("p50_ms", "p95_ms", "cpu_mean_ms"):
+        table.add_column(col, style="green")
+    for op in ("retrieval", "cache_lookup", "history"):
+        for path in ("sqlalchemy", "asyncpg"):
+            stats = result[path][op]
+            table.add_row(
+                op, path, *(f"{stats[c]:.3f}" for c in ("p50_ms", "p95_ms", "cpu_mean_ms"))
+            )
+    console.print(table)
+    console.print(f"identical retrieval results: {result['identical_results']}")
+
+
+@app.command("bench-rerank")
+def bench_rerank(
+    testset: str = typer.Option(..., help="Path to test set JSON produced by generate"),
+    output: str = typer.Option("bench_rerank.json", help="Output path for benchmark JSON"),
+    candidates: int = typer.Option(10, help="Retrieved candidates passed to each reranker"),
+    limit: int | None = typer.Option(None, help="Only use the first N questions"),
+):
+    """Benchmark the LLM, cascade and cross-encoder rerankers."""
+    console.print(f"[bold]Benchmarking rerankers:[/bold] {testset} -> {output}")
+    result = bench_rerank_sync(
+        testset_path=testset, output_path=output, candidates=candidates, limit=limit
+    )
+
+    table = Table(title=f"Rerankers ({result['config']['candidates']} candidates)")
+    table.add_column("Backend", style="cyan")
+    for col in ("p50_ms", "p95_ms", "mrr", "ndcg_at_k", "hit_rate"):
+        table.add_column(col, style="green")
+    for backend in ("retrieval", "llm", "cascade", "cross_encoder"):
+        if backend not in result:
+            continue
+        latency = result[backend].get("latency", {})
+        quality = result[backend]["quality"]
+        table.add_row(
+            backend,
+            *(f"{latency[c]:.1f}" if c in latency else "-" for c in ("p50_ms", "p95_ms")),
+            *(f"{quality[c]:.3f}" for c in ("mrr", "ndcg_at_k", "hit_rate")),
+        )
+    console.print(table)
+    console.print(f"cascade escalation rate: {result['cascade_escalation']['escalation_rate']}")
+
+
+@app.command("warm-cache")
+def warm_cache(
+    questions: str = typer.Option(
+        ..., help="Test set JSON (from generate) or text file with one question per line"
+    ),
+    state: str = typer.Option(
+        "warm_cache_state.jsonl", help="Progress file; rerun with the same file to resume"
+    ),
+    concurrency: int = typer.Option(2, help="Questions answered concurrently"),
+    limit: int | None = typer.Option(None, help="Only use the first N questions"),
+):
+    """Pre-populate the semantic cache for the current index signature."""
+    _init_phoenix()
+    console.print(f"[bold]Warming semantic cache:[/bold] {questions} (state: {state})")
+    total, pending = pending_questions(questions, state, limit)
+    console.print(f"{len(pending)} of {len(total)} questions pending")
+    with Progress(console=console) as progress:
+        task = progress.add_task("Warming", total=len(pending))
+
+        def on_progress(question: str, status: str) -> None:
+            progress.advance(task)
+            progress.console.print(f"[dim]{status:>12}[/dim]  {question[:80]}")
+
+        counts = warm_cache_sync(
+            questions_path=questions,
+            state_path=state,
+            concurrency=concurrency,
+            limit=limit,
+            on_progress=on_progress,
+        )
+
+    table = Table(title="Cache warm-up")
+    table.add_column("Outcome", style="cyan")
+    table.add_column("Questions", style="green")
+    for outcome, count in sorted(counts.items()):
+        table.add_row(outcome, str(count))
+    console.print(table)
+
+
 @app.command()
 def monitor(
     testset: str = typer.Option(..., help="Path to test set JSON"),
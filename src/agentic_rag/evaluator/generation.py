@@ -15,8 +15,11 @@ from typing import Any
 import structlog
 from sqlalchemy import text
 
+from agentic_rag.core import ollama_client
 from agentic_rag.core.database import AsyncSessionLocal
-from agentic_rag.core.llm_factory import get_llm
+from agentic_rag.core.index_signature import active_index_signature
+from agentic_rag.core.llm_factory import LLMBuckets
+from agentic_rag.core.llm_scheduler import Priority, llm_slot
 from agentic_rag.core.prompts import PromptRegistry
 
 logger = structlog.get_logger()
@@ -57,14 +60,17 @@ async def _fetch_random_chunks(limit: int = 50) -> list[dict[str, Any]]:
           c.content as content
         FROM chunks c
         JOIN documents d ON d.id = c.document_id
-        WHERE COALESCE((c.metadata->>'is_toc')::boolean, false) = false
-          AND COALESCE((c.metadata->>'is_front_matter')::boolean, false) = false
+        WHERE c.index_signature = :index_signature
+          AND NOT c.is_toc
+          AND NOT c.is_front_matter
         ORDER BY random()
         LIMIT :limit
         """
     )
     async with AsyncSessionLocal() as session:
-        res = await session.execute(sql, {"limit": limit})
+        res = await session.execute(
+            sql, {"limit": limit, "index_signature": active_index_signature()}
+        )
         rows = res.mappings().all()
         return [dict(r) for r in rows]
 
@@ -77,7 +83,7 @@ async def generate_synthetic_testset(
 ) -> list[TestSample]:
     """Generate synthetic Q/A pairs from random chunks using the local LLM."""
     random.seed(seed)
-    llm = get_llm()
+    llms = LLMBuckets()
 
     # Pull more candidates than needed to tolerate LLM failures
     candidates = await _fetch_random_chunks(limit=max(50, num_samples * 3))
@@ -96,7 +102,8 @@ async def generate_synthetic_testset(
         prompt = PromptRegistry.render("qa_generation_template", context=context)
 
         try:
-            resp = await llm.acomplete(prompt)
+            async with llm_slot(Priority.BACKGROUND):
+                resp = await llms.for_prompt(prompt).acomplete(prompt)
             data = _safe_json_loads(resp.text or "")
             if not data:
                 logger.warning("Failed to parse JSON from generator", file=row["file_name"])
@@ -133,5 +140,7 @@ async def generate_synthetic_testset(
 def generate_sync(num_samples: int, output_path: str, seed: int = 42) -> None:
     """Synchronous entry point for the CLI."""
     asyncio.run(
-        generate_synthetic_testset(num_samples=num_samples, output_path=output_path, seed=seed)
+        ollama_client.closing(
+            generate_synthetic_testset(num_samples=num_samples, output_path=output_path, seed=seed)
+        )
     )
@@ -15,11 +15,18 @@ from typing import Any
 import pandas as pd
 import structlog
 
-from agentic_rag.backend.rag.reranker import LLMReranker
+from agentic_rag.backend.rag.reranker import get_reranker
 from agentic_rag.backend.rag.retriever import HybridRetriever
+from agentic_rag.core import ollama_client
 from agentic_rag.core.citations import format_citations
 from agentic_rag.core.config import settings
-from agentic_rag.core.llm_factory import get_embedding_model, get_eval_llm, get_llm
+from agentic_rag.core.llm_factory import (
+    fit_num_ctx,
+    get_embedding_model,
+    get_eval_llm,
+    get_llm,
+)
+from agentic_rag.core.llm_scheduler import Priority, llm_slot
 from agentic_rag.core.prompts import PromptRegistry
 from agentic_rag.core.schemas import Citation
 
@@ -179,7 +186,6 @@ def _format_context(
 
 async def _answer_with_fast_rag(question: str, citations: list[Citation]) -> str:
     """Single-call answer generation using the user_prompt template."""
-    llm = get_llm(request_timeout=float(settings.EVAL_TIMEOUT))
     context = _format_context(citations)
 
     prompt = ""
@@ -195,7 +201,9 @@ async def _answer_with_fast_rag(question: str, citations: list[Citation]) -> str
             f"Question: {question}\n\nContext:\n{context}\n"
         )
 
-    resp = await llm.acomplete(prompt)
+    llm = get_llm(request_timeout=float(settings.EVAL_TIMEOUT), num_ctx=fit_num_ctx(prompt))
+    async with llm_slot(Priority.BACKGROUND):
+        resp = await llm.acomplete(prompt)
     return (resp.text or "").strip()
 
 
@@ -242,8 +250,7 @@ async def evaluate_rag_pipeline(
 
     reranker = None
     if use_reranker:
-        reranker = LLMReranker()
-        reranker._semaphore = asyncio.Semaphore(1)
+        reranker = get_reranker()
 
     for item in testset:
         q = item["question"]
@@ -445,10 +452,12 @@ def evaluate_sync(
 ) -> None:
     """Synchronous entry point for the CLI."""
     asyncio.run(
-        evaluate_rag_pipeline(
-            testset_path=testset_path,
-            output_path=output_path,
-            use_reranker=use_reranker,
-            skip_ragas=skip_ragas,
+        ollama_client.closing(
+            evaluate_rag_pipeline(
+                testset_path=testset_path,
+                output_path=output_path,
+                use_reranker=use_reranker,
+                skip_ragas=skip_ragas,
+            )
         )
     )
@@ -11,7 +11,10 @@ from sqlalchemy import text
 
 from agentic_rag.core.config import settings
 from agentic_rag.core.database import AsyncSessionLocal
-from agentic_rag.core.llm_factory import get_embedding_model, get_llm, get_tokenizer
+from agentic_rag.core.embedding_batcher import embed_texts
+from agentic_rag.core.index_signature import active_index_signature
+from agentic_rag.core.llm_factory import LLMBuckets, get_tokenizer
+from agentic_rag.core.llm_scheduler import Priority, llm_slot
 from agentic_rag.core.prompts import PromptRegistry
 
 logger = structlog.get_logger()
@@ -22,6 +25,9 @@ _HEADING_RE = re.compile(r"^(#{2,6})\s+(.+)$", re.MULTILINE)
 # Max lines kept for TOC/front-matter chunks (reduce noise)
 _FRONTMATTER_MAX_LINES = 40
 
+# Output budget (num_ctx sizing) for the 1-2 sentence chunk context
+_CONTEXT_OUTPUT_TOKENS = 256
+
 
 class ContextualChunker:
     """Heading-first chunking with section metadata and batch processing."""
@@ -32,9 +38,7 @@ class ContextualChunker:
             chunk_overlap=settings.CHUNK_OVERLAP,
             tokenizer=get_tokenizer(),
         )
-        self.llm = get_llm()
-        self.embed_model = get_embedding_model()
-        self._semaphore = asyncio.Semaphore(3)
+        self.llms = LLMBuckets()
 
     @staticmethod
     def _split_by_headings(text: str) -> list[dict[str, Any]]:
@@ -229,10 +233,9 @@ class ContextualChunker:
             # Embed only cache misses
             misses = [p for p in prepared if p["chunk_hash"] not in cached_embeddings]
             if misses:
-                embed_tasks = [
-                    self.embed_model.aget_text_embedding(p["contextual_content"]) for p in misses
-                ]
-                miss_embeddings = await asyncio.gather(*embed_tasks)
+                miss_embeddings = await embed_texts(
+                    [p["contextual_content"] for p in misses], Priority.INGESTION
+                )
                 for p, emb in zip(misses, miss_embeddings, strict=False):
                     p["embedding"] = emb
 
@@ -279,8 +282,9 @@ class ContextualChunker:
             "page_number": section_info.get("page_number"),
             "section_title": section_info["section_title"] or None,
             "section_path": section_path or None,
-            "is_toc": section_info["is_toc"],
-            "is_front_matter": section_info["is_front_matter"],
+            # Strict booleans: chunks.is_toc / is_front_matter are generated from these
+            "is_toc": bool(section_info["is_toc"]),
+            "is_front_matter": bool(section_info["is_front_matter"]),
             "chunk_index_in_section": section_info["chunk_index_in_section"],
         }
 
@@ -302,16 +306,12 @@ class ContextualChunker:
             SELECT chunk_hash, embedding
             FROM chunks
             WHERE chunk_hash = ANY(:hashes)
-              AND index_version = :index_version
-              AND embedding_model = :embedding_model
-              AND embedding_dimension = :embedding_dimension
+              AND index_signature = :index_signature
             """
         )
         params = {
             "hashes": chunk_hashes,
-            "index_version": settings.INDEX_VERSION,
-            "embedding_model": settings.EMBEDDING_MODEL,
-            "embedding_dimension": settings.EMBEDDING_DIMENSION,
+            "index_signature": active_index_signature(),
         }
 
         async with AsyncSessionLocal() as session:
@@ -326,9 +326,10 @@ class ContextualChunker:
         prompt = PromptRegistry.render(
             "context_generation_template", document_text=truncated_doc, chunk_text=chunk
         )
-        async with self._semaphore:
+        async with llm_slot(Priority.INGESTION):
             try:
-                response = await self.llm.acomplete(prompt)
+                llm = self.llms.for_prompt(prompt, output_tokens=_CONTEXT_OUTPUT_TOKENS)
+                response = await llm.acomplete(prompt)
                 return str(response.text).strip()
             except Exception as e:
                 logger.warning("Context generation failed", error=str(e))
@@ -9,6 +9,7 @@ from pathlib import Path
 import typer
 from rich.console import Console
 
+from agentic_rag.core import ollama_client
 from agentic_rag.core.config import settings
 from agentic_rag.core.llm_factory import configure_global_settings, validate_embedding_dimension
 from agentic_rag.core.prompts import PromptRegistry
@@ -50,7 +51,7 @@ def ingest(
     pipeline = IngestionPipeline()
 
     try:
-        asyncio.run(pipeline.run(source, mode=mode))
+        asyncio.run(ollama_client.closing(pipeline.run(source, mode=mode)))
         console.print("[bold green]All processing complete![/bold green]")
     except KeyboardInterrupt:
         console.print("[yellow]Ingestion stopped by user.[/yellow]")
@@ -13,6 +13,7 @@ from sqlalchemy import select
 
 from agentic_rag.core.config import settings
 from agentic_rag.core.database import AsyncSessionLocal
+from agentic_rag.core.index_signature import active_index_signature, ensure_active_partitions
 from agentic_rag.core.models import Chunk, Document
 from agentic_rag.core.observability import setup_observability
 from agentic_rag.indexer.chunking import ContextualChunker
@@ -58,6 +59,9 @@ class IngestionPipeline:
             return
 
         print(f"Found {len(files)} documents. Starting pipeline (Mode: {mode})...")
+        # Chunks are written only to the active signature's partition.
+        await ensure_active_partitions()
+        index_signature = active_index_signature()
 
         with Progress(
             SpinnerColumn(),
@@ -118,6 +122,7 @@ class IngestionPipeline:
                                 index_version=settings.INDEX_VERSION,
                                 embedding_model=settings.EMBEDDING_MODEL,
                                 embedding_dimension=settings.EMBEDDING_DIMENSION,
+                                index_signature=index_signature,
                             )
                             for c in chunks_data
                         ]
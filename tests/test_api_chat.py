@@ -19,8 +19,11 @@ from agentic_rag.backend.api.v1.chat_service import (
     _is_conversational,
     _is_openwebui_internal_request,
     _route_decision,
+    answer_for_cache,
 )
 from agentic_rag.core.config import settings
+from agentic_rag.core.context_packer import NO_CONTEXT_MESSAGE
+from agentic_rag.core.llm_scheduler import Priority
 from agentic_rag.core.schemas import OpenAIChatMessage
 
 
@@ -166,6 +169,35 @@ class TestFormatContextForLLM:
         result = _format_context_for_llm([])
         assert "No relevant information found" in result
 
+    def test_exhausted_budget_uses_no_context_message(self, sample_citations):
+        result = _format_context_for_llm(sample_citations, budget_tokens=8)
+        assert result == NO_CONTEXT_MESSAGE
+
+
+class TestAnswerForCache:
+    @pytest.mark.asyncio
+    async def test_answers_without_history_at_background_priority(self, sample_citations):
+        prefix = "agentic_rag.backend.api.v1.chat_service"
+        with (
+            patch(f"{prefix}._retrieve_and_rerank", AsyncMock(return_value=sample_citations)),
+            patch(f"{prefix}._fast_rag_response", AsyncMock(return_value=("A", {}))) as fast,
+        ):
+            result = await answer_for_cache("What is PDPL?")
+
+        assert result == ("A", sample_citations)
+        kwargs = fast.await_args.kwargs
+        assert kwargs["priority"] == Priority.BACKGROUND
+        assert "What is PDPL?" in kwargs["user_prompt"]
+        assert "PDPL applies" in kwargs["user_prompt"]
+
+    @pytest.mark.asyncio
+    async def test_no_citations_returns_none(self):
+        with patch(
+            "agentic_rag.backend.api.v1.chat_service._retrieve_and_rerank",
+            AsyncMock(return_value=[]),
+        ):
+            assert await answer_for_cache("What is PDPL?") is None
+
 
 class TestGetSessionId:
     def test_header_priority(self):
@@ -265,7 +297,7 @@ class TestStreamingCitationsAfterStop:
     @patch("agentic_rag.backend.api.v1.chat_service.ConversationMemory")
     @patch("agentic_rag.backend.api.v1.chat_service.ScopeGate.is_in_scope", new_callable=AsyncMock)
     @patch("agentic_rag.backend.api.v1.streaming._prepare_rag", new_callable=AsyncMock)
-    @patch("agentic_rag.backend.api.v1.streaming.ollama_chat_stream")
+    @patch("agentic_rag.backend.api.v1.streaming.cached_chat_stream")
     async def test_citations_before_stop(
         self,
         mock_stream,
@@ -361,7 +393,7 @@ class TestStreamingErrorClosesThinkTag:
     @patch("agentic_rag.backend.api.v1.chat_service.ConversationMemory")
     @patch("agentic_rag.backend.api.v1.chat_service.ScopeGate.is_in_scope", new_callable=AsyncMock)
     @patch("agentic_rag.backend.api.v1.streaming._prepare_rag", new_callable=AsyncMock)
-    @patch("agentic_rag.backend.api.v1.streaming.ollama_chat_stream")
+    @patch("agentic_rag.backend.api.v1.streaming.cached_chat_stream")
     async def test_think_tag_closed_on_error(
         self, mock_stream, mock_prepare, mock_scope, mock_memory, monkeypatch
     ):
@@ -0,0 +1,140 @@
+"""Tests for agentic_rag.evaluator.cache_warmer (pipeline stages replaced by fakes)."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from agentic_rag.backend.rag.semantic_cache import query_hash
+from agentic_rag.core.config import settings
+from agentic_rag.evaluator import cache_warmer
+from agentic_rag.evaluator.cache_warmer import load_questions, pending_questions
+
+
+class TestLoadQuestions:
+    def test_text_file_skips_comments_blanks_and_repeats(self, tmp_path):
+        path = tmp_path / "questions.txt"
+        path.write_text("What is PDPL?\n# heading\n\n  what is   PDPL?\nWho enforces it?\n")
+
+        assert load_questions(str(path)) == ["What is PDPL?", "Who enforces it?"]
+
+    def test_testset_json(self, tmp_path):
+        path = tmp_path / "testset.json"
+        path.write_text(json.dumps([{"question": "Q1", "ground_truth": "A"}, {"x": 1}, "Q2"]))
+
+        assert load_questions(str(path)) == ["Q1", "Q2"]
+        assert load_questions(str(path), limit=1) == ["Q1"]
+
+
+class TestResumeState:
+    def test_only_finished_questions_for_active_signature_are_skipped(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(cache_warmer, "active_index_signature", lambda: "v2")
+        questions = tmp_path / "q.txt"
+        questions.write_text("Q1\nQ2\nQ3\nQ4\n")
+        state = tmp_path / "state.jsonl"
+        records = [
+            {"signature": "v2", "hash": query_hash("Q1"), "status": "stored"},
+            {"signature": "v2", "hash": query_hash("Q2"), "status": "failed"},
+            {"signature": "v1", "hash": query_hash("Q3"), "status": "stored"},
+        ]
+        state.write_text("\n".join(json.dumps(r) for r in records) + '\n{"torn')
+
+        total, pending = pending_questions(str(questions), str(state))
+
+        assert len(total) == 4
+        assert pending == ["Q2", "Q3", "Q4"]
+
+
+class _Pipeline:
+    """Fake pipeline stages; outcomes are picked by the question text."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prefetched: list[int] = []
+        self.generated: list[str] = []
+        self.stored: list[str] = []
+        self.broken = {"Broken"}
+        self.partition_checks = 0
+
+    async def is_in_scope(self, question, embeddings=None):
+        return question != "Off topic", 0.9
+
+    async def lookup_cache(self, question, embeddings=None):
+        return object() if question == "Cached" else None
+
+    async def answer_for_cache(self, question, embeddings=None):
+        if question == "Empty":
+            return None
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        self.generated.append(question)
+        if question in self.broken:
+            raise RuntimeError("ollama down")
+        return f"answer to {question}", ["citation"]
+
+    async def ensure_active_partitions(self):
+        self.partition_checks += 1
+
+    async def store_cache(self, question, answer, citations, embeddings=None):
+        self.stored.append(question)
+
+    async def prefetch(self, contexts, priority):
+        self.prefetched.append(len(contexts))
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    fake = _Pipeline()
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "EMBED_BATCH_MAX_SIZE", 8)
+    monkeypatch.setattr(cache_warmer, "active_index_signature", lambda: "v2")
+    monkeypatch.setattr(cache_warmer, "ScopeGate", SimpleNamespace(is_in_scope=fake.is_in_scope))
+    monkeypatch.setattr(cache_warmer, "lookup_cache", fake.lookup_cache)
+    monkeypatch.setattr(cache_warmer, "answer_for_cache", fake.answer_for_cache)
+    monkeypatch.setattr(cache_warmer, "ensure_active_partitions", fake.ensure_active_partitions)
+    monkeypatch.setattr(cache_warmer, "store_cache", fake.store_cache)
+    monkeypatch.setattr(cache_warmer, "prefetch_query_embeddings", fake.prefetch)
+    return fake
+
+
+class TestWarmCache:
+    @pytest.mark.asyncio
+    async def test_counts_state_concurrency_and_resume(self, tmp_path, pipeline):
+        questions = tmp_path / "q.txt"
+        questions.write_text("Q1\nCached\nOff topic\nEmpty\nBroken\nQ2\nQ3\n")
+        state = tmp_path / "state.jsonl"
+
+        counts = await cache_warmer.warm_cache(str(questions), str(state), concurrency=2)
+
+        assert counts == {
+            "resumed": 0,
+            "stored": 3,
+            "cached": 1,
+            "out_of_scope": 1,
+            "no_context": 1,
+            "failed": 1,
+        }
+        # Cached, off-topic and empty questions never reach generation
+        assert sorted(pipeline.generated) == ["Broken", "Q1", "Q2", "Q3"]
+        assert sorted(pipeline.stored) == ["Q1", "Q2", "Q3"]
+        assert pipeline.max_in_flight == 2
+        assert pipeline.partition_checks == 1
+        # One embedding prefetch per window of max(concurrency, EMBED_BATCH_MAX_SIZE // 2)
+        assert pipeline.prefetched == [4, 3]
+        records = [json.loads(line) for line in state.read_text().splitlines()]
+        assert {r["hash"]: r["status"] for r in records}[query_hash("Broken")] == "failed"
+        assert len(records) == 7 and all(r["signature"] == "v2" for r in records)
+
+        pipeline.broken.clear()
+        pipeline.generated.clear()
+        counts = await cache_warmer.warm_cache(str(questions), str(state), concurrency=2)
+
+        assert counts == {"resumed": 6, "stored": 1}
+        assert pipeline.generated == ["Broken"]
+        assert pipeline.prefetched[-1] == 1
+        last = json.loads(state.read_text().splitlines()[-1])
+        assert last == {"signature": "v2", "hash": query_hash("Broken"), "status": "stored"}
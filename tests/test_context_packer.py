@@ -0,0 +1,67 @@
+"""Tests for agentic_rag.core.context_packer."""
+
+from agentic_rag.core.context_packer import pack_passages, trim_to_tokens
+
+
+def _words(text: str) -> int:
+    return len(text.split())
+
+
+class TestTrimToTokens:
+    def test_cuts_at_sentence_boundary(self):
+        text = "One two three. Four five six. Seven eight nine."
+        assert trim_to_tokens(text, 7, _words) == "One two three. Four five six."
+
+    def test_falls_back_to_word_boundary(self):
+        text = "one two three four five six seven. Next."
+        assert trim_to_tokens(text, 4, _words) == "one two three four"
+
+    def test_short_text_unchanged(self):
+        assert trim_to_tokens("  fits fine. ", 10, _words) == "fits fine."
+
+
+class TestPackPassages:
+    def test_fills_budget_in_rank_order_and_trims_last(self):
+        passages = [
+            " ".join(["alpha"] * 40) + ".",
+            "Beta one. " * 25,
+            " ".join(["gamma"] * 10) + ".",
+        ]
+
+        packed = pack_passages(passages, 80, dedup_threshold=None, count=_words)
+
+        assert [i for i, _ in packed] == [0, 1]
+        assert packed[0][1] == passages[0]
+        assert packed[1][1] == ("Beta one. " * 20).strip()
+
+    def test_drops_near_duplicates(self):
+        base = "Controllers must notify the supervisory authority within seventy two hours"
+        passages = [base + " of a breach.", base + " of any breach.", "Fines reach two percent."]
+
+        packed = pack_passages(passages, 500, count=_words)
+
+        assert [i for i, _ in packed] == [0, 2]
+
+    def test_overhead_and_per_passage_cap(self):
+        packed = pack_passages(
+            ["a b c d e f g h i j. " * 10],
+            1000,
+            overhead_tokens=[5],
+            max_passage_tokens=40,
+            count=_words,
+        )
+
+        assert len(packed) == 1
+        assert _words(packed[0][1]) == 40
+
+    def test_exhausted_budget_packs_nothing(self):
+        passages = ["a b c d e f g h i j. " * 10]
+
+        assert pack_passages(passages, 40, overhead_tokens=[10], count=_words) == []
+
+    def test_short_trailing_passage_still_packed(self):
+        passages = ["a b c d e f g h i j. " * 10, "Short answer.", "x y. " * 20]
+
+        packed = pack_passages(passages, 40, overhead_tokens=[10, 10, 10], count=_words)
+
+        assert packed == [(1, "Short answer.")]
@@ -0,0 +1,156 @@
+"""Tests for agentic_rag.backend.rag.cross_encoder (fake ONNX session, real tokenizer)."""
+
+import sys
+import types
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from tokenizers import Tokenizer, models, pre_tokenizers, processors
+
+from agentic_rag.backend.rag.cascade import CascadeReranker
+from agentic_rag.backend.rag.cross_encoder import CrossEncoderModel, CrossEncoderReranker
+from agentic_rag.backend.rag.reranker import LLMReranker, get_reranker
+from agentic_rag.core.config import settings
+from tests.conftest import make_node_with_score
+
+_VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "privacy", "data", "protection", "law", "rules"]
+
+
+class _FakeSession:
+    """Returns (real tokens - 6) as the logit, so longer inputs score higher."""
+
+    def __init__(self, path, sess_options=None, providers=None):
+        self.feeds: list[dict] = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input_ids"), SimpleNamespace(name="attention_mask")]
+
+    def run(self, outputs, feeds):
+        self.feeds.append(feeds)
+        return [feeds["attention_mask"].sum(axis=1, keepdims=True).astype(np.float32) - 6]
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    tokenizer = Tokenizer(models.WordLevel({w: i for i, w in enumerate(_VOCAB)}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]",
+        pair="[CLS] $A [SEP] $B:1 [SEP]:1",
+        special_tokens=[("[CLS]", 2), ("[SEP]", 3)],
+    )
+    tokenizer.save(str(tmp_path / "tokenizer.json"))
+    (tmp_path / "model.onnx").touch()
+
+    fake_ort = types.ModuleType("onnxruntime")
+    fake_ort.SessionOptions = SimpleNamespace
+    fake_ort.InferenceSession = _FakeSession
+    monkeypatch.setitem(sys.modules, "onnxruntime", fake_ort)
+    monkeypatch.setattr(settings, "CROSS_ENCODER_MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(CrossEncoderModel, "_instance", None)
+    monkeypatch.setattr(CrossEncoderModel, "_load_error", None)
+    return tmp_path
+
+
+def _nodes(count: int):
+    return [
+        make_node_with_score("doc-1", f"c{i}", f"passage {i} " + "x" * 50, score=1.0 - i / 10)
+        for i in range(count)
+    ]
+
+
+class _FixedModel:
+    def __init__(self, scores):
+        self.scores = scores
+        self.calls: list[list[str]] = []
+
+    def score(self, query, passages):
+        self.calls.append(passages)
+        return self.scores[: len(passages)]
+
+
+class TestCrossEncoderModel:
+    def test_batches_truncates_pairs_and_feeds_only_model_inputs(self, model_dir, monkeypatch):
+        monkeypatch.setattr(settings, "CROSS_ENCODER_BATCH_SIZE", 2)
+        monkeypatch.setattr(settings, "CROSS_ENCODER_MAX_LENGTH", 6)
+        model = CrossEncoderModel()
+
+        scores = model.score("privacy", ["law", "data law", "data protection law rules"])
+
+        assert [len(f["input_ids"]) for f in model.session.feeds] == [2, 1]
+        assert all(f["input_ids"].shape[1] <= 6 for f in model.session.feeds)
+        assert all(set(f) == {"input_ids", "attention_mask"} for f in model.session.feeds)
+        # [CLS] privacy [SEP] + passage + [SEP], passage cut to fit 6 tokens
+        sigmoid = 1.0 / (1.0 + np.exp(-np.array([-1.0, 0.0, 0.0])))
+        assert scores == pytest.approx(sigmoid.tolist())
+
+    def test_two_class_head_uses_positive_margin(self, model_dir, monkeypatch):
+        monkeypatch.setattr(
+            _FakeSession,
+            "run",
+            lambda self, outputs, feeds: [np.array([[2.0, 0.0], [0.0, 3.0]], dtype=np.float32)],
+        )
+
+        scores = CrossEncoderModel().score("privacy", ["law", "rules"])
+
+        assert scores == pytest.approx([1 / (1 + np.exp(2.0)), 1 / (1 + np.exp(-3.0))])
+
+
+class TestCrossEncoderReranker:
+    @pytest.mark.asyncio
+    async def test_scores_top_n_window_with_truncated_passages(self, monkeypatch):
+        monkeypatch.setattr(settings, "TOP_K_RERANK", 2)
+        monkeypatch.setattr(settings, "RERANKER_MAX_PASSAGE_CHARS", 10)
+        model = _FixedModel([0.1, 0.9, 0.5, 0.7])
+
+        ranked = await CrossEncoderReranker(model=model).rerank("q", _nodes(6))
+
+        assert len(model.calls) == 1 and len(model.calls[0]) == 4
+        assert all(len(p) == 10 for p in model.calls[0])
+        assert [n.node.node_id for n in ranked] == ["c1", "c3"]
+        assert [n.score for n in ranked] == pytest.approx([0.9, 0.7])
+
+    @pytest.mark.asyncio
+    async def test_failure_keeps_retrieval_order(self, monkeypatch):
+        monkeypatch.setattr(settings, "TOP_K_RERANK", 2)
+        model = _FixedModel([])
+        model.score = lambda query, passages: 1 / 0
+
+        ranked = await CrossEncoderReranker(model=model).rerank("q", _nodes(3))
+
+        assert [n.node.node_id for n in ranked] == ["c0", "c1"]
+
+
+class TestRerankerSelection:
+    def test_selects_backend_from_settings(self, model_dir, monkeypatch):
+        monkeypatch.setattr(settings, "RERANKER_BACKEND", "cross_encoder")
+        assert isinstance(get_reranker(), CrossEncoderReranker)
+
+        monkeypatch.setattr(settings, "RERANKER_BACKEND", "cascade")
+        assert isinstance(get_reranker(), CascadeReranker)
+
+        monkeypatch.setattr(settings, "RERANKER_BACKEND", "llm")
+        assert isinstance(get_reranker(), LLMReranker)
+
+    def test_cross_encoder_falls_back_to_llm_without_onnxruntime(self, model_dir, monkeypatch):
+        monkeypatch.setattr(settings, "RERANKER_BACKEND", "cross_encoder")
+        monkeypatch.setitem(sys.modules, "onnxruntime", None)
+
+        assert isinstance(get_reranker(), LLMReranker)
+        assert CrossEncoderModel._instance is None
+
+    def test_cross_encoder_falls_back_to_llm_when_model_fails_to_load(self, model_dir, monkeypatch):
+        loads: list[str] = []
+
+        def corrupt(path, sess_options=None, providers=None):
+            loads.append(path)
+            raise RuntimeError("INVALID_PROTOBUF")
+
+        monkeypatch.setattr(settings, "RERANKER_BACKEND", "cross_encoder")
+        monkeypatch.setattr(sys.modules["onnxruntime"], "InferenceSession", corrupt)
+
+        assert isinstance(get_reranker(), LLMReranker)
+        assert isinstance(get_reranker(), LLMReranker)
+        # The failed load is remembered instead of retried per request
+        assert len(loads) == 1
@@ -0,0 +1,92 @@
+"""Tests for agentic_rag.core.embedding_batcher."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, call, patch
+
+import pytest
+
+from agentic_rag.core.embedding_batcher import EmbeddingBatcher
+from agentic_rag.core.llm_scheduler import Priority
+
+
+async def _embed(texts):
+    return [[float(len(t))] for t in texts]
+
+
+class TestEmbeddingBatcher:
+    @pytest.mark.asyncio
+    @patch("agentic_rag.core.embedding_batcher.ollama_embed", new_callable=AsyncMock)
+    async def test_concurrent_requests_share_one_call(self, mock_embed):
+        mock_embed.side_effect = _embed
+        batcher = EmbeddingBatcher(window_ms=20, max_batch=32)
+
+        results = await asyncio.gather(
+            batcher.embed("a"), batcher.embed("bb"), batcher.embed("ccc")
+        )
+
+        assert results == [[1.0], [2.0], [3.0]]
+        mock_embed.assert_awaited_once_with(["a", "bb", "ccc"])
+
+    @pytest.mark.asyncio
+    @patch("agentic_rag.core.embedding_batcher.ollama_embed", new_callable=AsyncMock)
+    async def test_identical_texts_deduplicated(self, mock_embed):
+        mock_embed.side_effect = _embed
+        batcher = EmbeddingBatcher(window_ms=20, max_batch=32)
+
+        results = await asyncio.gather(batcher.embed("same"), batcher.embed(" same "))
+
+        assert results == [[4.0], [4.0]]
+        mock_embed.assert_awaited_once_with(["same"])
+
+    @pytest.mark.asyncio
+    @patch("agentic_rag.core.embedding_batcher.ollama_embed", new_callable=AsyncMock)
+    async def test_max_batch_flushes_early(self, mock_embed):
+        mock_embed.side_effect = _embed
+        batcher = EmbeddingBatcher(window_ms=10_000, max_batch=2)
+
+        results = await asyncio.wait_for(batcher.embed_many(["a", "bb", "ccc", "dddd"]), 1.0)
+
+        assert results == [[1.0], [2.0], [3.0], [4.0]]
+        assert mock_embed.await_count == 2
+
+    @pytest.mark.asyncio
+    @patch("agentic_rag.core.embedding_batcher.ollama_embed", new_callable=AsyncMock)
+    async def test_failure_propagates_to_all_waiters(self, mock_embed):
+        mock_embed.side_effect = ConnectionError("down")
+        batcher = EmbeddingBatcher(window_ms=5, max_batch=32)
+
+        results = await asyncio.gather(
+            batcher.embed("a"), batcher.embed("b"), return_exceptions=True
+        )
+
+        assert all(isinstance(r, ConnectionError) for r in results)
+
+    @pytest.mark.asyncio
+    @patch("agentic_rag.core.embedding_batcher.llm_slot")
+    @patch("agentic_rag.core.embedding_batcher.ollama_embed", new_callable=AsyncMock)
+    async def test_priority_classes_batch_separately(self, mock_embed, mock_slot):
+        mock_embed.side_effect = _embed
+        slots: list[Priority] = []
+
+        @asynccontextmanager
+        async def slot(priority):
+            slots.append(priority)
+            yield
+
+        mock_slot.side_effect = slot
+        batcher = EmbeddingBatcher(window_ms=20, max_batch=32)
+
+        results = await asyncio.gather(
+            batcher.embed_many(["chunk one", "chunk two", "query"], Priority.INGESTION),
+            batcher.embed("query", Priority.QUERY_EMBEDDING),
+            batcher.embed("chunk one", Priority.INGESTION),
+        )
+
+        assert results == [[[9.0], [9.0], [5.0]], [5.0], [9.0]]
+        # The query is not merged into (or promoted with) the ingestion batch
+        assert sorted(mock_embed.await_args_list, key=lambda c: len(c.args[0])) == [
+            call(["query"]),
+            call(["chunk one", "chunk two", "query"]),
+        ]
+        assert sorted(slots) == [Priority.QUERY_EMBEDDING, Priority.INGESTION]
@@ -0,0 +1,132 @@
+"""Tests for agentic_rag.backend.rag.generation_cache (in-memory tier)."""
+
+import pytest
+
+from agentic_rag.backend.api.v1.chat_service import _fast_rag_response
+from agentic_rag.backend.rag import generation_cache
+from agentic_rag.backend.rag.generation_cache import (
+    cached_chat,
+    cached_chat_stream,
+    generation_key,
+)
+from agentic_rag.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def _memory_only(monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "GENERATION_CACHE_PERSIST", False)
+    monkeypatch.setattr(settings, "LLM_TEMPERATURE", 0.0)
+    generation_cache.clear_memory()
+    yield
+    generation_cache.clear_memory()
+
+
+@pytest.fixture()
+def llm_calls(monkeypatch):
+    calls: list[str] = []
+    usage = {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10}
+
+    async def fake_chat(system_prompt, user_message, **kwargs):
+        calls.append(user_message)
+        return "reasoning", f"answer to {user_message}", {"prompt_tokens": 3}
+
+    async def fake_stream(system_prompt, user_message, **kwargs):
+        calls.append(user_message)
+        try:
+            yield {"thinking": "reasoning", "content": None, "done": False}
+            for word in ["answer ", "to ", user_message]:
+                yield {"thinking": None, "content": word, "done": False}
+            yield {"thinking": None, "content": None, "done": True, "usage": usage}
+        finally:
+            calls.append("closed")
+
+    monkeypatch.setattr(generation_cache, "ollama_chat_with_thinking", fake_chat)
+    monkeypatch.setattr(generation_cache, "ollama_chat_stream", fake_stream)
+    return calls
+
+
+async def _collect(stream) -> tuple[str, str]:
+    thinking, content = "", ""
+    async for chunk in stream:
+        thinking += chunk.get("thinking") or ""
+        content += chunk.get("content") or ""
+        if chunk.get("done"):
+            break
+    return thinking, content
+
+
+class TestGenerationKey:
+    def test_changes_with_prompts_model_and_index(self, monkeypatch):
+        base = generation_key("sys", "usr", "m", True)
+
+        assert generation_key("sys", "usr", "m", True) == base
+        assert generation_key("sys2", "usr", "m", True) != base
+        assert generation_key("sys", "usr", "m2", True) != base
+        assert generation_key("sys", "usr", "m", False) != base
+        monkeypatch.setattr(generation_cache, "active_index_signature", lambda: "reindexed")
+        assert generation_key("sys", "usr", "m", True) != base
+
+
+class TestCachedChat:
+    @pytest.mark.asyncio
+    async def test_repeat_prompt_served_from_cache(self, llm_calls):
+        first = await cached_chat("sys", "q1", model="m")
+        second = await cached_chat("sys", "q1", model="m")
+        await cached_chat("sys", "q2", model="m")
+
+        assert first == second
+        assert llm_calls == ["q1", "q2"]
+
+    @pytest.mark.asyncio
+    async def test_nonzero_temperature_bypasses_cache(self, llm_calls, monkeypatch):
+        monkeypatch.setattr(settings, "LLM_TEMPERATURE", 0.7)
+
+        await cached_chat("sys", "q1", model="m")
+        await cached_chat("sys", "q1", model="m")
+
+        assert llm_calls == ["q1", "q1"]
+
+
+class TestCachedChatStream:
+    @pytest.mark.asyncio
+    async def test_hit_replays_streamed_answer(self, llm_calls, sample_citations):
+        model = settings.LLM_MODEL
+        live = await _collect(cached_chat_stream("sys", "q1", model=model))
+        replayed = await _collect(cached_chat_stream("sys", "q1", model=model))
+
+        assert live == replayed == ("reasoning", "answer to q1")
+        assert llm_calls == ["q1", "closed"]
+        # The non-streaming path shares the same entry, usage included.
+        answer, usage = await _fast_rag_response(
+            "q1", sample_citations, system_prompt="sys", user_prompt="q1"
+        )
+        assert "answer to q1" in answer
+        assert usage == {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10}
+        assert llm_calls == ["q1", "closed"]
+
+    @pytest.mark.asyncio
+    async def test_stores_after_ollama_stream_closes(self, llm_calls, monkeypatch):
+        stored: list[str] = []
+
+        async def put_generation(key, model, generation):
+            stored.append(generation.content)
+            llm_calls.append("stored")
+
+        monkeypatch.setattr(generation_cache, "put_generation", put_generation)
+
+        await _collect(cached_chat_stream("sys", "q1", model="m"))
+
+        assert stored == ["answer to q1"]
+        assert llm_calls == ["q1", "closed", "stored"]
+
+    @pytest.mark.asyncio
+    async def test_aborted_stream_not_cached(self, llm_calls):
+        stream = cached_chat_stream("sys", "q1", model="m")
+        async for _ in stream:
+            break
+        await stream.aclose()
+
+        await _collect(cached_chat_stream("sys", "q1", model="m"))
+
+        assert [c for c in llm_calls if c != "closed"] == ["q1", "q1"]
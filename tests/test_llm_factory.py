@@ -0,0 +1,47 @@
+"""Tests for per-call num_ctx sizing in agentic_rag.core.llm_factory."""
+
+import pytest
+
+from agentic_rag.core import llm_factory
+from agentic_rag.core.config import settings
+from agentic_rag.core.llm_factory import LLMBuckets, fit_num_ctx
+
+
+@pytest.fixture(autouse=True)
+def _word_tokenizer(monkeypatch):
+    monkeypatch.setattr(llm_factory, "get_tokenizer", lambda: str.split)
+    monkeypatch.setattr(settings, "LLM_NUM_CTX_BUCKETS", [2048, 4096, 8192])
+    monkeypatch.setattr(settings, "LLM_OUTPUT_TOKENS", 1000)
+    monkeypatch.setattr(settings, "LLM_THINKING_TOKENS", 1000)
+
+
+class TestFitNumCtx:
+    def test_small_prompt_gets_smallest_bucket(self):
+        assert fit_num_ctx("system", "hello there") == 2048
+
+    def test_prompt_plus_output_rounds_up(self):
+        prompt = "word " * 1000  # ~1116 prompt tokens with margin
+        assert fit_num_ctx(prompt) == 4096
+        assert fit_num_ctx(prompt, output_tokens=100) == 2048
+
+    def test_thinking_budget_added(self):
+        prompt = "word " * 2500
+        assert fit_num_ctx(prompt) == 4096
+        assert fit_num_ctx(prompt, think=True) == 8192
+
+    def test_oversized_prompt_capped_at_largest_bucket(self):
+        assert fit_num_ctx("word " * 20000) == 8192
+
+    def test_llm_buckets_reuse_instance_per_bucket(self):
+        built: list[int] = []
+
+        def factory(num_ctx):
+            built.append(num_ctx)
+            return object()
+
+        llms = LLMBuckets(factory)
+        small = llms.for_prompt("short", output_tokens=10)
+
+        assert llms.for_prompt("also short", output_tokens=10) is small
+        assert llms.for_prompt("word " * 3000, output_tokens=10) is not small
+        assert built == [2048, 4096]
@@ -0,0 +1,95 @@
+"""Tests for agentic_rag.core.llm_scheduler."""
+
+import asyncio
+
+import pytest
+
+from agentic_rag.core.llm_scheduler import LLMScheduler, Priority
+
+
+def _scheduler(max_concurrency=1, aging_seconds=0.0, **limits):
+    return LLMScheduler(
+        max_concurrency=max_concurrency, class_limits=limits, aging_seconds=aging_seconds
+    )
+
+
+class TestLLMScheduler:
+    @pytest.mark.asyncio
+    async def test_higher_priority_dispatched_first(self):
+        scheduler = _scheduler()
+        order: list[Priority] = []
+
+        async def call(priority):
+            await scheduler.acquire(priority)
+            order.append(priority)
+            await asyncio.sleep(0)
+            scheduler.release(priority)
+
+        await scheduler.acquire(Priority.INTERACTIVE)
+        tasks = [
+            asyncio.create_task(call(p))
+            for p in (
+                Priority.INGESTION,
+                Priority.BACKGROUND,
+                Priority.RERANK,
+                Priority.INTERACTIVE,
+            )
+        ]
+        await asyncio.sleep(0)
+        scheduler.release(Priority.INTERACTIVE)
+        await asyncio.gather(*tasks)
+
+        assert order == [
+            Priority.INTERACTIVE,
+            Priority.RERANK,
+            Priority.BACKGROUND,
+            Priority.INGESTION,
+        ]
+
+    @pytest.mark.asyncio
+    async def test_class_cap_lets_other_classes_through(self):
+        scheduler = _scheduler(max_concurrency=4, rerank=1)
+
+        await scheduler.acquire(Priority.RERANK)
+        blocked = asyncio.create_task(scheduler.acquire(Priority.RERANK))
+        await asyncio.wait_for(scheduler.acquire(Priority.INGESTION), 1.0)
+        await asyncio.sleep(0)
+
+        assert not blocked.done()
+        assert scheduler.stats()["rerank"]["waiting"] == 1
+
+        scheduler.release(Priority.RERANK)
+        await asyncio.wait_for(blocked, 1.0)
+        assert scheduler.stats()["rerank"]["acquired"] == 2
+
+    @pytest.mark.asyncio
+    async def test_aging_prevents_starvation(self):
+        scheduler = _scheduler(aging_seconds=0.01)
+        await scheduler.acquire(Priority.INTERACTIVE)
+        old = asyncio.create_task(scheduler.acquire(Priority.INGESTION))
+        await asyncio.sleep(0.06)
+        fresh = asyncio.create_task(scheduler.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+
+        scheduler.release(Priority.INTERACTIVE)
+        await asyncio.wait_for(old, 1.0)
+
+        assert not fresh.done()
+        fresh.cancel()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_frees_its_place(self):
+        scheduler = _scheduler()
+        await scheduler.acquire(Priority.INTERACTIVE)
+        waiter = asyncio.create_task(scheduler.acquire(Priority.RERANK))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release(Priority.INTERACTIVE)
+
+        assert scheduler.running == 0
+        await asyncio.wait_for(scheduler.acquire(Priority.BACKGROUND), 1.0)
+        stats = scheduler.stats()
+        assert stats["rerank"]["waiting"] == 0
+        assert stats["background"]["running"] == 1
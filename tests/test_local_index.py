@@ -0,0 +1,163 @@
+"""Tests for agentic_rag.backend.rag.local_index."""
+
+import asyncio
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from agentic_rag.backend.rag import local_index
+from agentic_rag.backend.rag.local_index import LocalVectorIndex
+from agentic_rag.core.config import settings
+
+
+def _row(
+    chunk_id: str, embedding: list[float], is_toc: bool = False, day: int = 1
+) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=chunk_id,
+        document_id="doc-1",
+        embedding=np.asarray(embedding, dtype=np.float32),
+        created_at=datetime(2026, 1, day, tzinfo=UTC),
+        is_toc=is_toc,
+        is_front_matter=False,
+        id_hash=hash(chunk_id) % 1000,
+    )
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 3)
+    monkeypatch.setattr(settings, "LOCAL_INDEX_DTYPE", "float32")
+    idx = LocalVectorIndex(root=tmp_path)
+    idx.path.mkdir(parents=True)
+    base = idx._empty("vectors-test.bin")
+    (idx.path / base.vectors_file).touch()
+    batch = idx._write_batch(
+        idx.path / base.vectors_file,
+        0,
+        [
+            _row("a", [1.0, 0.0, 0.0]),
+            _row("b", [0.8, 0.6, 0.0]),
+            _row("toc", [1.0, 0.01, 0.0], is_toc=True),
+            _row("c", [0.0, 0.0, 5.0]),
+        ],
+    )
+    idx._snapshot = idx._publish(base, [batch], rebuild=True)
+    return idx
+
+
+class TestLocalVectorIndex:
+    def test_ranks_by_cosine_and_skips_toc(self, index):
+        hits = index.search([2.0, 0.0, 0.0], k=3)
+        assert [h.id for h in hits] == ["a", "b", "c"]
+        assert hits[0].similarity == pytest.approx(1.0)
+        assert hits[1].similarity == pytest.approx(0.8)
+
+    def test_include_toc_and_min_similarity(self, index):
+        hits = index.search([1.0, 0.0, 0.0], k=5, include_toc=True, min_similarity=0.5)
+        assert [h.id for h in hits] == ["a", "toc", "b"]
+
+    def test_append_publishes_new_snapshot_without_touching_the_old_one(self, index):
+        before = index._snapshot
+        batch = index._write_batch(
+            index.path / before.vectors_file, before.size, [_row("d", [0.0, 1.0, 0.0])]
+        )
+
+        index._snapshot = index._publish(before, [batch], rebuild=False)
+
+        assert before.size == 4 and len(before.content_mask) == 4
+        assert index.size == 5
+        assert index.search([0.0, 1.0, 0.0], k=1)[0].id == "d"
+        assert index._snapshot.checksum == before.checksum + batch.checksum
+
+    @pytest.mark.asyncio
+    async def test_refresh_rebuilds_when_rows_replaced_at_same_count(self, index, monkeypatch):
+        snap = index._snapshot
+        marker = SimpleNamespace(
+            count=snap.size, indexed_count=snap.size, indexed_checksum=snap.checksum + 1
+        )
+        monkeypatch.setattr(index, "_db_marker", AsyncMock(return_value=marker))
+        rebuild = AsyncMock()
+        monkeypatch.setattr(index, "_rebuild", rebuild)
+
+        await index._refresh_locked()
+        rebuild.assert_awaited_once()
+
+        rebuild.reset_mock()
+        marker.indexed_checksum = snap.checksum
+        await index._refresh_locked()
+        rebuild.assert_not_awaited()
+
+
+class _Chunks:
+    """In-memory chunks table behind the index's stream and marker queries."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.streams = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def stream(self, stmt, params):
+        self.streams += 1
+        since = params.get("since")
+        rows = [r for r in self.rows if since is None or r.created_at > since]
+
+        async def partitions(size):
+            for i in range(0, len(rows), size):
+                yield rows[i : i + size]
+
+        return SimpleNamespace(partitions=partitions)
+
+    async def marker(self, watermark):
+        indexed = [r for r in self.rows if watermark is not None and r.created_at <= watermark]
+        return SimpleNamespace(
+            count=len(self.rows),
+            indexed_count=len(indexed),
+            indexed_checksum=sum(r.id_hash for r in indexed),
+        )
+
+
+class TestSharedDirectory:
+    @pytest.mark.asyncio
+    async def test_two_indexes_share_one_directory(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 3)
+        monkeypatch.setattr(settings, "LOCAL_INDEX_DTYPE", "float32")
+        chunks = _Chunks([_row("a", [1.0, 0.0, 0.0]), _row("b", [0.0, 1.0, 0.0])])
+        monkeypatch.setattr(local_index, "AsyncSessionLocal", lambda: chunks)
+        monkeypatch.setattr(LocalVectorIndex, "_db_marker", chunks.marker)
+        first, second = LocalVectorIndex(root=tmp_path), LocalVectorIndex(root=tmp_path)
+
+        await first.load()
+        await second.load()
+        assert chunks.streams == 1
+        assert second._snapshot.version == first._snapshot.version
+
+        chunks.rows.append(_row("c", [0.0, 0.0, 1.0], day=2))
+        await asyncio.gather(first._refresh_locked(), second._refresh_locked())
+
+        # One process appended under the directory lock; the other adopted it
+        assert chunks.streams == 2
+        assert (first.path / first._snapshot.vectors_file).stat().st_size == 3 * 3 * 4
+        assert first._snapshot.version == second._snapshot.version
+        assert [h.id for h in second.search([0.0, 0.0, 1.0], k=1)] == ["c"]
+
+        old = first._snapshot
+        chunks.rows[0] = _row("a2", [1.0, 0.0, 0.0])
+        await second._refresh_locked()
+
+        # Rebuilt into a new file; the old mapping stays readable until adopted
+        assert second._snapshot.vectors_file != old.vectors_file
+        assert not (tmp_path / second.path.name / old.vectors_file).exists()
+        assert [h.id for h in first.search([1.0, 0.0, 0.0], k=1)] == ["a"]
+
+        await first._refresh_locked()
+        assert chunks.streams == 3
+        assert [h.id for h in first.search([1.0, 0.0, 0.0], k=1)] == ["a2"]
@@ -0,0 +1,152 @@
+"""Tests for agentic_rag.core.ollama_router against local stub Ollama servers."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from agentic_rag.core import ollama_client, ollama_router
+from agentic_rag.core.llm_factory import ollama_chat_with_thinking, ollama_embed
+from agentic_rag.core.ollama_router import OllamaRouter
+
+
+class _StubOllama:
+    """Minimal /api/chat, /api/embed and /api/tags server on a random port."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.failing = False
+        self.paths: list[str] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._reply(500 if stub.failing else 200, {"models": []})
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.paths.append(self.path)
+                time.sleep(stub.delay)
+                if stub.failing:
+                    self._reply(500, {"error": "down"})
+                elif self.path == "/api/embed":
+                    self._reply(200, {"embeddings": [[1.0] for _ in body["input"]]})
+                else:
+                    self._reply(200, {"message": {"content": "ok"}})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture()
+def stubs():
+    servers = [_StubOllama(), _StubOllama()]
+    yield servers
+    for s in servers:
+        s.close()
+
+
+@pytest.fixture()
+def use_router(monkeypatch):
+    def _install(router: OllamaRouter) -> OllamaRouter:
+        monkeypatch.setattr(ollama_router, "_router", router)
+        return router
+
+    return _install
+
+
+class TestOllamaRouter:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_spread_by_outstanding_requests(self, stubs, use_router):
+        for s in stubs:
+            s.delay = 0.1
+        use_router(OllamaRouter([s.url for s in stubs]))
+
+        try:
+            await asyncio.gather(*(ollama_chat_with_thinking("s", "u") for _ in range(4)))
+        finally:
+            await ollama_client.close_client()
+
+        assert [len(s.paths) for s in stubs] == [2, 2]
+
+    @pytest.mark.asyncio
+    async def test_failing_backend_ejected_then_readmitted_by_probe(self, stubs, use_router):
+        bad, good = stubs
+        bad.failing = True
+        router = use_router(OllamaRouter([bad.url, good.url], eject_after=2, probe_interval=0.05))
+
+        try:
+            for _ in range(6):
+                try:
+                    await ollama_chat_with_thinking("s", "u")
+                except httpx.HTTPStatusError:
+                    pass
+            assert router.backends[bad.url].ejected
+            assert len(bad.paths) == 2
+
+            # While ejected, everything lands on the healthy replica.
+            before = len(good.paths)
+            await ollama_chat_with_thinking("s", "u")
+            assert len(good.paths) == before + 1
+
+            bad.failing = False
+            await asyncio.sleep(0.06)
+            router.pick()  # due probe is started on pick
+            for _ in range(20):
+                if not router.backends[bad.url].ejected:
+                    break
+                await asyncio.sleep(0.01)
+            assert not router.backends[bad.url].ejected
+        finally:
+            await ollama_client.close_client()
+
+    @pytest.mark.asyncio
+    async def test_model_affinity_pins_embeddings(self, stubs, use_router):
+        chat_host, embed_host = stubs
+        use_router(
+            OllamaRouter(
+                [chat_host.url, embed_host.url],
+                affinity={"embed-model": [embed_host.url], "chat-model": [chat_host.url]},
+            )
+        )
+
+        try:
+            for _ in range(3):
+                await ollama_embed(["a", "b"], model="embed-model")
+                await ollama_chat_with_thinking("s", "u", model="chat-model")
+        finally:
+            await ollama_client.close_client()
+
+        assert chat_host.paths == ["/api/chat"] * 3
+        assert embed_host.paths == ["/api/embed"] * 3
+
+    def test_sync_callers_keep_ejected_replica_ejected(self):
+        router = OllamaRouter(["http://a:11434", "http://b:11434"], eject_after=1, probe_interval=0)
+        router.record_failure(router.backends["http://a:11434"], "down")
+
+        urls = {router.base_url() for _ in range(4)}
+
+        assert urls == {"http://b:11434"}
+        assert router.backends["http://a:11434"].ejected
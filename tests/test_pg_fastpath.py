@@ -0,0 +1,33 @@
+"""Tests for agentic_rag.core.pg_fastpath."""
+
+from agentic_rag.core.pg_fastpath import _bind
+
+
+class TestPlaceholderRewrite:
+    def test_named_params_become_positional(self):
+        sql, args = _bind(
+            "SELECT '[]'::jsonb, embedding <=> :embed FROM chunks "
+            "WHERE index_signature = :sig ORDER BY embedding <=> :embed LIMIT :limit",
+            {"embed": [0.1], "sig": "v1", "limit": 5},
+        )
+        assert sql == (
+            "SELECT '[]'::jsonb, embedding <=> $1 FROM chunks "
+            "WHERE index_signature = $2 ORDER BY embedding <=> $1 LIMIT $3"
+        )
+        assert args == [[0.1], "v1", 5]
+
+    def test_casts_are_left_alone(self):
+        sql, args = _bind("SELECT :val::text, CAST(:w AS double precision)", {"val": "a", "w": 1})
+        assert sql == "SELECT $1::text, CAST($2 AS double precision)"
+        assert args == ["a", 1]
+
+    def test_quoted_literals_identifiers_and_comments_are_left_alone(self):
+        sql = (
+            "SELECT '12:30', E'it\\'s :x', '{\"k\": \":foo\"}'::jsonb, \"a:b\" -- note :c\n"
+            "FROM t WHERE id = :id /* :d */ AND s = 'o''k :e'"
+        )
+
+        query, args = _bind(sql, {"id": 7})
+
+        assert query == sql.replace("= :id", "= $1")
+        assert args == [7]
@@ -0,0 +1,36 @@
+"""Tests for agentic_rag.backend.rag.query_embedding."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from agentic_rag.backend.rag.query_embedding import (
+    QueryEmbeddingContext,
+    build_query_embedding_text,
+)
+from agentic_rag.core.exceptions import DependencyUnavailable
+
+
+class TestQueryEmbeddingContext:
+    @pytest.mark.asyncio
+    @patch("agentic_rag.backend.rag.query_embedding.embed_texts", new_callable=AsyncMock)
+    async def test_single_batched_call(self, mock_embed):
+        mock_embed.return_value = [[0.1, 0.2], [0.3, 0.4]]
+
+        ctx = QueryEmbeddingContext("  What is PDPL?  ")
+        assert await ctx.text_embedding() == [0.1, 0.2]
+        assert await ctx.query_embedding() == [0.3, 0.4]
+        assert await ctx.text_embedding() == [0.1, 0.2]
+
+        mock_embed.assert_awaited_once_with(
+            ["What is PDPL?", build_query_embedding_text("What is PDPL?")]
+        )
+
+    @pytest.mark.asyncio
+    @patch("agentic_rag.backend.rag.query_embedding.embed_texts", new_callable=AsyncMock)
+    async def test_failure_raises_dependency_unavailable(self, mock_embed):
+        mock_embed.side_effect = ConnectionError("down")
+
+        ctx = QueryEmbeddingContext("What is PDPL?")
+        with pytest.raises(DependencyUnavailable):
+            await ctx.query_embedding()
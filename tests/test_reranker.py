@@ -0,0 +1,199 @@
+"""Tests for agentic_rag.backend.rag.reranker."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from agentic_rag.backend.rag import rerank_cache, reranker
+from agentic_rag.backend.rag.cascade import CascadeReranker
+from agentic_rag.backend.rag.reranker import LLMReranker, parse_listwise_scores
+from agentic_rag.backend.rag.retriever import HybridRetriever
+from agentic_rag.core.config import settings
+from tests.conftest import make_node_with_score
+
+
+def _nodes():
+    return [
+        make_node_with_score("doc-1", "c1", "first passage", score=0.9),
+        make_node_with_score("doc-1", "c2", "second passage", score=0.8),
+    ]
+
+
+class TestRerankScoreCache:
+    @pytest.fixture
+    def llm(self, monkeypatch):
+        monkeypatch.setattr(settings, "RERANKER_MODE", "pointwise")
+        monkeypatch.setattr(settings, "RERANK_CACHE_PERSIST", False)
+        monkeypatch.setattr(settings, "RERANK_CACHE_TTL", 900)
+        monkeypatch.setattr(settings, "TOP_K_RERANK", 2)
+        rerank_cache.clear_memory()
+        fake = MagicMock()
+        fake.acomplete = AsyncMock(
+            side_effect=lambda prompt: SimpleNamespace(
+                text='{"score": 9}' if "second" in prompt else '{"score": 2}'
+            )
+        )
+        monkeypatch.setattr(reranker, "get_llm", lambda **_: fake)
+        yield fake
+        rerank_cache.clear_memory()
+
+    @pytest.mark.asyncio
+    async def test_scores_are_shared_across_instances(self, llm):
+        first = await LLMReranker().rerank("what is PDPL?", _nodes())
+        second = await LLMReranker().rerank("what  is PDPL?", _nodes())
+
+        assert [n.node.node_id for n in first] == ["c2", "c1"]
+        assert [n.node.node_id for n in second] == ["c2", "c1"]
+        assert second[0].score == pytest.approx(0.9)
+        assert llm.acomplete.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unparseable_scores_are_not_cached(self, llm):
+        llm.acomplete.side_effect = lambda prompt: SimpleNamespace(text="no idea")
+
+        await LLMReranker().rerank("q", _nodes())
+        await LLMReranker().rerank("q", _nodes())
+
+        assert llm.acomplete.await_count == 4
+
+
+class TestListwiseRerank:
+    def test_parses_scores_ranking_and_noise(self):
+        assert parse_listwise_scores('{"scores": [2, 9.5]}', 2) == ([0.2, 0.95], False)
+        assert parse_listwise_scores("<think>[1]</think> Sure: [7, 3]", 2) == ([0.7, 0.3], False)
+        assert parse_listwise_scores('{"ranking": [2, 1]}', 2) == ([0.5, 1.0], True)
+        assert parse_listwise_scores('{"scores": [4]}', 2) == ([0.4, None], False)
+        assert parse_listwise_scores("not json", 2) is None
+
+    @pytest.mark.asyncio
+    async def test_single_call_with_pointwise_fallback(self, monkeypatch):
+        monkeypatch.setattr(settings, "RERANKER_MODE", "listwise")
+        monkeypatch.setattr(settings, "RERANK_CACHE_PERSIST", False)
+        monkeypatch.setattr(settings, "TOP_K_RERANK", 2)
+        rerank_cache.clear_memory()
+        replies = {"Passages": '{"scores": [1]}', "Passage:": '{"score": 8}'}
+        fake = MagicMock()
+        fake.acomplete = AsyncMock(
+            side_effect=lambda prompt: SimpleNamespace(
+                text=next(v for k, v in replies.items() if k in prompt)
+            )
+        )
+        monkeypatch.setattr(reranker, "get_llm", lambda **_: fake)
+
+        ranked = await LLMReranker().rerank("q", _nodes())
+        rerank_cache.clear_memory()
+
+        assert [n.node.node_id for n in ranked] == ["c2", "c1"]
+        assert [n.score for n in ranked] == pytest.approx([0.8, 0.1])
+        assert fake.acomplete.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_ranking_scores_are_not_cached(self, monkeypatch):
+        monkeypatch.setattr(settings, "RERANKER_MODE", "listwise")
+        monkeypatch.setattr(settings, "RERANK_CACHE_PERSIST", False)
+        monkeypatch.setattr(settings, "TOP_K_RERANK", 2)
+        rerank_cache.clear_memory()
+        fake = MagicMock()
+        fake.acomplete = AsyncMock(return_value=SimpleNamespace(text='{"ranking": [2, 1]}'))
+        monkeypatch.setattr(reranker, "get_llm", lambda **_: fake)
+
+        first = await LLMReranker().rerank("q", _nodes())
+        second = await LLMReranker().rerank("q", _nodes())
+        rerank_cache.clear_memory()
+
+        assert [n.node.node_id for n in first] == ["c2", "c1"]
+        assert [n.node.node_id for n in second] == ["c2", "c1"]
+        assert fake.acomplete.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_pointwise_scores_stay_out_of_listwise_ranking(self, monkeypatch):
+        monkeypatch.setattr(settings, "RERANKER_MODE", "listwise")
+        monkeypatch.setattr(settings, "RERANK_CACHE_PERSIST", False)
+        monkeypatch.setattr(settings, "TOP_K_RERANK", 3)
+        rerank_cache.clear_memory()
+        listwise = iter(['{"ranking": [2, 3]}', '{"ranking": [3, 2, 1]}'])
+        fake = MagicMock()
+        fake.acomplete = AsyncMock(
+            side_effect=lambda prompt: SimpleNamespace(
+                text=next(listwise) if "Passages" in prompt else '{"score": 9}'
+            )
+        )
+        monkeypatch.setattr(reranker, "get_llm", lambda **_: fake)
+        nodes = [*_nodes(), make_node_with_score("doc-1", "c3", "third passage", score=0.7)]
+
+        # The first reply misses c1, which gets (and caches) a pointwise 0.9
+        await LLMReranker().rerank("q", nodes)
+        ranked = await LLMReranker().rerank("q", nodes)
+        rerank_cache.clear_memory()
+
+        # The second ranking covers every candidate instead of mixing with 0.9
+        assert [n.node.node_id for n in ranked] == ["c3", "c2", "c1"]
+        assert fake.acomplete.await_count == 3
+
+
+class TestCascadeRerank:
+    @pytest.fixture
+    def cascade_reranker(self, monkeypatch):
+        monkeypatch.setattr(settings, "TOP_K_RERANK", 1)
+        monkeypatch.setattr(settings, "CASCADE_EMBED_WEIGHT", 1.0)
+        monkeypatch.setattr(settings, "CASCADE_ESCALATION_MARGIN", 0.1)
+        ctx = MagicMock()
+        ctx.query_embedding = AsyncMock(return_value=[1.0, 0.0])
+        reranker_ = CascadeReranker(embeddings=ctx)
+        reranker_._escalate = AsyncMock(side_effect=lambda query, nodes: nodes[:1])
+        return reranker_
+
+    @pytest.mark.asyncio
+    async def test_clear_margin_skips_llm(self, cascade_reranker, monkeypatch):
+        stored = {"c1": [0.0, 1.0], "c2": [1.0, 0.0]}
+        monkeypatch.setattr(HybridRetriever, "fetch_embeddings", AsyncMock(return_value=stored))
+
+        ranked = await cascade_reranker.rerank("q", _nodes())
+
+        assert [n.node.node_id for n in ranked] == ["c2"]
+        assert ranked[0].score == pytest.approx(1.0)
+        cascade_reranker._escalate.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_ambiguous_margin_escalates(self, cascade_reranker, monkeypatch):
+        stored = {"c1": [1.0, 0.1], "c2": [1.0, 0.0]}
+        monkeypatch.setattr(HybridRetriever, "fetch_embeddings", AsyncMock(return_value=stored))
+
+        await cascade_reranker.rerank("q", _nodes())
+
+        escalated = cascade_reranker._escalate.await_args.args[1]
+        assert [n.node.node_id for n in escalated] == ["c2", "c1"]
+
+
+class TestRerankDeadline:
+    @pytest.mark.asyncio
+    async def test_keeps_finished_scores_and_cancels_the_rest(self, monkeypatch):
+        monkeypatch.setattr(settings, "RERANKER_MODE", "pointwise")
+        monkeypatch.setattr(settings, "RERANKER_TIMEOUT", 0.05)
+        monkeypatch.setattr(settings, "RERANK_CACHE_PERSIST", False)
+        monkeypatch.setattr(settings, "TOP_K_RERANK", 2)
+        rerank_cache.clear_memory()
+        cancelled = []
+
+        async def acomplete(prompt):
+            if "second" not in prompt:
+                return SimpleNamespace(text='{"score": 2}')
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(prompt)
+                raise
+
+        fake = MagicMock()
+        fake.acomplete = acomplete
+        monkeypatch.setattr(reranker, "get_llm", lambda **_: fake)
+
+        ranked = await LLMReranker().rerank("q", _nodes())
+        rerank_cache.clear_memory()
+
+        # c2 was not scored in time: it goes after the scored c1, below its score
+        assert [n.node.node_id for n in ranked] == ["c1", "c2"]
+        assert [n.score for n in ranked] == pytest.approx([0.2, 0.8 / 0.9 * 0.2])
+        assert len(cancelled) == 1
@@ -0,0 +1,56 @@
+"""Tests for agentic_rag.backend.rag.retriever."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from agentic_rag.backend.rag.retriever import HybridRetriever
+from agentic_rag.core.config import settings
+
+
+def _session() -> AsyncMock:
+    session = AsyncMock()
+    session.execute.return_value = MagicMock()
+    return session
+
+
+class TestFilteredAnn:
+    @pytest.fixture(autouse=True)
+    def _settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "HNSW_EF_SEARCH", None)
+        monkeypatch.setattr(settings, "HNSW_EF_SEARCH_MAX", 400)
+        monkeypatch.setattr(settings, "HNSW_ITERATIVE_SCAN", True)
+        monkeypatch.setattr(HybridRetriever, "_pgvector_version", (0, 7, 4))
+
+    @pytest.mark.asyncio
+    async def test_retries_underfilled_leg_with_higher_ef_search(self):
+        session = _session()
+        run = AsyncMock(side_effect=[["r"] * 5, ["r"] * 12, ["r"] * 20])
+
+        rows = await HybridRetriever()._run_filtered_ann(session, run, count=len, limit=20)
+
+        assert len(rows) == 20
+        assert run.await_count == 3
+        ef_values = [c.args[1]["val"] for c in session.execute.await_args_list]
+        assert ef_values == ["80", "160"]
+
+    @pytest.mark.asyncio
+    async def test_stops_when_filters_are_the_limit(self):
+        run = AsyncMock(side_effect=[["r"] * 5, ["r"] * 5])
+
+        rows = await HybridRetriever()._run_filtered_ann(_session(), run, count=len, limit=20)
+
+        assert len(rows) == 5
+        assert run.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_iterative_scan_skips_retries(self, monkeypatch):
+        monkeypatch.setattr(HybridRetriever, "_pgvector_version", (0, 8, 0))
+        session = _session()
+        run = AsyncMock(return_value=["r"] * 5)
+
+        await HybridRetriever()._run_filtered_ann(session, run, count=len, limit=20)
+
+        assert run.await_count == 1
+        sql = str(session.execute.await_args.args[0])
+        assert "hnsw.iterative_scan" in sql
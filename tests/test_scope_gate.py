@@ -0,0 +1,78 @@
+"""Tests for agentic_rag.core.scope_gate."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from agentic_rag.core import scope_gate
+from agentic_rag.core.config import settings
+from agentic_rag.core.scope_gate import ScopeGate
+
+
+@pytest.fixture
+def gate(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SCOPE_GATE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 2)
+    monkeypatch.setattr(settings, "SCOPE_GATE_THRESHOLD", 0.9)
+    monkeypatch.setattr(ScopeGate, "_anchors", ["privacy law", "data protection"])
+    monkeypatch.setattr(ScopeGate, "_anchor_embeddings", None)
+    ScopeGate.clear_memo()
+    calls: list[list[str]] = []
+
+    async def embed_texts(texts, priority=None):
+        calls.append(list(texts))
+        await asyncio.sleep(0)
+        return [[3.0, 0.0], [0.0, 1.0]][: len(texts)]
+
+    async def embed_text(text, priority=None):
+        calls.append([text])
+        return [1.0, 0.1] if "privacy" in text.lower() else [-1.0, -1.0]
+
+    monkeypatch.setattr(scope_gate, "embed_texts", embed_texts)
+    monkeypatch.setattr(scope_gate, "embed_text", embed_text)
+    yield calls
+    ScopeGate.clear_memo()
+
+
+class TestScopeGate:
+    @pytest.mark.asyncio
+    async def test_concurrent_first_calls_embed_anchors_once_and_persist(
+        self, gate, tmp_path, monkeypatch
+    ):
+        results = await asyncio.gather(*(ScopeGate._get_anchor_embeddings() for _ in range(5)))
+
+        assert gate == [["privacy law", "data protection"]]
+        assert all(r is results[0] for r in results)
+        np.testing.assert_allclose(results[0], [[1.0, 0.0], [0.0, 1.0]])
+        assert len(list(tmp_path.glob("anchors-*.npy"))) == 1
+
+        # A fresh process loads the matrix from disk without embedding
+        monkeypatch.setattr(ScopeGate, "_anchor_embeddings", None)
+        gate.clear()
+        np.testing.assert_allclose(await ScopeGate._get_anchor_embeddings(), results[0])
+        assert gate == []
+
+    @pytest.mark.asyncio
+    async def test_anchor_change_invalidates_disk_cache(self, gate, tmp_path, monkeypatch):
+        await ScopeGate._get_anchor_embeddings()
+        monkeypatch.setattr(ScopeGate, "_anchors", ["privacy law"])
+        monkeypatch.setattr(ScopeGate, "_anchor_embeddings", None)
+
+        await ScopeGate._get_anchor_embeddings()
+
+        assert gate[-1] == ["privacy law"]
+        assert len(list(tmp_path.glob("anchors-*.npy"))) == 2
+
+    @pytest.mark.asyncio
+    async def test_decisions_memoized_by_normalized_query(self, gate, monkeypatch):
+        assert (await ScopeGate.is_in_scope("Privacy rules?"))[0] is True
+        assert (await ScopeGate.is_in_scope("Weather today"))[0] is False
+        embeds = len(gate)
+
+        in_scope, _ = await ScopeGate.is_in_scope("  privacy   RULES? ")
+        assert in_scope is True
+        assert len(gate) == embeds
+
+        monkeypatch.setattr(settings, "SCOPE_GATE_THRESHOLD", 0.999)
+        assert (await ScopeGate.is_in_scope("privacy rules?"))[0] is False
@@ -0,0 +1,196 @@
+"""Tests for agentic_rag.backend.rag.semantic_cache.
+
+Eviction and migration backfill SQL run against Postgres only when
+``TEST_DATABASE_URL`` is set.
+"""
+
+import os
+import pathlib
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from agentic_rag.backend.rag import semantic_cache
+from agentic_rag.backend.rag.semantic_l1 import L1Entry, SemanticL1
+from agentic_rag.core.config import settings
+
+_MIGRATION = pathlib.Path(__file__).parents[1] / "migrations" / "009_semantic_cache_dedupe.sql"
+
+
+class _Embeddings:
+    def __init__(self, vector):
+        self.vector = vector
+
+    async def query_embedding(self):
+        return self.vector
+
+
+@pytest.fixture()
+def l1(monkeypatch):
+    cache = SemanticL1(capacity=4, dim=2)
+    cache.coherent = True
+    monkeypatch.setattr(SemanticL1, "_instance", cache)
+    monkeypatch.setattr(settings, "SEMANTIC_CACHE_ENABLED", True)
+    return cache
+
+
+class TestQueryHash:
+    def test_normalizes_case_and_whitespace(self):
+        assert semantic_cache.query_hash("  What IS\tPDPL ") == semantic_cache.query_hash(
+            "what is pdpl"
+        )
+        assert semantic_cache.query_hash("what is pdpl?") != semantic_cache.query_hash(
+            "what is pdpl"
+        )
+
+
+class TestSemanticCacheWrites:
+    @pytest.mark.asyncio
+    async def test_store_queues_upsert_keyed_by_hash(self, l1, monkeypatch):
+        queued: list[dict] = []
+
+        async def submit(item):
+            queued.append(item)
+
+        monkeypatch.setattr(semantic_cache.writer, "submit", submit)
+
+        await semantic_cache.store_cache(" What is PDPL ", "answer", [], _Embeddings([1.0, 0.0]))
+
+        assert len(queued) == 1
+        assert queued[0]["query_hash"] == semantic_cache.query_hash("what is pdpl")
+        assert queued[0]["min_similarity"] == settings.SEMANTIC_CACHE_MIN_SIMILARITY
+
+    @pytest.mark.asyncio
+    async def test_l1_hit_records_hit_without_db(self, l1, monkeypatch):
+        hits: list[tuple[str, str]] = []
+
+        async def submit(item):
+            hits.append(item)
+
+        monkeypatch.setattr(semantic_cache.hit_writer, "submit", submit)
+        monkeypatch.setattr(semantic_cache, "active_index_signature", lambda: "sig")
+        l1.add("row-1", [1.0, 0.0], L1Entry("cached", [], "sig", 2e9))
+
+        cached = await semantic_cache.lookup_cache("q", _Embeddings([1.0, 0.01]))
+
+        assert cached is not None and cached.answer == "cached"
+        assert hits == [("row-1", "sig")]
+
+
+class _Session:
+    """Records statements; the upsert stores one row, eviction removes none."""
+
+    def __init__(self):
+        self.calls: list[tuple[object, dict]] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, params):
+        self.calls.append((stmt, params))
+        rows = ["new-row"] if stmt is semantic_cache._UPSERT_SQL else []
+        return SimpleNamespace(scalars=lambda: rows)
+
+    async def commit(self):
+        pass
+
+
+class TestSemanticCacheEviction:
+    @pytest.mark.asyncio
+    async def test_write_evicts_with_grace_window(self, l1, monkeypatch):
+        session = _Session()
+        monkeypatch.setattr(settings, "DB_FASTPATH_ENABLED", False)
+        monkeypatch.setattr(settings, "SEMANTIC_CACHE_MAX_ENTRIES", 2)
+        monkeypatch.setattr(settings, "SEMANTIC_CACHE_EVICT_GRACE_SECONDS", 60)
+        monkeypatch.setattr(semantic_cache, "AsyncSessionLocal", lambda: session)
+
+        await semantic_cache.write_entries([{"index_signature": "sig"}])
+
+        evictions = [p for stmt, p in session.calls if stmt is semantic_cache._EVICT_SQL]
+        assert evictions == [{"index_signature": "sig", "max_entries": 2, "grace_seconds": 60}]
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+    async def test_full_cache_keeps_fresh_insert(self):
+        engine = create_async_engine(os.environ["TEST_DATABASE_URL"])
+        try:
+            async with engine.connect() as conn:
+                # Session-local table shadows semantic_cache for the eviction SQL
+                await conn.execute(
+                    text("""
+                    CREATE TEMP TABLE semantic_cache (
+                        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+                        index_signature TEXT NOT NULL,
+                        label TEXT NOT NULL,
+                        hit_count INTEGER NOT NULL,
+                        last_hit_at TIMESTAMPTZ NOT NULL,
+                        created_at TIMESTAMPTZ NOT NULL
+                    )
+                    """)
+                )
+                await conn.execute(
+                    text("""
+                    INSERT INTO semantic_cache
+                        (index_signature, label, hit_count, last_hit_at, created_at)
+                    VALUES
+                        ('sig', 'popular', 9, NOW(), NOW() - INTERVAL '2 days'),
+                        ('sig', 'used', 3, NOW(), NOW() - INTERVAL '2 days'),
+                        ('sig', 'fresh', 0, NOW(), NOW())
+                    """)
+                )
+
+                evicted = (
+                    (
+                        await conn.execute(
+                            semantic_cache._EVICT_SQL,
+                            {"index_signature": "sig", "max_entries": 2, "grace_seconds": 3600},
+                        )
+                    )
+                    .scalars()
+                    .all()
+                )
+                kept = (
+                    (await conn.execute(text("SELECT label FROM semantic_cache ORDER BY label")))
+                    .scalars()
+                    .all()
+                )
+        finally:
+            await engine.dispose()
+
+        assert len(evicted) == 1
+        assert kept == ["fresh", "popular"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+    async def test_migration_backfill_matches_query_hash(self):
+        backfill = next(
+            statement
+            for statement in _MIGRATION.read_text().split(";")
+            if statement.strip().startswith("UPDATE semantic_cache")
+        )
+        queries = ["What IS PDPL?", "\n\tWhat is\r\nPDPL? ", "  what  is pdpl?\t"]
+        engine = create_async_engine(os.environ["TEST_DATABASE_URL"])
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(
+                    text("CREATE TEMP TABLE semantic_cache (query_text TEXT, query_hash CHAR(64))")
+                )
+                for query in queries:
+                    await conn.execute(
+                        text("INSERT INTO semantic_cache (query_text) VALUES (:q)"), {"q": query}
+                    )
+                await conn.exec_driver_sql(backfill)
+                rows = (
+                    await conn.execute(text("SELECT query_text, query_hash FROM semantic_cache"))
+                ).all()
+        finally:
+            await engine.dispose()
+
+        assert {row.query_text: row.query_hash for row in rows} == {
+            query: semantic_cache.query_hash(query) for query in queries
+        }
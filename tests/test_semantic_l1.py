@@ -0,0 +1,96 @@
+"""Tests for the in-process semantic cache tier (agentic_rag.backend.rag.semantic_l1)."""
+
+import asyncio
+import json
+import time
+
+import numpy as np
+import pytest
+
+from agentic_rag.backend.rag import semantic_l1
+from agentic_rag.backend.rag.semantic_l1 import (
+    L1Entry,
+    SemanticL1,
+    _Listener,
+    delete_payloads,
+    insert_payload,
+)
+
+
+def _entry(answer: str, signature: str = "sig", ttl: float = 60.0) -> L1Entry:
+    return L1Entry(answer, [], signature, time.time() + ttl)
+
+
+class TestSemanticL1:
+    def test_returns_closest_entry_above_threshold(self):
+        l1 = SemanticL1(capacity=4, dim=3)
+        l1.add("a", [1.0, 0.0, 0.0], _entry("A"))
+        l1.add("b", [0.0, 1.0, 0.0], _entry("B"))
+
+        hit = l1.lookup([0.9, 0.1, 0.0], "sig", 0.9)
+
+        assert hit is not None and hit[:2] == ("a", l1.entries[l1.slots["a"]])
+        assert l1.lookup([0.5, 0.5, 0.7], "sig", 0.9) is None
+
+    def test_skips_other_signature_and_expired(self):
+        l1 = SemanticL1(capacity=4, dim=2)
+        l1.add("old", [1.0, 0.0], _entry("old index", signature="v1"))
+        l1.add("stale", [1.0, 0.01], _entry("stale", ttl=-1.0))
+
+        assert l1.lookup([1.0, 0.0], "sig", 0.5) is None
+        l1.add("fresh", [1.0, 0.02], _entry("fresh"))
+        hit = l1.lookup([1.0, 0.0], "sig", 0.5)
+        assert hit is not None and hit[1].answer == "fresh"
+
+    def test_evicts_least_recently_used_and_removes(self):
+        l1 = SemanticL1(capacity=2, dim=2)
+        l1.add("a", [1.0, 0.0], _entry("A"))
+        l1.add("b", [0.0, 1.0], _entry("B"))
+        assert l1.lookup([1.0, 0.0], "sig", 0.9) is not None  # touch "a"
+
+        l1.add("c", [-1.0, 0.0], _entry("C"))
+
+        assert l1.contains("a") and l1.contains("c") and not l1.contains("b")
+        l1.remove(["a"])
+        assert l1.lookup([1.0, 0.0], "sig", 0.9) is None
+
+    def test_delete_payloads_fit_notify_limit(self):
+        ids = [str(i).rjust(36, "0") for i in range(250)]
+
+        payloads = delete_payloads(ids)
+
+        assert [len(json.loads(p)["ids"]) for p in payloads] == [100, 100, 50]
+        assert all(len(p) < 8000 for p in payloads)
+        assert np.concatenate([json.loads(p)["ids"] for p in payloads]).tolist() == ids
+
+
+class TestListener:
+    @pytest.mark.asyncio
+    async def test_malformed_notifications_are_dropped(self, monkeypatch):
+        l1 = SemanticL1(capacity=4, dim=2)
+        l1.add("a", [1.0, 0.0], _entry("A"))
+        monkeypatch.setattr(SemanticL1, "_instance", l1)
+        pulled: list[tuple[str, str]] = []
+
+        async def pull(entry_id, signature):
+            pulled.append((entry_id, signature))
+
+        monkeypatch.setattr(semantic_l1, "_pull", pull)
+        listener = _Listener()
+
+        for payload in [
+            "not json",
+            "[1, 2]",
+            '{"op": "insert", "id": "x"}',
+            '{"op": "insert", "id": 5, "sig": "sig"}',
+            '{"op": "delete", "ids": "a"}',
+            '{"op": "unknown"}',
+        ]:
+            listener._on_notify(None, 0, "channel", payload)
+        listener._on_notify(None, 0, "channel", insert_payload("row-1", "sig"))
+        await asyncio.gather(*listener.pulls)
+
+        assert pulled == [("row-1", "sig")]
+        assert l1.contains("a")
+        listener._on_notify(None, 0, "channel", delete_payloads(["a"])[0])
+        assert not l1.contains("a")
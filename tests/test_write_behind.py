@@ -0,0 +1,57 @@
+"""Tests for agentic_rag.core.write_behind."""
+
+import asyncio
+
+import pytest
+
+from agentic_rag.core.write_behind import WriteBehindQueue
+
+
+class TestWriteBehindQueue:
+    @pytest.mark.asyncio
+    async def test_batches_queued_writes_and_flushes_on_stop(self):
+        batches: list[list[int]] = []
+
+        async def write(batch):
+            batches.append(batch)
+
+        queue = WriteBehindQueue("test", write, maxsize=100, batch_size=4)
+        queue.start()
+        for i in range(10):
+            await queue.submit(i)
+        await queue.stop()
+
+        assert [len(b) for b in batches] == [4, 4, 2]
+        assert sum(batches, []) == list(range(10))
+
+    @pytest.mark.asyncio
+    async def test_drops_when_full(self):
+        release = asyncio.Event()
+        written: list[int] = []
+
+        async def slow_write(batch):
+            await release.wait()
+            written.extend(batch)
+
+        queue = WriteBehindQueue("test", slow_write, maxsize=2, batch_size=1)
+        queue.start()
+        await queue.submit(0)
+        await asyncio.sleep(0)  # worker takes item 0 and blocks
+        for i in range(1, 5):
+            await queue.submit(i)
+        release.set()
+        await queue.stop()
+
+        assert written == [0, 1, 2]
+        assert queue.stats()["dropped"] == 2
+
+    @pytest.mark.asyncio
+    async def test_writes_inline_when_not_started(self):
+        batches: list[list[str]] = []
+
+        async def write(batch):
+            batches.append(batch)
+
+        await WriteBehindQueue("test", write, maxsize=1, batch_size=8).submit("x")
+
+        assert batches == [["x"]]